@@ -0,0 +1,395 @@
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import types
+import wave
+from contextlib import contextmanager
+
+from matcher import IntentMatcher
+from registry import BUILTIN_INTENTS, IntentRegistry
+
+# The real keyword table; phrase_table pads it with random phrases
+BASE_KEYWORDS = IntentRegistry(BUILTIN_INTENTS).keywords()
+
+UTTERANCES = [
+    "please open notepad for me",
+    "what time is it",
+    "search wikipedia for alan turing",
+    "could you copy file report to the backup folder",
+    "i would like to open website github dot com",
+    "nothing in here matches anything at all",
+]
+
+# Commands for the dispatch stage; every parameter is given so nothing waits for an answer
+DISPATCH_COMMANDS = [
+    "open browser",
+    "open notepad",
+    "what time is it",
+    "search online python threads",
+    "open website example.com",
+    "type hello world",
+    "move mouse to 100 200",
+    "click",
+    "scroll down",
+    "search wikipedia for alan turing",
+    "create a file named bench",
+    "list files in {tmp}",
+    "close website",
+    "open application bench",
+    "show visualizations",
+    "this matches nothing",
+]
+
+# (transcript, seconds of speech) for the synthesized voice-turn fixtures
+VOICE_TURNS = [
+    ("what time is it", 0.8),
+    ("search online python threads", 1.2),
+]
+
+DEFAULT_BASELINE = "benchmark_baseline.json"
+
+
+def linear_scan(keywords, command):
+    command = command.lower()
+    for keyword, intent in keywords.items():
+        if keyword in command:
+            return intent
+    return None
+
+
+def phrase_table(size, seed=0):
+    rng = random.Random(seed)
+    table = dict(BASE_KEYWORDS)
+    while len(table) < size:
+        words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+                 for _ in range(rng.randint(2, 4))]
+        table[" ".join(words)] = f"custom_{len(table)}"
+    return table
+
+
+def bench_matcher(sizes, number):
+    print(f"{'keywords':>10} {'linear us/utt':>15} {'build ms':>10} {'matcher us/utt':>15}")
+    for size in sizes:
+        table = phrase_table(size)
+        linear = timeit.timeit(lambda: [linear_scan(table, u) for u in UTTERANCES], number=number)
+        build = timeit.timeit(lambda: IntentMatcher(table), number=1)
+        matcher = IntentMatcher(table)
+        compiled = timeit.timeit(lambda: [matcher.best(u) for u in UTTERANCES], number=number)
+        per_utt = number * len(UTTERANCES)
+        print(f"{size:>10} {linear / per_utt * 1e6:>15.2f} {build * 1e3:>10.2f} {compiled / per_utt * 1e6:>15.2f}")
+
+
+def bench_sampler(seconds, intervals=(1.0, 0.1)):
+    from sampler import SystemSampler
+    if not SystemSampler.available():
+        print("sampler: /proc not available, skipped")
+        return
+    print(f"{'interval s':>10} {'samples':>8} {'overhead % of one core':>24}")
+    for interval in intervals:
+        sampler = SystemSampler(interval=interval).start()
+        time.sleep(seconds)
+        sampler.stop()
+        overhead = "-" if sampler.overhead_percent is None else f"{sampler.overhead_percent:.3f}"
+        print(f"{interval:>10} {sampler.samples:>8} {overhead:>24}")
+
+
+def best_of(func, repeat, number):
+    """Fastest per-call time over ``repeat`` runs of ``number`` calls."""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+# -- fixtures ---------------------------------------------------------------
+
+class _Stub:
+    # Accepts any call and returns itself, so chained calls like screenshot().save() work
+    def __getattr__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+
+@contextmanager
+def stubbed_side_effects():
+    """Replace the process, browser and desktop calls made by the intent handlers."""
+    stub = _Stub()
+    # The desktop handlers declare pyautogui as a dependency; stand in for it when absent
+    missing = "pyautogui" not in sys.modules
+    if missing:
+        sys.modules["pyautogui"] = stub
+    import intents.apps
+    import intents.desktop
+    import intents.web
+    saved = (intents.apps.subprocess, intents.web.webbrowser, intents.desktop.pyautogui, os.system)
+    intents.apps.subprocess = types.SimpleNamespace(run=stub, Popen=stub)
+    intents.web.webbrowser = types.SimpleNamespace(open=stub)
+    intents.desktop.pyautogui = stub
+    os.system = stub
+    try:
+        yield
+    finally:
+        intents.apps.subprocess, intents.web.webbrowser, intents.desktop.pyautogui, os.system = saved
+        if missing:
+            del sys.modules["pyautogui"]
+
+
+def write_wav(path, speech_seconds, lead=0.7, tail=1.3, rate=16000, seed=0):
+    """Silence, a burst of syllable-modulated noise standing in for speech, then silence."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    total = int((lead + speech_seconds + tail) * rate)
+    samples = rng.normal(0, 40, total)
+    start, end = int(lead * rate), int((lead + speech_seconds) * rate)
+    t = np.arange(end - start) / rate
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t)
+    samples[start:end] += rng.normal(0, 6000, end - start) * envelope
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(np.clip(samples, -32768, 32767).astype("<i2").tobytes())
+    return lead + speech_seconds
+
+
+def voice_fixtures(directory, fixture_dir=None):
+    """``[(wav path, transcript, speech end in seconds)]``.
+
+    Recordings in ``fixture_dir`` are used when given: each ``name.wav`` needs
+    a ``name.txt`` transcript and a ``name.end`` holding the speech end time.
+    Otherwise fixtures are synthesized.
+    """
+    fixtures = []
+    if fixture_dir:
+        for name in sorted(os.listdir(fixture_dir)):
+            if name.endswith(".wav"):
+                base = os.path.join(fixture_dir, name[:-4])
+                with open(f"{base}.txt", encoding="utf-8") as f:
+                    transcript = f.read().strip()
+                with open(f"{base}.end", encoding="utf-8") as f:
+                    end = float(f.read())
+                fixtures.append((f"{base}.wav", transcript, end))
+        return fixtures
+    for i, (transcript, seconds) in enumerate(VOICE_TURNS):
+        path = os.path.join(directory, f"turn{i}.wav")
+        fixtures.append((path, transcript, write_wav(path, seconds, seed=i)))
+    return fixtures
+
+
+def make_processor():
+    from commands import CommandProcessor
+    from config import Config
+    from sink import HeadlessSink
+    from wiki_cache import LocalProvider, WikiCache
+    sink = HeadlessSink(Config(persistent=False))
+    processor = CommandProcessor(sink)
+    processor._wiki = WikiCache(LocalProvider({"alan turing": "Alan Turing was a mathematician."}), path=":memory:")
+    return sink, processor
+
+
+# -- stages -------------------------------------------------------------------
+
+def stage_matching(repeat):
+    _, processor = make_processor()
+    return {
+        "process_command": best_of(lambda: [processor.process_command(u) for u in UTTERANCES],
+                                   repeat, 2000) / len(UTTERANCES),
+    }
+
+
+def stage_dispatch(repeat, tmp):
+    sink, processor = make_processor()
+    commands = [c.format(tmp=tmp) for c in DISPATCH_COMMANDS]
+    cwd = os.getcwd()
+    os.chdir(tmp)
+    try:
+        with stubbed_side_effects():
+            run = lambda: [processor.execute_command(c) for c in commands]
+            run()  # warm the slot and Wikipedia caches
+            return {"execute_command": best_of(run, repeat, 50) / len(commands)}
+    finally:
+        os.chdir(cwd)
+        processor.executor.shutdown()
+
+
+def stage_history(repeat):
+    from history import ActionHistory
+    history = ActionHistory(path=None, capacity=1000)
+    rng = random.Random(0)
+    entries = [(rng.choice(UTTERANCES + DISPATCH_COMMANDS), rng.choice(list(BASE_KEYWORDS.values())))
+               for _ in range(5000)]
+
+    def append_all():
+        for text, intent in entries:
+            history.append(text, intent=intent)
+
+    return {
+        "history_append": best_of(append_all, repeat, 1) / len(entries),
+        "history_top_commands": best_of(lambda: history.top_commands_with_other(10), repeat, 200),
+        "history_top_words": best_of(lambda: history.top_words(400), repeat, 200),
+    }
+
+
+def stage_charts(repeat, tmp):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from history import ActionHistory
+    from journal import EventJournal, KINDS
+    from visualization import VisualizationManager
+    history = ActionHistory(path=None)
+    intents = list(BASE_KEYWORDS.values())
+    for i in range(5000):
+        history.append(UTTERANCES[i % len(UTTERANCES)], intent=intents[i % len(intents)])
+    journal = EventJournal(os.path.join(tmp, "bench.journal"))
+    for i in range(20000):
+        journal.append(KINDS[i % len(KINDS)], f"event {i}", ms=1.0)
+    first, last = journal.bounds()
+    manager = VisualizationManager.__new__(VisualizationManager)
+    fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
+
+    def history_chart():
+        manager._draw_command_history(ax, history.top_commands_with_other(manager.top_n))
+        fig.canvas.draw()
+
+    def timeline():
+        manager._draw_timeline(ax, journal.query(first, last), first, last)
+        fig.canvas.draw()
+
+    try:
+        return {
+            "chart_command_history": best_of(history_chart, repeat, 3),
+            "chart_timeline": best_of(timeline, repeat, 1),
+        }
+    finally:
+        plt.close(fig)
+        journal.close()
+
+
+class _ReplyClock:
+    # Null TTS: replies are timestamped instead of spoken
+    def __init__(self):
+        self.replied = threading.Event()
+        self.reply_at = None
+
+    def __call__(self, text, urgent=False):
+        if text != "Listening..." and not self.replied.is_set():
+            self.reply_at = time.monotonic()
+            self.replied.set()
+
+
+def stage_voice_turn(repeat, tmp, fixture_dir=None):
+    import speech_recognition as sr
+    from capture import CaptureSession
+    from commands import FileBackend
+    latencies = []
+    with stubbed_side_effects():
+        for path, transcript, speech_end in voice_fixtures(tmp, fixture_dir):
+            best = None
+            for _ in range(repeat):
+                sink, processor = make_processor()
+                sink.can_listen = True
+                reply = _ReplyClock()
+                sink.assistant_speaks = reply
+                processor.backend = FileBackend(transcripts=[transcript])
+                started = []
+
+                def factory(path=path):
+                    # The fake microphone plays the WAV in real time from this moment
+                    started.append(time.monotonic())
+                    return CaptureSession(source_factory=lambda: sr.AudioFile(path), realtime=True)
+
+                processor.capture_factory = factory
+                processor.listen_and_process()
+                replied = reply.replied.wait(10)
+                processor.capture.stop()
+                processor.executor.shutdown()
+                if not replied:
+                    raise RuntimeError(f"no reply for voice fixture {path}")
+                latency = reply.reply_at - (started[0] + speech_end)
+                best = latency if best is None else min(best, latency)
+            latencies.append(best)
+    # Seconds from the end of speech to the first reply, averaged over fixtures
+    return {"voice_turn_reply": sum(latencies) / len(latencies)}
+
+
+STAGES = ("matching", "dispatch", "history", "charts", "voice_turn")
+
+
+def run_suite(stages, repeat, fixture_dir=None):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="voicemate-bench-") as tmp:
+        for stage in stages:
+            if stage == "matching":
+                results.update(stage_matching(repeat))
+            elif stage == "dispatch":
+                results.update(stage_dispatch(repeat, tmp))
+            elif stage == "history":
+                results.update(stage_history(repeat))
+            elif stage == "charts":
+                results.update(stage_charts(repeat, tmp))
+            elif stage == "voice_turn":
+                results.update(stage_voice_turn(min(repeat, 3), tmp, fixture_dir))
+    return results
+
+
+def compare(results, baseline, threshold, floor=1e-6):
+    """Names of metrics slower than baseline by more than ``threshold`` (and ``floor`` seconds)."""
+    regressions = []
+    print(f"{'metric':<24} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<24} {'-':>12} {value * 1e6:>10.1f}us {'new':>8}")
+            continue
+        change = (value - base) / base if base else 0.0
+        regressed = change > threshold and value - base > floor
+        marker = "  REGRESSION" if regressed else ""
+        print(f"{name:<24} {base * 1e6:>10.1f}us {value * 1e6:>10.1f}us {change:>+7.0%}{marker}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceMate benchmarks and regression checks")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fixtures", help="directory of recorded WAV fixtures (name.wav, name.txt, name.end)")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, metavar="PATH")
+    parser.add_argument("--check", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="fail if a metric is slower than the baseline by more than --threshold")
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--scaling", action="store_true", help="also print the matcher scaling table")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[23, 100, 1000, 5000, 20000])
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--sampler-seconds", type=float, default=0, help="also measure sampler overhead")
+    args = parser.parse_args()
+
+    results = run_suite(args.stages, args.repeat, args.fixtures)
+    baseline = {}
+    if args.check:
+        with open(args.check, encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.save_baseline}")
+    if args.scaling:
+        bench_matcher(args.sizes, args.number)
+    if args.sampler_seconds:
+        bench_sampler(args.sampler_seconds)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+import collections
+import queue
+import threading
+import time
+
+from utils import log_action, lazy_import
+from vad import rms
+
+sr = lazy_import("speech_recognition")
+
+
+class CaptureSession:
+    """Keeps one input stream open and segments it into utterances.
+
+    Audio is read continuously into a ring buffer on a background thread; the
+    energy threshold is recalibrated whenever nobody is speaking, so callers
+    never pay for ``adjust_for_ambient_noise`` before a prompt. Any
+    ``speech_recognition`` audio source works, including ``sr.AudioFile`` as a
+    stand-in for the microphone. When ``vad`` is set (see vad.py) it decides
+    which chunks are speech instead of the energy threshold.
+
+    While ``playback()`` is true the microphone is also hearing the
+    assistant, so speech events mean little. The session then tracks the
+    level of that echo and reports ``"barge_in"`` once the input stays
+    ``barge_in_ratio`` times above it, i.e. someone is talking over it.
+    """
+
+    def __init__(self, source_factory=None, buffer_seconds=30, pause_threshold=0.8,
+                 phrase_threshold=0.3, pre_roll=0.5, phrase_time_limit=15,
+                 calibration_seconds=0.5, realtime=False, vad=None, playback=None,
+                 barge_in_ratio=2.0, echo_warmup=0.5, barge_in_seconds=0.15):
+        self.source_factory = source_factory or sr.Microphone
+        self.buffer_seconds = buffer_seconds
+        self.pause_threshold = pause_threshold
+        self.phrase_threshold = phrase_threshold
+        self.pre_roll = pre_roll
+        self.phrase_time_limit = phrase_time_limit
+        self.calibration_seconds = calibration_seconds
+        self.realtime = realtime
+        self.vad = vad
+        self.playback = playback
+        self.barge_in_ratio = barge_in_ratio
+        self.echo_warmup = echo_warmup
+        self.barge_in_seconds = barge_in_seconds
+        self.echo_level = None
+
+        self.energy_threshold = 300
+        self.dynamic_energy_damping = 0.15
+        self.dynamic_energy_ratio = 1.5
+
+        self.source = None
+        self.ring = None
+        self.utterances = collections.deque(maxlen=8)
+        self.in_speech = False
+        self.speech_started_at = None
+        self.live = None
+        self.live_claimed = False
+        self.finished = False
+        self.listeners = []
+        # CPU time spent by the capture thread (reading, VAD, endpointing)
+        self.cpu_seconds = 0.0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def sample_rate(self):
+        return self.source.SAMPLE_RATE
+
+    @property
+    def sample_width(self):
+        return self.source.SAMPLE_WIDTH
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return self
+        self.source = self.source_factory()
+        self.source.__enter__()
+        seconds_per_chunk = self.source.CHUNK / self.source.SAMPLE_RATE
+        self.ring = collections.deque(maxlen=max(1, int(self.buffer_seconds / seconds_per_chunk)))
+        self.finished = False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="capture-session", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self.source is not None:
+            try:
+                self.source.__exit__(None, None, None)
+            except Exception as e:
+                log_action(f"Error closing audio source: {e}", "ERROR")
+            self.source = None
+
+    def add_listener(self, callback):
+        # callback(event) with event in {"speech_start", "speech_end", "barge_in"}
+        self.listeners.append(callback)
+
+    def _notify(self, event):
+        for callback in self.listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                log_action(f"Capture listener error: {e}", "ERROR")
+
+    def _read_chunk(self):
+        chunk = self.source.stream.read(self.source.CHUNK)
+        if self.realtime and chunk:
+            time.sleep(self.source.CHUNK / self.source.SAMPLE_RATE)
+        return chunk
+
+    def _calibrate(self, energy, seconds_per_chunk):
+        damping = self.dynamic_energy_damping ** seconds_per_chunk
+        target = energy * self.dynamic_energy_ratio
+        self.energy_threshold = self.energy_threshold * damping + target * (1 - damping)
+
+    def _track_echo(self, energy, warmup_chunks, loud_chunks):
+        if self.echo_level is None:
+            if energy <= self.energy_threshold:
+                return  # queued, but not audible yet
+            self.echo_level, self._echo_chunks, self._loud = energy, 0, 0
+        self._echo_chunks += 1
+        if self._echo_chunks <= warmup_chunks:
+            # Playback is still ramping up: take the loudest echo heard so far
+            self.echo_level = max(self.echo_level, energy)
+        elif energy > self.echo_level * self.barge_in_ratio:
+            self._loud += 1
+            if self._loud == loud_chunks:
+                self._notify("barge_in")
+        else:
+            self._loud = 0
+            self.echo_level += 0.2 * (energy - self.echo_level)
+
+    def _run(self):
+        width = self.source.SAMPLE_WIDTH
+        seconds_per_chunk = self.source.CHUNK / self.source.SAMPLE_RATE
+        pre_roll_chunks = max(1, int(self.pre_roll / seconds_per_chunk))
+        pause_chunks = max(1, int(self.pause_threshold / seconds_per_chunk))
+        phrase_chunks = max(1, int(self.phrase_threshold / seconds_per_chunk))
+        limit_chunks = int(self.phrase_time_limit / seconds_per_chunk) if self.phrase_time_limit else None
+        warmup_chunks = max(2, int(self.echo_warmup / seconds_per_chunk))
+        loud_chunks = max(1, int(self.barge_in_seconds / seconds_per_chunk))
+
+        calibration_chunks = int(self.calibration_seconds / seconds_per_chunk)
+        calibration = []
+        frames = []
+        voiced = silent = 0
+        started_cpu = time.thread_time()
+        try:
+            while not self._stop.is_set():
+                self.cpu_seconds = time.thread_time() - started_cpu
+                chunk = self._read_chunk()
+                if not chunk:
+                    break
+                now = time.monotonic()
+                self.ring.append((now, chunk))
+                energy = rms(chunk, width)
+                vad = self.vad
+
+                if calibration_chunks and len(calibration) < calibration_chunks:
+                    calibration.append(energy)
+                    if len(calibration) == calibration_chunks:
+                        self.energy_threshold = max(calibration) * self.dynamic_energy_ratio
+                    continue
+
+                if self.playback is not None and self.playback():
+                    self._track_echo(energy, warmup_chunks, loud_chunks)
+                else:
+                    self.echo_level = None
+
+                speech = vad.is_speech(chunk) if vad is not None else energy > self.energy_threshold
+                if not self.in_speech:
+                    if speech:
+                        frames = [c for _, c in list(self.ring)[-pre_roll_chunks:]]
+                        voiced, silent = 1, 0
+                        with self._cond:
+                            self.in_speech = True
+                            self.speech_started_at = now
+                            self.live = queue.SimpleQueue()
+                            self.live_claimed = False
+                            for c in frames:
+                                self.live.put(c)
+                            self._cond.notify_all()
+                        self._notify("speech_start")
+                    else:
+                        self._calibrate(energy, seconds_per_chunk)
+                    continue
+
+                frames.append(chunk)
+                self.live.put(chunk)
+                if speech:
+                    voiced += 1
+                    silent = 0
+                else:
+                    silent += 1
+                if silent >= pause_chunks or (limit_chunks and len(frames) >= limit_chunks):
+                    self._end_utterance(frames, voiced >= phrase_chunks, now)
+                    frames = []
+        except Exception as e:
+            log_action(f"Capture session error: {e}", "ERROR")
+        finally:
+            if self.in_speech:
+                self._end_utterance(frames, voiced >= phrase_chunks, time.monotonic())
+            with self._cond:
+                self.finished = True
+                self._cond.notify_all()
+
+    def _end_utterance(self, frames, keep, ended_at):
+        with self._cond:
+            if keep and frames and not self.live_claimed:
+                audio = sr.AudioData(b"".join(frames), self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH)
+                self.utterances.append((self.speech_started_at, ended_at, audio))
+            self.in_speech = False
+            if self.live is not None:
+                self.live.put(None)
+                self.live = None
+            self._cond.notify_all()
+        self._notify("speech_end")
+
+    def next_utterance(self, timeout=5, since=None):
+        """Return the next utterance that ends after ``since`` (default: now).
+
+        ``timeout`` bounds the wait for speech to *start*; once the speaker is
+        talking the call waits for the endpoint.
+        """
+        since = time.monotonic() if since is None else since
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._cond:
+            while True:
+                while self.utterances:
+                    started_at, ended_at, audio = self.utterances.popleft()
+                    if ended_at >= since:
+                        return audio
+                if self.finished:
+                    return None
+                if self.in_speech:
+                    self._cond.wait()
+                    continue
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def stream_utterance(self, timeout=5, since=None, defer=None):
+        """Like ``next_utterance`` but yields raw chunks as they are captured.
+
+        Returns ``None`` if nobody starts speaking within ``timeout``;
+        otherwise an iterator that ends at the utterance endpoint. While
+        ``defer()`` is true, speech is left for other callers (or ignored, if
+        it is the assistant's own voice): the wait does not count against
+        ``timeout``, and only speech that starts after the last deferral is
+        claimed. An utterance already streaming to another caller is not
+        handed out again; later callers wait for the next one.
+        """
+        since = time.monotonic() if since is None else since
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        fresh = None
+        with self._cond:
+            while True:
+                if defer is not None and defer():
+                    if self.finished:
+                        return None
+                    now = time.monotonic()
+                    if deadline is not None and fresh is not None:
+                        deadline += now - fresh
+                    fresh = now
+                    self._cond.wait(0.1)
+                    continue
+                while self.utterances:
+                    started_at, ended_at, audio = self.utterances.popleft()
+                    if ended_at >= since and (fresh is None or started_at >= fresh):
+                        return iter([audio.frame_data])
+                # One caller per live utterance: the stream ends with a single sentinel
+                if self.in_speech and not self.live_claimed and (fresh is None or self.speech_started_at >= fresh):
+                    self.live_claimed = True
+                    return iter(self.live.get, None)
+                if self.finished:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
@@ -1,239 +1,553 @@
-import subprocess
-import os
-import webbrowser
-import pyautogui
-import wikipedia
-import speech_recognition as sr
-from datetime import datetime
-from tkinter import messagebox
-from utils import log_action
+import json
+import threading
+import time
+from utils import log_action, lazy_import
+from matcher import IntentMatcher
+from capture import CaptureSession
+from slots import SlotExtractor
+from executor import CommandExecutor, CommandCancelled
+from wiki_cache import WikiCache, WikipediaProvider
+from tracing import tracer
+from copier import FileCopier
+from registry import IntentRegistry, MissingDependency
+from fuzzy import FuzzyIntentIndex
+from vad import pcm16
+
+sr = lazy_import("speech_recognition")
+
+# Fixed prompts and templated prompts ({} marks the variable parts); the speech
+# worker pre-synthesizes these so they play from the phrase cache.
+PROMPTS = (
+    "Listening...",
+    "What is your name?",
+    "Opening browser...",
+    "Opening File Explorer...",
+    "What should be the name of the file?",
+    "Sorry, I couldn't understand the position.",
+    "Would you like to scroll up or down?",
+    "Scrolled up",
+    "Scrolled down",
+    "What would you like me to type?",
+    "What application do you want to open?",
+    "What application do you want to close?",
+    "What website do you want to open?",
+    "Closing the browser is not supported directly. Please close it manually.",
+    "What do you want to search for online?",
+    "Which directory should I list files from?",
+    "Which file should I copy?",
+    "Where should I copy it to?",
+    "Failed to copy file",
+    "Goodbye!",
+    "I didn't understand that command. Please try again.",
+    "Something went wrong with that command.",
+    "Failed to take screenshot",
+    "I didn't catch that. Could you please repeat?",
+    "Could not request results; check your internet connection.",
+)
+
+PROMPT_TEMPLATES = (
+    "Hello {}! How can I help you today?",
+    "Opening Notepad, {}",
+    "What do you want to search for, {}?",
+    "Opening Calculator, {}",
+    "The current time is {}, {}",
+    "Are you sure you want to shut down, {}?",
+    "Shutting down the computer, {}",
+    "Shutdown cancelled, {}",
+    "Where do you want to move the mouse, {}? Please tell the coordinates.",
+    "Mouse clicked, {}.",
+    "Opening {}, {}.",
+    "Closing {}, {}.",
+    "Searching for {} online.",
+    "Showing files in {}",
+    "Screenshot saved as {}",
+)
+
+
+class RecognizerBackend:
+    """Turns captured audio into text.
+
+    ``stream`` receives raw chunks as they are captured and yields
+    ``(text, is_final, alternatives)`` hypotheses, where ``alternatives`` is
+    the n-best list (top first) on the final hypothesis and empty on
+    partials; backends that cannot stream simply recognize the whole
+    utterance once it has been endpointed. Failures are
+    reported with ``sr.UnknownValueError`` / ``sr.RequestError`` so callers
+    handle every backend the same way.
+    """
+
+    def recognize(self, audio):
+        raise NotImplementedError
+
+    def recognize_nbest(self, audio):
+        return [self.recognize(audio)]
+
+    def stream(self, chunks, sample_rate, sample_width):
+        audio = sr.AudioData(b"".join(chunks), sample_rate, sample_width)
+        alternatives = self.recognize_nbest(audio)
+        yield alternatives[0], True, alternatives
+
+    def spot(self, chunks, sample_rate, sample_width, phrases):
+        """The wake phrase heard at the start of an utterance, or None.
+
+        The fallback recognizes the leading audio in full; backends with a
+        cheaper constrained mode override it.
+        """
+        try:
+            text = self.recognize(sr.AudioData(b"".join(chunks), sample_rate, sample_width)).lower()
+        except sr.UnknownValueError:
+            return None
+        return next((phrase for phrase in phrases if phrase in text), None)
+
+
+class GoogleBackend(RecognizerBackend):
+    def __init__(self, language='en'):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+    def recognize_nbest(self, audio):
+        result = self.recognizer.recognize_google(audio, language=self.language, show_all=True)
+        alternatives = [alt["transcript"] for alt in (result or {}).get("alternative", []) if alt.get("transcript")]
+        if not alternatives:
+            raise sr.UnknownValueError()
+        return alternatives
+
+
+class VoskBackend(RecognizerBackend):
+    """Offline recognizer with native partial results (requires ``vosk``)."""
+
+    def __init__(self, model_path="model", alternatives=5):
+        from vosk import Model
+        self.model = Model(model_path)
+        self.alternatives = alternatives
+
+    def _recognizer(self, sample_rate):
+        from vosk import KaldiRecognizer
+        recognizer = KaldiRecognizer(self.model, sample_rate)
+        if self.alternatives > 1:
+            recognizer.SetMaxAlternatives(self.alternatives)
+        return recognizer
+
+    @staticmethod
+    def _texts(result):
+        # With SetMaxAlternatives results come as {"alternatives": [{"text": ...}, ...]}
+        result = json.loads(result)
+        if "alternatives" in result:
+            return [alt.get("text", "") for alt in result["alternatives"]]
+        return [result.get("text", "")]
+
+    def recognize(self, audio):
+        return self.recognize_nbest(audio)[0]
+
+    def recognize_nbest(self, audio):
+        recognizer = self._recognizer(audio.sample_rate)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_width=2))
+        return self._nbest([], self._texts(recognizer.FinalResult()))
+
+    def stream(self, chunks, sample_rate, sample_width):
+        recognizer = self._recognizer(sample_rate)
+        committed = []
+        for chunk in chunks:
+            if sample_width != 2:
+                chunk = pcm16(chunk, sample_width).tobytes()
+            if recognizer.AcceptWaveform(chunk):
+                text = self._texts(recognizer.Result())[0]
+                if text:
+                    committed.append(text)
+            else:
+                partial = json.loads(recognizer.PartialResult()).get("partial", "")
+                if partial:
+                    yield " ".join(committed + [partial]), False, ()
+        alternatives = self._nbest(committed, self._texts(recognizer.FinalResult()))
+        yield alternatives[0], True, alternatives
+
+    def spot(self, chunks, sample_rate, sample_width, phrases):
+        # Grammar restricted to the wake phrases: far cheaper than free decoding
+        from vosk import KaldiRecognizer
+        recognizer = KaldiRecognizer(self.model, sample_rate, json.dumps(list(phrases) + ["[unk]"]))
+        data = b"".join(chunks)
+        if sample_width != 2:
+            data = pcm16(data, sample_width).tobytes()
+        recognizer.AcceptWaveform(data)
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        return next((phrase for phrase in phrases if phrase in text), None)
+
+    @staticmethod
+    def _nbest(committed, finals):
+        # Earlier segments are settled; the alternatives differ in the last one
+        alternatives = []
+        for final in finals:
+            text = " ".join(part for part in committed + [final] if part)
+            if text and text not in alternatives:
+                alternatives.append(text)
+        if not alternatives:
+            raise sr.UnknownValueError()
+        return alternatives
+
+
+class FileBackend(RecognizerBackend):
+    """Deterministic stand-in: returns the lines of a transcript file in order.
+
+    Each utterance consumes one line; while its audio is streaming the line is
+    revealed word by word as partial hypotheses. Blank lines simulate
+    unrecognizable speech; "a | b" lists n-best alternatives, top first.
+    """
+
+    def __init__(self, path=None, transcripts=None, chunks_per_word=2):
+        if transcripts is None:
+            with open(path, encoding="utf-8") as f:
+                transcripts = [line.rstrip("\n") for line in f]
+        self.transcripts = list(transcripts)
+        self.chunks_per_word = chunks_per_word
+        self.position = 0
+
+    def _next(self):
+        if self.position >= len(self.transcripts):
+            raise sr.UnknownValueError()
+        text = self.transcripts[self.position].strip()
+        self.position += 1
+        return text
+
+    def recognize(self, audio):
+        return self.recognize_nbest(audio)[0]
+
+    def recognize_nbest(self, audio):
+        alternatives = self._alternatives(self._next())
+        if not alternatives:
+            raise sr.UnknownValueError()
+        return alternatives
+
+    @staticmethod
+    def _alternatives(line):
+        return [text.strip() for text in line.split("|") if text.strip()]
+
+    def spot(self, chunks, sample_rate, sample_width, phrases):
+        # The line is only consumed here when it is rejected; otherwise the
+        # full recognition of the same utterance reads it
+        if self.position >= len(self.transcripts):
+            return None
+        text = self.transcripts[self.position].lower()
+        phrase = next((phrase for phrase in phrases if phrase in text), None)
+        if phrase is None:
+            self.position += 1
+        return phrase
+
+    def stream(self, chunks, sample_rate, sample_width):
+        alternatives = self._alternatives(self._next())
+        words = alternatives[0].split() if alternatives else []
+        shown = 0
+        for count, _ in enumerate(chunks, 1):
+            revealed = min(len(words), count // self.chunks_per_word)
+            if revealed > shown and revealed < len(words):
+                shown = revealed
+                yield " ".join(words[:shown]), False, ()
+        if not alternatives:
+            raise sr.UnknownValueError()
+        yield alternatives[0], True, alternatives
+
+
+# Allowed around an anchored keyword ("Stop!", "cancel.")
+FILLER = " .,!?"
+
+RECOGNIZER_BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "file": FileBackend,
+}
+
+
+def create_backend(name, **options):
+    return RECOGNIZER_BACKENDS[name](**options)
+
 
 class CommandProcessor:
-    def __init__(self, gui):
-        self.gui = gui
-        self.intent_keywords = {
-            "open browser": "open_browser",
-            "open notepad": "open_notepad",
-            "open file explorer": "open_file_explorer",
-            "search wikipedia": "search_wikipedia",
-            "open calculator": "open_calculator",
-            "time": "time",
-            "screenshot": "screenshot",
-            "shutdown": "shutdown",
-            "create a file": "create_a_file",
-            "move mouse": "move_mouse",
-            "click": "click",
-            "scroll": "scroll",
-            "type": "type",
-            "exit": "exit_program",
-            "delete": "delete",
-            "open application": "open application",
-            "close application": "close application",
-            "open website": "open website",
-            "close website": "close website",
-            "search online": "search",
-            "list files": "list_files",
-            "copy file": "copy_file",
-            "show visualizations": "show_visualizations",
-        }
-
-    def listen(self):
-        recognizer = sr.Recognizer()
-        with sr.Microphone() as source:
-            self.gui.master.after(0, self.gui.assistant_speaks, "Listening...")
-            recognizer.adjust_for_ambient_noise(source)
-            try:
-                audio = recognizer.listen(source, timeout=5)
-            except sr.WaitTimeoutError:
-                return None
+    def __init__(self, sink, workers=4, registry=None):
+        self.sink = sink
+        if registry is None:
+            registry = IntentRegistry()
+            registry.load_entry_points()
+        self.registry = registry
+        self.intent_keywords = registry.keywords()
+        # Intents that take no follow-up input and may be dispatched as soon
+        # as a partial hypothesis matches them
+        self.instant_intents = registry.names("instant")
+        # Intents that drive the shared mouse, keyboard or screen run one at a time
+        self.desktop_intents = registry.names("desktop")
+        # Seconds a handler may run before it is reported as timed out;
+        # intents that wait for a spoken answer get more room.
+        self.intent_timeouts = registry.timeouts()
+        # Intents whose keyword must open the utterance or be all of it, so
+        # "nonstop music" or "cancel my meeting" do not cancel everything
+        self.intent_anchors = registry.anchors()
+        self.executor = CommandExecutor(
+            max_workers=workers, default_timeout=30,
+            on_update=lambda job: self.sink.call_soon(self.sink.on_command_update, job,
+                                                      key=("job", job.id, job.status)),
+        )
+        self.matcher = IntentMatcher(self.intent_keywords)
+        # Fallback for utterances without an exact keyword ("open note pad")
+        self.fuzzy = FuzzyIntentIndex(self.intent_keywords,
+                                      threshold=self.sink.config.user_preferences['intent_threshold'])
+        self.desktop_lock = threading.Lock()
+        self.slots = SlotExtractor(lambda: self.sink.nlp)
+        prefs = self.sink.config.user_preferences
+        self.copier = FileCopier(workers=prefs['copy_workers'], verify=prefs['copy_verify'])
+        self.backend = None
+        self.capture = None
+        self.input_waiters = 0
+        self._input_lock = threading.Lock()
+        # Swapped for a file-backed session to drive the pipeline from recordings
+        self.capture_factory = CaptureSession
+        self._wiki = None
+
+    def capture_session(self):
+        if self.capture is None or not self.capture.running:
+            self.capture = self.capture_factory()
+            self.capture.playback = self.sink.is_speaking
+            self.capture.barge_in_ratio = self.sink.config.user_preferences['barge_in_ratio']
+            self.capture.start()
+            self.capture.add_listener(self._on_capture_event)
+        return self.capture
+
+    def _on_capture_event(self, event):
+        # Barge-in: the user talking over the assistant cuts its speech short.
+        # Plain speech_start fires on the assistant's own voice, so only the
+        # capture's echo-aware "barge_in" counts.
+        if event == "barge_in" and self.sink.config.user_preferences['barge_in']:
+            self.sink.interrupt_speech()
+
+    @property
+    def wiki(self):
+        if self._wiki is None:
+            prefs = self.sink.config.user_preferences
+            self._wiki = WikiCache(
+                WikipediaProvider(sentences=2), path=prefs['wiki_cache_path'],
+                ttl=prefs['wiki_cache_ttl_hours'] * 3600, max_entries=prefs['wiki_cache_entries'],
+                prefetch=prefs['wiki_prefetch'],
+            )
+        return self._wiki
+
+    def recognizer_backend(self):
+        if self.backend is None:
+            prefs = self.sink.config.user_preferences
+            self.backend = create_backend(prefs['recognizer'], **prefs['recognizer_options'])
+        return self.backend
+
+    def listen(self, on_partial=None, nbest=False):
+        self.executor.check_cancelled()
+        if not self.sink.can_listen:
+            self.sink.input_unavailable()
+            return None
+        job = self.executor.current_job()
+        if job is not None:
+            job.awaiting_input = True
+        with self._input_lock:
+            self.input_waiters += 1
         try:
-            return recognizer.recognize_google(audio, language='en').lower()
+            return self._listen(on_partial, nbest)
+        finally:
+            with self._input_lock:
+                self.input_waiters -= 1
+            if job is not None:
+                job.awaiting_input = False
+                job.check()
+
+    def awaiting_input(self):
+        # True while a command or prompt is waiting for the user's answer
+        return self.input_waiters > 0
+
+    def _listen(self, on_partial=None, nbest=False):
+        session = self.capture_session()
+        backend = self.recognizer_backend()
+        self.sink.assistant_speaks("Listening...")
+        job = self.executor.current_job()
+        intent = job.name if job is not None else None
+        started = time.perf_counter()
+        # The prompts above are still being spoken; claim only what the user says after them
+        chunks = session.stream_utterance(timeout=5, defer=self.sink.is_speaking)
+        if chunks is None:
+            tracer.record("capture", intent, time.perf_counter() - started, ok=False)
+            return None
+        endpoint = [started]
+
+        def timed(chunks):
+            # Capture ends at the endpoint; recognition is the time after it
+            yield from chunks
+            endpoint[0] = time.perf_counter()
+            tracer.record("capture", intent, endpoint[0] - started)
+
+        ok = False
+        try:
+            text, alternatives = None, ()
+            for text, final, alternatives in backend.stream(timed(chunks), session.sample_rate, session.sample_width):
+                if not final and on_partial:
+                    on_partial(text.lower())
+            ok = bool(text)
+            if not text:
+                return None
+            if nbest:
+                return [alternative.lower() for alternative in alternatives] or [text.lower()]
+            return text.lower()
         except sr.UnknownValueError:
-            self.gui.master.after(0, self.gui.assistant_speaks, "I didn't catch that. Could you please repeat?")
+            self.sink.assistant_speaks("I didn't catch that. Could you please repeat?")
             return None
         except sr.RequestError as e:
-            self.gui.master.after(0, self.gui.assistant_speaks, f"Could not request results; check your internet connection.")
+            self.sink.assistant_speaks("Could not request results; check your internet connection.")
             log_action(f"Speech recognition error: {e}", "ERROR")
             return None
+        finally:
+            tracer.record("recognition", intent, time.perf_counter() - endpoint[0], ok)
+
+    @property
+    def user_name(self):
+        return self.sink.config.user_preferences['name']
+
+    def load_phrases(self, phrases):
+        self.intent_keywords.update(phrases)
+        self.matcher.add_keywords(phrases)
+        self.fuzzy.add_keywords(phrases)
+
+    def _anchored(self, command, match):
+        anchor = self.intent_anchors.get(match.intent)
+        if anchor is None:
+            return True
+        if command[:match.start].strip(FILLER):
+            return False
+        return anchor == "start" or not command[match.end:].strip(FILLER)
+
+    def match_command(self, command):
+        return self.matcher.best(command, self._anchored) or self.fuzzy.best(command, accept=self._anchored)
+
+    def match_batch(self, commands):
+        """``match_command`` for many utterances; the fuzzy fallback scores them in one pass."""
+        matches = [self.matcher.best(command, self._anchored) for command in commands]
+        missing = [i for i, match in enumerate(matches) if match is None]
+        if missing:
+            for i, match in zip(missing, self.fuzzy.best_batch([commands[i] for i in missing],
+                                                               accept=self._anchored)):
+                matches[i] = match
+        return matches
+
+    def choose_hypothesis(self, hypotheses):
+        """The recognizer alternative to act on.
+
+        The first alternative with an exact keyword wins; otherwise the one
+        whose best intent scores highest above the fuzzy threshold, so a
+        misheard "open note pad" still runs instead of asking again. Falls
+        back to the top transcript.
+        """
+        for text in hypotheses:
+            if self.matcher.best(text, self._anchored):
+                return text
+        chosen, best = hypotheses[0], 0.0
+        for text, ranked in zip(hypotheses, self.fuzzy.score_batch(hypotheses)):
+            score = next((scored.score for scored in ranked if self._anchored(text, scored)), 0.0)
+            if score >= self.fuzzy.threshold and score > best:
+                chosen, best = text, score
+        return chosen
+
+    def ask(self, value, prompt):
+        # Only fall back to a follow-up question when the slot is missing.
+        if value:
+            return value
+        self.sink.assistant_speaks(prompt)
+        return self.listen()
+
+    def submit(self, command):
+        if self.sink.expecting_name:
+            return self.executor.submit("set_name", self.execute_command, command)
+        return self.dispatch(command, self.match_command(command))
+
+    def dispatch(self, command, match, run=None):
+        """Submit an already matched command; ``run`` replaces ``execute_command`` as the job body.
+
+        "stop" is handled here and returns None instead of a job.
+        """
+        intent = match.intent if match else None
+        if intent == "stop":
+            cancelled = self.executor.cancel()
+            self.sink.assistant_speaks("Stopped." if cancelled else "Nothing to stop.", urgent=True)
+            return None
+        return self.executor.submit(intent or "unknown", run or self.execute_command, command,
+                                    timeout=self.intent_timeouts.get(intent))
+
+    def cancel_waiting(self):
+        # Abandon commands blocked on a follow-up answer (the user moved on).
+        return self.executor.cancel(lambda job: job.awaiting_input)
 
     def process_command(self, command):
-        command = command.lower()
-        intents = []
-        for keyword, intent in self.intent_keywords.items():
-            if keyword in command:
-                intents.append(intent)
-                break
-        return intents
+        match = self.match_command(command)
+        return [match.intent] if match else []
 
     def execute_command(self, command):
-        if self.gui.expecting_name:
-            self.gui.config.user_preferences['name'] = command
-            self.gui.assistant_speaks(f"Hello {command}! How can I help you today?")
-            self.gui.expecting_name = False
+        if self.sink.expecting_name:
+            self.sink.config.user_preferences['name'] = command
+            self.sink.assistant_speaks(f"Hello {command}! How can I help you today?")
+            self.sink.expecting_name = False
             log_action(f"Executed command: {command}")
             return
 
-        intents = self.process_command(command)
+        self.sink.interrupt_speech()
+        with tracer.span("match") as span:
+            match = self.match_command(command)
+            span.intent = match.intent if match else None
+        intents = [match.intent] if match else []
+        ok = True
         for intent in intents:
+            slots = self.slots.extract(intent, command, match)
+            lock = self.desktop_lock if intent in self.desktop_intents else None
+            if lock is not None:
+                lock.acquire()
+            started = time.perf_counter()
             try:
-                if intent == "open_browser":
-                    self.gui.assistant_speaks("Opening browser...")
-                    subprocess.run(["start", "chrome"], shell=True)
-                elif intent == "open_notepad":
-                    os.system('notepad')
-                    self.gui.assistant_speaks(f"Opening Notepad, {self.gui.config.user_preferences['name']}")
-                elif intent == "open_file_explorer":
-                    self.gui.assistant_speaks("Opening File Explorer...")
-                    subprocess.run(["explorer"], shell=True)
-                elif intent == "search_wikipedia":
-                    self.gui.assistant_speaks(f"What do you want to search for, {self.gui.config.user_preferences['name']}?")
-                    query = self.listen()
-                    if query:
-                        result = wikipedia.summary(query, sentences=2)
-                        self.gui.assistant_speaks(f"According to Wikipedia: {result}")
-                elif intent == "open_calculator":
-                    os.system('calc')
-                    self.gui.assistant_speaks(f"Opening Calculator, {self.gui.config.user_preferences['name']}")
-                elif intent == "time":
-                    now = datetime.now().strftime("%H:%M:%S")
-                    self.gui.assistant_speaks(f"The current time is {now}, {self.gui.config.user_preferences['name']}")
-                elif intent == "screenshot":
-                    self.take_screenshot()
-                elif intent == "shutdown":
-                    self.gui.assistant_speaks(f"Are you sure you want to shut down, {self.gui.config.user_preferences['name']}?")
-                    confirmation = self.listen()
-                    if confirmation and "yes" in confirmation:
-                        self.gui.assistant_speaks(f"Shutting down the computer, {self.gui.config.user_preferences['name']}")
-                        subprocess.run(['shutdown', "/s", "/t", "0"], shell=True)
-                    else:
-                        self.gui.assistant_speaks(f"Shutdown cancelled, {self.gui.config.user_preferences['name']}")
-                elif intent == "create_a_file":
-                    self.gui.assistant_speaks("What should be the name of the file?")
-                    filename = self.listen()
-                    if filename:
-                        filepath = os.path.join(os.getcwd(), f"{filename}.txt")
-                        with open(filepath, "w") as file:
-                            file.write("This is a new file created by your voice assistant.")
-                        self.gui.assistant_speaks(f"File {filename}.txt has been created in the current directory, {self.gui.config.user_preferences['name']}")
-                elif intent == "move_mouse":
-                    self.gui.assistant_speaks(f"Where do you want to move the mouse, {self.gui.config.user_preferences['name']}? Please tell the coordinates.")
-                    position = self.listen()
-                    if position:
-                        try:
-                            x, y = map(int, position.split())
-                            pyautogui.moveTo(x, y)
-                            self.gui.assistant_speaks(f"Mouse moved to position ({x}, {y})")
-                        except ValueError:
-                            self.gui.assistant_speaks("Sorry, I couldn't understand the position.")
-                elif intent == "click":
-                    pyautogui.click()
-                    self.gui.assistant_speaks(f"Mouse clicked, {self.gui.config.user_preferences['name']}.")
-                elif intent == "scroll":
-                    self.gui.assistant_speaks("Would you like to scroll up or down?")
-                    direction = self.listen()
-                    if direction and "up" in direction:
-                        pyautogui.scroll(10)
-                        self.gui.assistant_speaks("Scrolled up")
-                    elif direction and "down" in direction:
-                        pyautogui.scroll(-10)
-                        self.gui.assistant_speaks("Scrolled down")
-                elif intent == "type":
-                    self.gui.assistant_speaks("What would you like me to type?")
-                    text = self.listen()
-                    if text:
-                        pyautogui.write(text)
-                        self.gui.assistant_speaks(f"Typed: {text}")
-                elif intent == "open application":
-                    self.gui.assistant_speaks("What application do you want to open?")
-                    app_name = self.listen()
-                    if app_name:
-                        try:
-                            subprocess.Popen(app_name)
-                            self.gui.assistant_speaks(f"Opening {app_name}, {self.gui.config.user_preferences['name']}.")
-                        except Exception as e:
-                            self.gui.assistant_speaks(f"Could not open {app_name}. Please check the application name.")
-                            log_action(f"Error opening application: {e}", "ERROR")
-                elif intent == "close application":
-                    self.gui.assistant_speaks("What application do you want to close?")
-                    app_name = self.listen()
-                    if app_name:
-                        try:
-                            os.system(f"taskkill /im {app_name}.exe")
-                            self.gui.assistant_speaks(f"Closing {app_name}, {self.gui.config.user_preferences['name']}.")
-                        except Exception as e:
-                            self.gui.assistant_speaks(f"Could not close {app_name}. Please check the application name.")
-                            log_action(f"Error closing application: {e}", "ERROR")
-                elif intent == "open website":
-                    self.gui.assistant_speaks("What website do you want to open?")
-                    website = self.listen()
-                    if website:
-                        webbrowser.open(f"https://{website}")
-                        self.gui.assistant_speaks(f"Opening {website}, {self.gui.config.user_preferences['name']}.")
-                elif intent == "close website":
-                    self.gui.assistant_speaks("Closing the browser is not supported directly. Please close it manually.")
-                elif intent == "search":
-                    self.gui.assistant_speaks("What do you want to search for online?")
-                    query = self.listen()
-                    if query:
-                        webbrowser.open(f"https://www.google.com/search?q={query}")
-                        self.gui.assistant_speaks(f"Searching for {query} online.")
-                elif intent == "list_files":
-                    self.gui.assistant_speaks("Which directory should I list files from?")
-                    directory = self.listen()
-                    if directory:
-                        try:
-                            files = os.listdir(directory)
-                            if files:
-                                self.gui.visualization_manager.show_file_explorer(directory, files)
-                                self.gui.assistant_speaks(f"Showing files in {directory}")
-                            else:
-                                self.gui.assistant_speaks(f"No files found in {directory}")
-                        except Exception as e:
-                            self.gui.assistant_speaks(f"Could not access {directory}")
-                            log_action(f"Directory error: {e}", "ERROR")
-                elif intent == "copy_file":
-                    self.gui.assistant_speaks("Which file should I copy?")
-                    source = self.listen()
-                    if source:
-                        self.gui.assistant_speaks("Where should I copy it to?")
-                        dest = self.listen()
-                        if dest:
-                            try:
-                                self.gui.visualization_manager.show_copy_animation(source, dest)
-                                self.gui.assistant_speaks(f"Copied {source} to {dest}")
-                            except Exception as e:
-                                self.gui.assistant_speaks("Failed to copy file")
-                                log_action(f"Copy error: {e}", "ERROR")
-                elif intent == "show_visualizations":
-                    self.gui.visualization_manager.show_visualizations_menu()
-                elif intent == "exit_program":
-                    self.gui.assistant_speaks("Goodbye!")
-                    self.gui.master.quit()
-                else:
-                    self.gui.assistant_speaks("I didn't understand that command. Please try again.")
+                handler = self.registry.handler(intent)
+                if handler is None:
+                    self.sink.assistant_speaks("I didn't understand that command. Please try again.")
+                elif handler(self, command, slots) is False:
+                    ok = False
+            except MissingDependency as e:
+                ok = False
+                self.sink.assistant_speaks(f"That command needs {e.module}, which isn't installed.")
+            except CommandCancelled:
+                ok = False
+                raise
             except Exception as e:
-                self.gui.assistant_speaks("Something went wrong with that command.")
+                ok = False
+                self.sink.assistant_speaks("Something went wrong with that command.")
                 log_action(f"Error executing command: {e}", "ERROR")
+            finally:
+                tracer.record("handler", intent, time.perf_counter() - started, ok)
+                if lock is not None:
+                    lock.release()
+        return ok
 
     def take_screenshot(self):
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"assistant_screenshot_{timestamp}.png"
-            x = self.gui.master.winfo_rootx()
-            y = self.gui.master.winfo_rooty()
-            width = self.gui.master.winfo_width()
-            height = self.gui.master.winfo_height()
-            screenshot = pyautogui.screenshot(region=(x, y, width, height))
-            screenshot.save(filename)
-            self.gui.assistant_speaks(f"Screenshot saved as {filename}")
-        except Exception as e:
-            self.gui.assistant_speaks("Failed to take screenshot")
-            log_action(f"Screenshot error: {e}", "ERROR")
+            self.registry.handler("screenshot")(self, "screenshot", {})
+        except MissingDependency as e:
+            self.sink.assistant_speaks(f"Taking screenshots needs {e.module}, which isn't installed.")
 
     def listen_and_process(self):
-        command = self.listen()
-        if command:
-            self.gui.master.after(0, self.gui.user_says, command)
-            self.gui.master.after(0, self.execute_command, command)
-        self.gui.listening = False
-        self.gui.master.after(0, lambda: self.gui.listen_btn.config(text="🎤 Listen"))
+        dispatched = []
+
+        def on_partial(text):
+            if dispatched or self.sink.expecting_name:
+                return
+            # Exact keywords only: a fuzzy score on half an utterance is not worth acting on
+            match = self.matcher.best(text, self._anchored)
+            if match and match.intent in self.instant_intents:
+                dispatched.append(text)
+                self.sink.call_soon(self.sink.user_says, text)
+                self.sink.call_soon(self.submit, text)
+
+        hypotheses = self.listen(on_partial, nbest=True)
+        command = None
+        if hypotheses:
+            command = hypotheses[0] if self.sink.expecting_name else self.choose_hypothesis(hypotheses)
+        if command and not dispatched:
+            self.sink.call_soon(self.sink.user_says, command)
+            self.sink.call_soon(self.submit, command)
+        self.sink.listening_stopped()
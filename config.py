@@ -1,7 +1,9 @@
 import tkinter.ttk as ttk
+from history import ActionHistory
+from journal import EventJournal
 
 class Config:
-    def __init__(self):
+    def __init__(self, persistent=True):
         self.bg_color = "#f0f8ff"
         self.text_bg = "#ffffff"
         self.user_color = "#4169e1"
@@ -11,12 +13,36 @@ class Config:
         self.user_preferences = {
             'name': 'User',
             'speech_rate': 150,
+            'barge_in': True,
+            # Talking over the assistant must be this much louder than its echo
+            'barge_in_ratio': 2.0,
+            'hands_free': False,
+            # Hands-free only acts on speech that starts with one of these
+            'wake_words': ['hey mate'],
+            'vad_energy_ratio': 3.0,
+            'phrase_cache_dir': '.voice_cache',
+            'phrase_cache_mb': 64,
+            'wiki_cache_path': 'wiki_cache.sqlite3',
+            'wiki_cache_ttl_hours': 168,
+            'wiki_cache_entries': 2000,
+            'wiki_prefetch': False,
+            'copy_workers': 4,
+            'copy_verify': False,
+            'sampler_interval': 1.0,
+            'metrics_file': 'metrics.prom',
+            'metrics_port': None,
             'preferred_language': 'en',
             'spaCy_model': 'en_core_web_sm',
+            'spaCy_disable': ['parser', 'lemmatizer'],
+            'recognizer': 'google',
+            'recognizer_options': {'language': 'en'},
+            'intent_threshold': 0.55,
             'theme': 'light'
         }
         
-        self.action_history = []
+        # Headless runs keep history in memory and do not journal the conversation
+        self.action_history = ActionHistory(path="action_history.log" if persistent else None, capacity=1000)
+        self.journal = EventJournal(path="conversation.journal") if persistent else None
         self.redo_stack = []
         
         self.text_tags = {
@@ -27,6 +53,8 @@ class Config:
             'command': {'foreground': '#8a2be2'}
         }
 
+    def apply_style(self):
+        # Needs a Tk root, so it is applied by the GUI rather than on construction
         self.style = ttk.Style()
         self.style.theme_use('clam')
         self.style.configure('.', background=self.bg_color)
@@ -0,0 +1,205 @@
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import log_action
+
+CopyResult = namedtuple("CopyResult", ["files", "bytes", "seconds", "mismatched"])
+
+# Errors that mean "this fast path is not supported here", not "the copy failed"
+FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+
+class FileCopier:
+    """Copies files and directory trees with real progress reporting.
+
+    Each file is copied with ``copy_file_range`` where the kernel supports
+    it (zero-copy, and reflinks on filesystems that support them), then
+    ``sendfile`` on Linux, then large ``readinto`` chunks. Directory trees
+    are copied by a bounded pool of workers. ``check`` is called between
+    chunks and may raise to cancel; partially written files are removed.
+    """
+
+    def __init__(self, workers=4, chunk_size=8 * 1024 * 1024, verify=False, progress_interval=0.25):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.verify = verify
+        self.progress_interval = progress_interval
+
+    def plan(self, source, dest):
+        """``(directories, [(src, dst, size), ...])`` for copying ``source`` to ``dest``."""
+        if os.path.isdir(dest):
+            dest = os.path.join(dest, os.path.basename(os.path.normpath(source)))
+        if not os.path.isdir(source):
+            return [], [(source, dest, os.path.getsize(source))]
+        directories = []
+        files = []
+        for root, dirs, names in os.walk(source):
+            target = os.path.join(dest, os.path.relpath(root, source))
+            directories.append(target)
+            for name in names:
+                path = os.path.join(root, name)
+                files.append((path, os.path.join(target, name), os.path.getsize(path)))
+        return directories, files
+
+    def copy(self, source, dest, on_progress=None, check=None):
+        directories, files = self.plan(source, dest)
+        for src, dst, _ in files[:1]:
+            if os.path.exists(dst) and os.path.samefile(src, dst):
+                raise shutil.SameFileError(f"{src} and {dst} are the same file")
+        for directory in directories:
+            os.makedirs(directory, exist_ok=True)
+        progress = _Progress(sum(size for _, _, size in files), on_progress, self.progress_interval)
+        abort = threading.Event()
+
+        def step(n):
+            progress.advance(n)
+            if abort.is_set():
+                raise _Aborted()
+            if check is not None:
+                check()
+
+        def copy_one(item):
+            src, dst, _ = item
+            try:
+                self.copy_file(src, dst, step)
+            except BaseException:
+                abort.set()
+                _remove_partial(dst)
+                raise
+            return self.verify and _digest(src) != _digest(dst)
+
+        started = time.monotonic()
+        if len(files) == 1:
+            mismatched = [files[0][1]] if copy_one(files[0]) else []
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="copy") as pool:
+                futures = [(item[1], pool.submit(copy_one, item)) for item in files]
+                error = None
+                mismatched = []
+                for dst, future in futures:
+                    try:
+                        if future.result():
+                            mismatched.append(dst)
+                    except _Aborted:
+                        pass
+                    except BaseException as e:
+                        # Keep the first real error; the rest were aborted because of it
+                        error = error or e
+                if error is not None:
+                    raise error
+        progress.report(force=True)
+        for dst in mismatched:
+            log_action(f"Checksum mismatch after copying to {dst}", "ERROR")
+        return CopyResult(len(files), progress.done, time.monotonic() - started, mismatched)
+
+    def copy_file(self, src, dst, step):
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            infd, outfd = fsrc.fileno(), fdst.fileno()
+            copied = self._copy_file_range(infd, outfd, step)
+            if copied is None and sys.platform.startswith("linux"):
+                copied = self._sendfile(infd, outfd, step)
+            if copied is None:
+                self._buffered(fsrc, fdst, step)
+        shutil.copystat(src, dst)
+
+    def _copy_file_range(self, infd, outfd, step):
+        if not hasattr(os, "copy_file_range"):
+            return None
+        copied = 0
+        while True:
+            try:
+                n = os.copy_file_range(infd, outfd, self.chunk_size)
+            except OSError as e:
+                if copied == 0 and e.errno in FALLBACK_ERRNOS:
+                    return None
+                raise
+            if n == 0:
+                return copied
+            copied += n
+            step(n)
+
+    def _sendfile(self, infd, outfd, step):
+        copied = 0
+        while True:
+            try:
+                n = os.sendfile(outfd, infd, copied, self.chunk_size)
+            except OSError as e:
+                if copied == 0 and e.errno in FALLBACK_ERRNOS:
+                    return None
+                raise
+            if n == 0:
+                return copied
+            copied += n
+            step(n)
+
+    def _buffered(self, fsrc, fdst, step):
+        buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        while True:
+            n = fsrc.readinto(buffer)
+            if not n:
+                return
+            fdst.write(view[:n])
+            step(n)
+
+
+class _Aborted(Exception):
+    pass
+
+
+class _Progress:
+    def __init__(self, total, callback, interval):
+        self.total = total
+        self.callback = callback
+        self.interval = interval
+        self.done = 0
+        self.rate = 0.0
+        self._lock = threading.Lock()
+        self._last = (time.monotonic(), 0)
+
+    def advance(self, n):
+        with self._lock:
+            self.done += n
+        self.report()
+
+    def report(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            last_time, last_done = self._last
+            if not force and now - last_time < self.interval:
+                return
+            if now > last_time:
+                # Smoothed bytes per second over the last few reports
+                instant = (self.done - last_done) / (now - last_time)
+                self.rate = instant if self.rate == 0 else 0.7 * self.rate + 0.3 * instant
+            self._last = (now, self.done)
+            done, rate = self.done, self.rate
+        if self.callback is not None:
+            eta = (self.total - done) / rate if rate > 0 else None
+            self.callback(done, self.total, rate, eta)
+
+
+def _digest(path, chunk_size=4 * 1024 * 1024):
+    digest = hashlib.blake2b()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb") as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                return digest.digest()
+            digest.update(view[:n])
+
+
+def _remove_partial(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,175 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import log_action
+from logqueue import log_context
+from tracing import tracer
+
+
+class CommandCancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, job_id, name, timeout):
+        self.id = job_id
+        self.name = name
+        self.timeout = timeout
+        self.status = "queued"
+        self.progress = None
+        self.message = None
+        self.result = None
+        self.error = None
+        self.awaiting_input = False
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+        # Status changes by the worker, cancel() and the watchdog must not interleave
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self, status="cancelled"):
+        with self._lock:
+            if self.status in ("queued", "running"):
+                self.status = status
+            self._cancel.set()
+        # True when the job never started and will not run at all
+        return self.future is not None and self.future.cancel()
+
+    def start(self):
+        # False if the job was cancelled before it could start
+        with self._lock:
+            if self._cancel.is_set():
+                return False
+            self.status = "running"
+            self.started_at = time.monotonic()
+            return True
+
+    def settle(self, status):
+        # Final status, unless cancel() or a timeout already decided it
+        with self._lock:
+            if self.status == "running":
+                self.status = status
+
+    def check(self):
+        if self._cancel.is_set():
+            raise CommandCancelled(self.name)
+
+
+class CommandExecutor:
+    """Runs intent handlers on a bounded worker pool.
+
+    Each job gets a timeout and a cancellation flag. Python threads cannot be
+    killed, so cancellation is cooperative: handlers call ``check()`` (or hit
+    it inside ``listen``) and timed-out jobs are reported immediately while
+    their thread winds down. ``on_update(job)`` is called on every state
+    change from whichever thread made it.
+    """
+
+    def __init__(self, max_workers=4, default_timeout=30, on_update=None):
+        self.default_timeout = default_timeout
+        self.on_update = on_update
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="command")
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.jobs = {}
+        self.counters = {"completed": 0, "failed": 0, "cancelled": 0, "timed out": 0}
+
+    def submit(self, name, func, *args, timeout=None):
+        job = Job(next(self._ids), name, timeout or self.default_timeout)
+        with self._lock:
+            self.jobs[job.id] = job
+        job.future = self._pool.submit(self._run, job, func, args)
+        self._notify(job)
+        return job
+
+    def _run(self, job, func, args):
+        if not job.start():
+            return self._finish(job)
+        watchdog = threading.Timer(job.timeout, self._expire, args=(job,))
+        watchdog.daemon = True
+        watchdog.start()
+        self._local.job = job
+        self._notify(job)
+        try:
+            with log_context(intent=job.name, job=job.id):
+                job.result = func(*args)
+            # Handlers that catch their own errors signal failure with False
+            job.settle("failed" if job.result is False else "completed")
+        except CommandCancelled:
+            pass
+        except Exception as e:
+            job.settle("failed")
+            job.error = e
+            log_action(f"Command {job.name} failed: {e}", "ERROR")
+        finally:
+            watchdog.cancel()
+            self._local.job = None
+            self._finish(job)
+
+    def _expire(self, job):
+        job.cancel("timed out")
+        if job.status == "timed out":
+            log_action(f"Command {job.name} timed out after {job.timeout}s", "ERROR")
+            self._notify(job)
+
+    def _finish(self, job):
+        job.finished_at = time.monotonic()
+        with self._lock:
+            self.jobs.pop(job.id, None)
+            self.counters[job.status] = self.counters.get(job.status, 0) + 1
+        tracer.outcome(job.name, job.status == "completed")
+        self._notify(job)
+
+    def _notify(self, job):
+        if self.on_update is not None:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                log_action(f"Command update callback failed: {e}", "ERROR")
+
+    def current_job(self):
+        return getattr(self._local, "job", None)
+
+    def check_cancelled(self):
+        job = self.current_job()
+        if job is not None:
+            job.check()
+
+    def report_progress(self, progress=None, message=None):
+        job = self.current_job()
+        if job is not None:
+            job.progress = progress
+            job.message = message
+            self._notify(job)
+
+    def cancel(self, predicate=None):
+        with self._lock:
+            jobs = [job for job in self.jobs.values() if predicate is None or predicate(job)]
+        for job in jobs:
+            if job.cancel():
+                self._finish(job)
+            else:
+                self._notify(job)
+        return len(jobs)
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self.jobs.values())
+            counters = dict(self.counters)
+        counters["queued"] = sum(1 for job in jobs if job.started_at is None)
+        counters["running"] = sum(1 for job in jobs if job.started_at is not None)
+        counters["in_flight"] = [job.name for job in jobs if job.started_at is not None]
+        return counters
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
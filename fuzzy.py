@@ -0,0 +1,202 @@
+import math
+import re
+from collections import Counter, namedtuple
+
+from matcher import IntentMatch
+from utils import lazy_import
+
+np = lazy_import("numpy")
+
+IntentScore = namedtuple("IntentScore", ["intent", "score", "keyword", "start", "end"])
+
+WORD = re.compile(r"[a-z0-9']+")
+
+
+class FuzzyIntentIndex:
+    """Character n-gram TF-IDF index over the intent keywords.
+
+    Keyword vectors are normalized once and kept as an inverted index from
+    each n-gram to the keywords containing it, so memory grows with the
+    number of (gram, keyword) pairs rather than grams times keywords. An
+    utterance is cut into word windows up to one word longer than the
+    longest keyword, with spaces dropped inside a window so "note pad" and
+    "screen shot" line up with "notepad" and "screenshot". Windows are
+    scored in chunks of at most ``chunk_cells`` window-keyword cells; an
+    intent scores the cosine of its best keyword over the windows of the
+    utterance.
+    """
+
+    def __init__(self, keywords=None, n=3, threshold=0.6, limit=5, cache_size=4096, chunk_cells=1 << 20):
+        self.n = n
+        self.threshold = threshold
+        self.limit = limit
+        self.cache_size = cache_size
+        self.chunk_cells = chunk_cells
+        self.keywords = {}
+        self._keywords = []
+        self._rows = {}
+        if keywords:
+            self.add_keywords(keywords)
+
+    def add_keywords(self, keywords):
+        self.keywords.update((keyword.lower(), intent) for keyword, intent in keywords.items() if keyword)
+        self._build()
+
+    def _grams(self, text):
+        padded = f"#{text.replace(' ', '')}#"
+        return [padded[i:i + self.n] for i in range(max(1, len(padded) - self.n + 1))]
+
+    def _build(self):
+        # Keywords are grouped by intent so per-intent maxima are one reduceat
+        self._keywords = sorted(self.keywords, key=lambda keyword: (self.keywords[keyword], keyword))
+        self._intents = []
+        self._groups = []
+        for position, keyword in enumerate(self._keywords):
+            intent = self.keywords[keyword]
+            if not self._intents or self._intents[-1] != intent:
+                self._intents.append(intent)
+                self._groups.append(position)
+        self._max_words = max((len(keyword.split()) for keyword in self._keywords), default=0) + 1
+
+        counts = [Counter(self._grams(keyword)) for keyword in self._keywords]
+        document_frequency = Counter(gram for grams in counts for gram in grams)
+        self._vocabulary = {gram: column for column, gram in enumerate(document_frequency)}
+        total = len(self._keywords)
+        self._idf = [math.log((1 + total) / (1 + document_frequency[gram])) + 1 for gram in self._vocabulary]
+        self._unseen_idf = math.log(1 + total) + 1
+
+        columns, keyword_rows, weights = [], [], []
+        for row, grams in enumerate(counts):
+            row_weights = {self._vocabulary[gram]: count * self._idf[self._vocabulary[gram]]
+                           for gram, count in grams.items()}
+            norm = max(math.sqrt(sum(weight * weight for weight in row_weights.values())), 1e-9)
+            for column, weight in row_weights.items():
+                columns.append(column)
+                keyword_rows.append(row)
+                weights.append(weight / norm)
+        # Postings of gram ``c`` are entries _offsets[c]:_offsets[c + 1]
+        order = np.argsort(np.array(columns, dtype=np.int64), kind="stable")
+        self._post_rows = np.array(keyword_rows, dtype=np.int64)[order]
+        self._post_weights = np.array(weights, dtype=np.float32)[order]
+        self._offsets = np.zeros(len(self._vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns, minlength=len(self._vocabulary)), out=self._offsets[1:])
+        self._rows = {}
+
+    def _windows(self, text):
+        words = list(WORD.finditer(text.lower()))
+        for i in range(len(words)):
+            for size in range(1, min(self._max_words, len(words) - i) + 1):
+                span = words[i:i + size]
+                yield "".join(word.group() for word in span), span[0].start(), span[-1].end()
+
+    def _row(self, joined):
+        # Normalized (columns, weights) of one window; words recur, so rows are memoized
+        row = self._rows.get(joined)
+        if row is None:
+            columns, weights, squares = [], [], 0.0
+            for gram, count in Counter(self._grams(joined)).items():
+                column = self._vocabulary.get(gram)
+                weight = count * (self._idf[column] if column is not None else self._unseen_idf)
+                squares += weight * weight
+                if column is not None:
+                    columns.append(column)
+                    weights.append(weight)
+            norm = max(math.sqrt(squares), 1e-9)
+            row = (columns, [weight / norm for weight in weights])
+            if len(self._rows) >= self.cache_size:
+                self._rows.clear()
+            self._rows[joined] = row
+        return row
+
+    def _similarity(self, windows):
+        """Cosine of each window against each keyword, walking only the postings of its grams."""
+        owners, columns, weights = [], [], []
+        for index, (joined, _, _) in enumerate(windows):
+            row_columns, row_weights = self._row(joined)
+            owners.extend([index] * len(row_columns))
+            columns.extend(row_columns)
+            weights.extend(row_weights)
+        keywords = len(self._keywords)
+        if not columns:
+            return np.zeros((len(windows), keywords), dtype=np.float32)
+        columns = np.array(columns, dtype=np.int64)
+        starts = self._offsets[columns]
+        lengths = self._offsets[columns + 1] - starts
+        # Expand every (window, gram) entry into that gram's postings
+        repeats = np.repeat(np.arange(len(columns)), lengths)
+        positions = starts[repeats] + np.arange(len(repeats)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        cells = np.array(owners, dtype=np.int64)[repeats] * keywords + self._post_rows[positions]
+        values = np.array(weights, dtype=np.float32)[repeats] * self._post_weights[positions]
+        return np.bincount(cells, weights=values, minlength=len(windows) * keywords) \
+            .reshape(len(windows), keywords).astype(np.float32)
+
+    def _rank(self, best_keyword, best_window, windows):
+        intent_scores = np.maximum.reduceat(best_keyword, self._groups)
+        ranked = []
+        for column in np.argsort(-intent_scores)[:self.limit]:
+            score = float(intent_scores[column])
+            if score <= 0:
+                break
+            stop = self._groups[column + 1] if column + 1 < len(self._groups) else len(self._keywords)
+            keyword_index = self._groups[column] + int(best_keyword[self._groups[column]:stop].argmax())
+            _, start, end = windows[best_window[keyword_index]]
+            ranked.append(IntentScore(self._intents[column], score, self._keywords[keyword_index], start, end))
+        return ranked
+
+    def score_batch(self, texts):
+        """Ranked ``IntentScore`` lists (best first, at most ``limit``), one per text."""
+        results = [[] for _ in texts]
+        if not self._keywords:
+            return results
+        windows, owners = [], []
+        for index, text in enumerate(texts):
+            for window in self._windows(text):
+                windows.append(window)
+                owners.append(index)
+        step = max(1, self.chunk_cells // len(self._keywords))
+        # Best score per keyword of the text being reduced, and the window it came from;
+        # a text's windows may straddle two chunks
+        current, best_keyword, best_window = None, None, None
+        for offset in range(0, len(windows), step):
+            similarity = self._similarity(windows[offset:offset + step])    # windows x keywords
+            stop = min(offset + step, len(windows))
+            first = offset
+            while first < stop:
+                owner = owners[first]
+                last = first
+                while last < stop and owners[last] == owner:
+                    last += 1
+                segment = similarity[first - offset:last - offset]
+                scores = segment.max(axis=0)
+                picks = first + segment.argmax(axis=0)
+                if owner == current:
+                    better = scores > best_keyword
+                    best_keyword = np.where(better, scores, best_keyword)
+                    best_window = np.where(better, picks, best_window)
+                else:
+                    if current is not None:
+                        results[current] = self._rank(best_keyword, best_window, windows)
+                    current, best_keyword, best_window = owner, scores, picks
+                first = last
+        if current is not None:
+            results[current] = self._rank(best_keyword, best_window, windows)
+        return results
+
+    def score(self, text):
+        return self.score_batch([text])[0]
+
+    def best_batch(self, texts, threshold=None, accept=None):
+        """An ``IntentMatch`` per text, or None where no intent reaches the threshold.
+
+        ``accept(text, match)`` can veto candidates; the next best one is tried.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        matches = []
+        for text, ranked in zip(texts, self.score_batch(texts)):
+            candidates = (IntentMatch(scored.start, scored.end, scored.keyword, scored.intent)
+                          for scored in ranked if scored.score >= threshold)
+            matches.append(next((match for match in candidates if accept is None or accept(text, match)), None))
+        return matches
+
+    def best(self, text, threshold=None, accept=None):
+        return self.best_batch([text], threshold, accept)[0]
@@ -1,21 +1,40 @@
 import tkinter as tk
-from tkinter import scrolledtext, ttk, messagebox
+from tkinter import ttk, messagebox
+import logging
 import threading
-import pyttsx3
-import spacy
-from commands import CommandProcessor
-from visualizations import VisualizationManager
+from commands import CommandProcessor, PROMPTS, PROMPT_TEMPLATES
+from visualization import VisualizationManager
 from config import Config
-from utils import log_action
+from utils import log_action, lazy_import, startup_timer
+from tracing import tracer
+from speech import SpeechWorker
+from phrase_cache import PhraseCache, PromptTemplates, WavPlayer
+from sentiment import SentimentScorer, SentimentTracker
+from transcript import Transcript
+from sink import OutputSink
+from handsfree import HandsFreeListener
+from uibus import UIBus
 
-class VoiceAssistantGUI:
+spacy = lazy_import("spacy")
+
+# Imported on a background thread once the window is up, so the first command
+# that needs them does not pay the import cost.
+WARM_MODULES = ("speech_recognition", "wikipedia", "numpy", "matplotlib", "wordcloud", "pyautogui")
+
+
+class VoiceAssistantGUI(OutputSink):
     def __init__(self, master):
         self.master = master
         self.master.title("Voice Assistant")
         self.master.geometry("1000x700")
-
-        self.config = Config()
-        self.command_processor = CommandProcessor(self)
+        # Worker threads post UI updates here; the Tk thread applies them once per frame
+        self.ui = UIBus(master)
+
+        with startup_timer.phase("init config"):
+            self.config = Config()
+            self.config.apply_style()
+        with startup_timer.phase("init command processor"):
+            self.command_processor = CommandProcessor(self)
         self.visualization_manager = VisualizationManager(self)
 
         # Initialize GUI components
@@ -27,42 +46,102 @@ class VoiceAssistantGUI:
         self.progress_bar = None
         self.theme_var = tk.StringVar()
 
-        # Initialize text-to-speech
-        self.engine = self._init_tts_engine()
+        # Text-to-speech runs on its own worker thread; fixed prompts are
+        # pre-synthesized into the phrase cache while it is idle
+        prefs = self.config.user_preferences
+        with startup_timer.phase("init speech worker"):
+            self.speech = SpeechWorker(
+                rate=prefs['speech_rate'],
+                cache=PhraseCache(prefs['phrase_cache_dir'], prefs['phrase_cache_mb'] * 1024 * 1024),
+                templates=PromptTemplates(PROMPT_TEMPLATES),
+                player=WavPlayer(),
+            ).start()
+            self.speech.warm_up(PROMPTS)
+
+        # Stage latency metrics: periodically written to a file, optionally served over HTTP
+        if prefs['metrics_file']:
+            tracer.start_export(prefs['metrics_file'])
+        if prefs['metrics_port']:
+            try:
+                tracer.serve(prefs['metrics_port'])
+            except OSError as e:
+                log_action(f"Could not serve metrics on port {prefs['metrics_port']}: {e}", "ERROR")
+        tracer.listeners.append(self._journal_stage)
 
-        # Initialize NLP
-        try:
-            self.nlp = spacy.load(self.config.user_preferences['spaCy_model'])
-        except OSError:
-            logging.error("spaCy model not found. Please install it.")
-            self.nlp = None
+        # NLP is loaded in the background after the first frame (see warm_up)
+        self.nlp = None
+        self.sentiment = SentimentTracker(self.config.journal, SentimentScorer(lambda: self.nlp)).start()
 
         # State variables
         self.listening = False
+        self.hands_free = HandsFreeListener(self.command_processor, wake_words=prefs['wake_words'],
+                                            energy_ratio=prefs['vad_energy_ratio'])
         self.expecting_name = True
         self.animation_frames = ["👂", "🗣", "💭", "⌛"]
         self.current_frame = 0
+        self._animation = None
+        self._rate_timer = None
 
-        self.create_widgets()
+        with startup_timer.phase("create widgets"):
+            self.create_widgets()
         self.assistant_speaks("What is your name?")
         threading.Thread(target=self.listen_for_name, daemon=True).start()
-        self.animate_assistant()
-
-    def _init_tts_engine(self):
-        try:
-            engine = pyttsx3.init('sapi5')
-            engine.setProperty("rate", self.config.user_preferences['speech_rate'])
-            engine.setProperty("volume", 0.9)
-            return engine
-        except Exception as e:
-            logging.error(f"Failed to initialize TTS engine: {e}")
-            return None
+        self.master.after_idle(self._on_first_frame)
+
+    def _on_first_frame(self):
+        self.ui.start()
+        startup_timer.mark("first frame (interactive)")
+        log_action(f"Startup timing:\n{startup_timer.report()}")
+        threading.Thread(target=self.warm_up, name="warm-up", daemon=True).start()
+        if self.config.user_preferences['hands_free']:
+            self.toggle_hands_free()
+
+    def warm_up(self):
+        with startup_timer.phase("load spaCy model"):
+            try:
+                # Only the components slot extraction uses are kept
+                self.nlp = spacy.load(self.config.user_preferences['spaCy_model'],
+                                      disable=self.config.user_preferences['spaCy_disable'])
+            except (OSError, ImportError) as e:
+                logging.error(f"spaCy model not available: {e}")
+                self.nlp = None
+        for name in WARM_MODULES:
+            try:
+                lazy_import(name).load()
+            except Exception as e:
+                log_action(f"Warm-up import of {name} failed: {e}", "ERROR")
+        startup_timer.mark("warm-up complete")
+
+    def start_animation(self):
+        if self._animation is None:
+            self._animation = self.master.after(500, self.animate_assistant)
 
     def animate_assistant(self):
-        if self.listening:
-            self.current_frame = (self.current_frame + 1) % len(self.animation_frames)
-            self.status_icon.config(text=self.animation_frames[self.current_frame])
-        self.master.after(500, self.animate_assistant)
+        # Only ticks while listening; the idle window has no animation timer
+        self._animation = None
+        if not self.listening:
+            self.status_icon.config(text="👂" if self.hands_free.running else "💤")
+            return
+        self.current_frame = (self.current_frame + 1) % len(self.animation_frames)
+        self.status_icon.config(text=self.animation_frames[self.current_frame])
+        self._animation = self.master.after(500, self.animate_assistant)
+
+    def set_status(self, text):
+        if self.status_var.get() != text:
+            self.status_var.set(text)
+
+    def _show_listening(self, listening):
+        text = "🔴 Listening..." if listening else "🎤 Listen"
+        if self.listen_btn.cget("text") != text:
+            self.listen_btn.config(text=text)
+        if listening:
+            self.set_status("Listening...")
+            self.progress_bar.pack(side='right', fill='x', expand=True)
+            self.progress_bar.start(10)
+            self.start_animation()
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.pack_forget()
 
     def create_widgets(self):
         # Main frame
@@ -84,13 +163,13 @@ class VoiceAssistantGUI:
         text_frame = ttk.Frame(main_frame)
         text_frame.pack(expand=True, fill='both')
 
-        self.text_area = scrolledtext.ScrolledText(
-            text_frame, wrap=tk.WORD, state='disabled', bg=self.config.text_bg,
+        # Only a bounded window of the conversation is kept in the Text widget
+        self.transcript = Transcript(
+            text_frame, self.config.text_tags, wrap=tk.WORD, bg=self.config.text_bg,
             font=('Helvetica', 10), padx=10, pady=10
         )
-        self.text_area.pack(expand=True, fill='both')
-        for tag, props in self.config.text_tags.items():
-            self.text_area.tag_config(tag, **props)
+        self.transcript.pack(expand=True, fill='both')
+        self.text_area = self.transcript.text
 
         # Input frame
         input_frame = ttk.Frame(main_frame)
@@ -109,6 +188,8 @@ class VoiceAssistantGUI:
 
         self.listen_btn = ttk.Button(btn_frame, text="🎤 Listen", command=self.toggle_listening, style='TButton')
         self.listen_btn.pack(side='left', padx=(0, 5))
+        self.hands_free_btn = ttk.Button(btn_frame, text="👂 Hands-free", command=self.toggle_hands_free, style='TButton')
+        self.hands_free_btn.pack(side='left', padx=(0, 5))
 
         ttk.Button(btn_frame, text="⚙️ Settings", command=self.show_settings, style='TButton').pack(side='left', padx=(0, 5))
         ttk.Button(btn_frame, text="📷 Screenshot", command=self.command_processor.take_screenshot, style='TButton').pack(side='left', padx=(0, 5))
@@ -120,7 +201,7 @@ class VoiceAssistantGUI:
 
         self.status_icon = ttk.Label(status_frame, text="💤", font=('Helvetica', 12))
         self.status_icon.pack(side='left', padx=(0, 5))
-        self.status_var.set("Ready")
+        self.set_status("Ready")
         ttk.Label(status_frame, textvariable=self.status_var, font=('Helvetica', 9), style='TLabel').pack(side='left', expand=True, fill='x')
         self.progress_bar = ttk.Progressbar(status_frame, orient='horizontal', mode='determinate', length=100)
         self.progress_bar.pack(side='right', fill='x', expand=True)
@@ -138,18 +219,93 @@ class VoiceAssistantGUI:
 
     def toggle_listening(self):
         if not self.listening:
+            self.speech.interrupt()
+            self.command_processor.cancel_waiting()
             self.listening = True
-            self.listen_btn.config(text="🔴 Listening...")
-            self.status_var.set("Listening...")
-            self.progress_bar.pack(side='right', fill='x', expand=True)
-            self.progress_bar.start(10)
+            self._show_listening(True)
             threading.Thread(target=self.command_processor.listen_and_process, daemon=True).start()
         else:
+            self.command_processor.executor.cancel()
             self.listening = False
-            self.listen_btn.config(text="🎤 Listen")
-            self.status_var.set("Ready")
-            self.progress_bar.stop()
-            self.progress_bar.pack_forget()
+            self._show_listening(False)
+            self.set_status("Ready")
+
+    def toggle_hands_free(self):
+        if not self.hands_free.running:
+            try:
+                self.hands_free.start()
+            except ValueError:
+                self.assistant_speaks("Hands-free listening needs a wake word; set one in wake_words first.")
+                return
+            except Exception as e:
+                self.assistant_speaks("I couldn't open the microphone for hands-free listening.")
+                log_action(f"Hands-free start failed: {e}", "ERROR")
+                return
+            self.listen_btn.state(['disabled'])
+            self.hands_free_btn.config(text="🟢 Hands-free on")
+            self.status_icon.config(text="👂")
+            self.set_status("Hands-free listening")
+        else:
+            self.hands_free.stop()
+            self.listen_btn.state(['!disabled'])
+            self.hands_free_btn.config(text="👂 Hands-free")
+            self.status_icon.config(text="💤")
+            self.set_status("Ready")
+
+    def hands_free_status(self, stats):
+        if self.hands_free.running and not self.command_processor.executor.stats()["running"]:
+            self.set_status(f"Hands-free listening (idle CPU {stats['process_cpu_percent']:.1f}%, "
+                                f"capture {stats['capture_cpu_percent']:.1f}%)")
+
+    def on_command_update(self, job):
+        stats = self.command_processor.executor.stats()
+        if job.message and job.status == "running":
+            self.set_status(f"{job.name}: {job.message}")
+        elif stats["running"] or stats["queued"]:
+            self.set_status(f"Running: {', '.join(stats['in_flight'])} ({stats['queued']} queued)")
+        elif not self.listening:
+            self.set_status("Ready")
+        if job.status in ("failed", "timed out") and job.finished_at is not None:
+            self.config.journal.append("error", str(job.error or job.status), intent=job.name)
+        if job.status == "timed out" and job.finished_at is None:
+            self.assistant_speaks(f"The {job.name} command is taking too long, so I stopped waiting for it.")
+
+    # OutputSink: the command engine calls these from worker threads
+    def call_soon(self, func, *args, key=None):
+        self.ui.post(func, *args, key=key)
+
+    def interrupt_speech(self):
+        self.speech.interrupt()
+
+    def is_speaking(self):
+        return self.speech.busy
+
+    def listening_stopped(self):
+        self.listening = False
+        self.ui.post(self._show_listening, False, key="listening")
+
+    def screen_region(self):
+        return (self.master.winfo_rootx(), self.master.winfo_rooty(),
+                self.master.winfo_width(), self.master.winfo_height())
+
+    def show_file_explorer(self, directory):
+        self.ui.post(self.visualization_manager.show_file_explorer, directory)
+
+    def show_copy_progress(self, job, source, dest):
+        self.ui.post(self.visualization_manager.show_copy_progress, job, source, dest)
+
+    def update_copy_progress(self, job_id, done, total, rate, eta):
+        self.ui.post(self.visualization_manager.update_copy_progress, job_id, done, total, rate, eta,
+                     key=("copy", job_id))
+
+    def close_copy_progress(self, job_id):
+        self.ui.post(self.visualization_manager.close_copy_progress, job_id)
+
+    def show_visualizations(self):
+        self.ui.post(self.visualization_manager.show_visualizations_menu)
+
+    def quit(self):
+        self.ui.post(self.master.quit)
 
     def show_settings(self):
         settings_window = tk.Toplevel(self.master)
@@ -185,42 +341,46 @@ class VoiceAssistantGUI:
         self.master.config(bg=self.config.bg_color)
 
     def change_voice_speed(self, speed):
+        # The scale reports every tick of a drag; only the rate it settles on
+        # retunes the engine and re-synthesizes the cached prompts
         self.config.user_preferences['speech_rate'] = speed
-        if self.engine:
-            self.engine.setProperty('rate', speed)
+        if self._rate_timer is not None:
+            self.master.after_cancel(self._rate_timer)
+        self._rate_timer = self.master.after(400, self._apply_voice_speed)
+
+    def _apply_voice_speed(self):
+        self._rate_timer = None
+        self.speech.set_rate(self.config.user_preferences['speech_rate'])
 
-    def assistant_speaks(self, text):
+    def assistant_speaks(self, text, urgent=False):
         if not text:
             return
-        self.text_area.configure(state='normal')
-        self.text_area.insert(tk.END, f"Assistant: {text}\n", 'assistant')
-        self.text_area.configure(state='disabled')
-        self.text_area.see(tk.END)
-        if self.engine:
-            try:
-                self.engine.say(text)
-                self.engine.runAndWait()
-            except Exception as e:
-                logging.error(f"Error in text-to-speech: {e}")
-                self.text_area.configure(state='normal')
-                self.text_area.insert(tk.END, f"Error: Could not speak text\n", 'error')
-                self.text_area.configure(state='disabled')
+        if threading.current_thread() is not threading.main_thread():
+            self.ui.post(self.assistant_speaks, text, urgent)
+            return
+        self.transcript.append(f"Assistant: {text}", 'assistant')
+        self.config.journal.append("assistant", text)
+        self.speech.say(text, urgent=urgent)
 
     def user_says(self, text):
         if not text:
             return
-        self.text_area.configure(state='normal')
-        self.text_area.insert(tk.END, f"You: {text}\n", 'user')
-        self.text_area.configure(state='disabled')
-        self.text_area.see(tk.END)
-        self.config.action_history.append(text)
+        self.transcript.append(f"You: {text}", 'user')
+        match = self.command_processor.match_command(text)
+        self.config.action_history.append(text, intent=match.intent if match else None)
+        self.config.journal.append("user", text)
+        if match:
+            self.config.journal.append("intent", match.keyword, intent=match.intent)
+
+    def _journal_stage(self, stage, intent, seconds, ok):
+        self.config.journal.append("stage", stage, intent=intent, ms=round(seconds * 1000, 2), ok=ok)
 
     def process_text_command(self):
         command = self.command_entry.get()
         self.command_entry.delete(0, tk.END)
         if command and command != "Type your command here or click the microphone...":
             self.user_says(command)
-            self.command_processor.execute_command(command)
+            self.command_processor.submit(command)
 
     def listen_for_name(self):
         command = self.command_processor.listen()
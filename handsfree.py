@@ -0,0 +1,166 @@
+import itertools
+import threading
+import time
+
+from tracing import tracer
+from utils import log_action, lazy_import
+from vad import VoiceActivityDetector
+
+sr = lazy_import("speech_recognition")
+
+
+class HandsFreeListener:
+    """Continuous listening without the Listen button.
+
+    The capture session runs with a VoiceActivityDetector, so only segments
+    it marks as speech reach this loop. With ``wake_words`` set, the first
+    ``wake_window`` seconds of each segment go through the backend's cheap
+    ``spot`` first, and only segments that start with a wake word are
+    recognized in full; a bare wake word arms the next ``follow_up_seconds``
+    of speech. Idle CPU is logged and exported every ``report_interval``.
+
+    Nothing is claimed while the assistant is speaking, so its own replies
+    are never submitted as commands. An always-open microphone still hears
+    the room, so a wake word is required unless ``require_wake_word`` is
+    False.
+    """
+
+    def __init__(self, processor, wake_words=(), wake_window=1.5, follow_up_seconds=6,
+                 energy_ratio=3.0, report_interval=60, require_wake_word=True):
+        self.processor = processor
+        self.wake_words = tuple(word.lower() for word in wake_words)
+        self.wake_window = wake_window
+        self.follow_up_seconds = follow_up_seconds
+        self.energy_ratio = energy_ratio
+        self.report_interval = report_interval
+        self.require_wake_word = require_wake_word
+        self.armed_until = 0.0
+        self.counts = dict.fromkeys(("segments", "woken", "rejected", "recognized", "unrecognized"), 0)
+        self.last_report = None
+        self.session = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return self
+        if self.require_wake_word and not self.wake_words:
+            raise ValueError("hands-free listening needs at least one wake word")
+        self.session = self.processor.capture_session()
+        self.session.vad = VoiceActivityDetector(self.session.sample_rate, self.session.sample_width,
+                                                 energy_ratio=self.energy_ratio)
+        self._stop.clear()
+        self._mark = (time.monotonic(), time.process_time(), self.session.cpu_seconds)
+        self._thread = threading.Thread(target=self._run, name="hands-free", daemon=True)
+        self._thread.start()
+        log_action(f"Hands-free listening started (wake words: {', '.join(self.wake_words) or 'none'})")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self.session is not None:
+            self.session.vad = None
+        log_action("Hands-free listening stopped")
+
+    def stats(self):
+        """CPU use since the last report, as a percentage of one core, plus the gate counters."""
+        now, cpu, capture_cpu = time.monotonic(), time.process_time(), self.session.cpu_seconds
+        started, started_cpu, started_capture = self._mark
+        wall = max(now - started, 1e-9)
+        self._mark = (now, cpu, capture_cpu)
+        return dict(self.counts, seconds=wall,
+                    process_cpu_percent=100.0 * (cpu - started_cpu) / wall,
+                    capture_cpu_percent=100.0 * (capture_cpu - started_capture) / wall)
+
+    def _report(self):
+        self.last_report = stats = self.stats()
+        tracer.set_gauge("hands_free_capture_cpu_percent", stats["capture_cpu_percent"],
+                         "CPU used by always-on capture and voice activity detection, percent of one core.")
+        tracer.set_gauge("hands_free_process_cpu_percent", stats["process_cpu_percent"],
+                         "Process CPU while hands-free listening, percent of one core.")
+        log_action(f"Hands-free: capture {stats['capture_cpu_percent']:.2f}% of one core, "
+                   f"process {stats['process_cpu_percent']:.2f}%; {stats['segments']} segments, "
+                   f"{stats['woken']} woken, {stats['recognized']} recognized")
+        sink = self.processor.sink
+        sink.call_soon(sink.hands_free_status, stats, key="hands_free")
+
+    def _run(self):
+        next_report = time.monotonic() + self.report_interval
+        try:
+            while not self._stop.is_set():
+                chunks = self.session.stream_utterance(timeout=1, defer=self._defer)
+                if chunks is not None:
+                    self.counts["segments"] += 1
+                    self._handle(chunks)
+                elif self.session.finished:
+                    break
+                if time.monotonic() >= next_report:
+                    self._report()
+                    next_report = time.monotonic() + self.report_interval
+        except Exception as e:
+            log_action(f"Hands-free listening error: {e}", "ERROR")
+        finally:
+            self._report()
+
+    def _defer(self):
+        # Follow-up questions from running commands take precedence, and the
+        # assistant's own voice is never a command; a stop request ends the wait
+        return not self._stop.is_set() and (self.processor.awaiting_input() or self.processor.sink.is_speaking())
+
+    def _handle(self, chunks):
+        session = self.session
+        backend = self.processor.recognizer_backend()
+        rate, width = session.sample_rate, session.sample_width
+        phrase = None
+        if self.wake_words and time.monotonic() >= self.armed_until:
+            leading, size, limit = [], 0, int(self.wake_window * rate) * width
+            for chunk in chunks:
+                leading.append(chunk)
+                size += len(chunk)
+                if size >= limit:
+                    break
+            phrase = backend.spot(leading, rate, width, self.wake_words)
+            if phrase is None:
+                self.counts["rejected"] += 1
+                for _ in chunks:
+                    pass
+                return
+            self.counts["woken"] += 1
+            chunks = itertools.chain(leading, chunks)
+
+        started = time.perf_counter()
+        text, alternatives = None, ()
+        try:
+            for text, final, alternatives in backend.stream(chunks, rate, width):
+                pass
+        except sr.UnknownValueError:
+            text = None
+        except sr.RequestError as e:
+            log_action(f"Speech recognition error: {e}", "ERROR")
+            text = None
+        tracer.record("recognition", None, time.perf_counter() - started, bool(text))
+        if not text:
+            self.counts["unrecognized"] += 1
+            return
+        hypotheses = [alternative.lower() for alternative in alternatives] or [text.lower()]
+        if phrase is not None:
+            hypotheses = [hypothesis.split(phrase, 1)[-1].strip(" ,.") for hypothesis in hypotheses]
+            if not hypotheses[0]:
+                # Bare wake word: the next utterance is the command
+                self.armed_until = time.monotonic() + self.follow_up_seconds
+                self.processor.sink.assistant_speaks("Listening...")
+                return
+            hypotheses = [hypothesis for hypothesis in hypotheses if hypothesis]
+        text = hypotheses[0] if self.processor.sink.expecting_name else self.processor.choose_hypothesis(hypotheses)
+        self.counts["recognized"] += 1
+        self.armed_until = 0.0
+        sink = self.processor.sink
+        sink.call_soon(sink.user_says, text)
+        sink.call_soon(self.processor.submit, text)
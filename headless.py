@@ -0,0 +1,123 @@
+import argparse
+import json
+import sys
+import time
+
+from commands import CommandProcessor
+from config import Config
+from sink import HeadlessSink
+
+
+class HeadlessEngine:
+    """Runs commands through the command engine without a UI.
+
+    Each command is dispatched like a typed one (so "stop" cancels what is
+    still running) and runs as an executor job; desktop intents are
+    serialized by the processor, everything else may run concurrently.
+    Follow-up questions get no answer, so commands with missing parameters
+    end after the prompt and are reported as not ok, as are commands that
+    match no intent.
+    """
+
+    def __init__(self, workers=8, timeout=None):
+        self.sink = HeadlessSink(Config(persistent=False))
+        self.processor = CommandProcessor(self.sink, workers=workers)
+        if timeout:
+            self.processor.executor.default_timeout = timeout
+
+    def _run_one(self, command):
+        self.sink.begin()
+        try:
+            return self.processor.execute_command(command)
+        finally:
+            job = self.processor.executor.current_job()
+            job.unanswered = self.sink.unanswered()
+            job.responses = self.sink.end()
+
+    def resolve(self, commands):
+        """Intent and slots for each command, without running any handler."""
+        matches = self.processor.match_batch(commands)
+        items = [(match.intent, command, match) for command, match in zip(commands, matches) if match]
+        slots = iter(self.processor.slots.extract_batch(items))
+        return [{"command": command, "intent": match.intent if match else None, "ok": match is not None,
+                 "slots": next(slots) if match else {}}
+                for command, match in zip(commands, matches)]
+
+    def run(self, commands):
+        """Yield one result dict per command, in input order."""
+        jobs = []
+        for command, match in zip(commands, self.processor.match_batch(commands)):
+            intent = match.intent if match else None
+            self.sink.begin()
+            job = self.processor.dispatch(command, match, self._run_one)
+            jobs.append((command, intent, job, self.sink.end()))
+        for command, intent, job, responses in jobs:
+            if job is None:
+                # Handled while dispatching ("stop")
+                yield {"command": command, "intent": intent, "status": "completed", "ok": True,
+                       "responses": responses, "error": None, "queued_ms": 0.0, "ms": 0.0}
+                continue
+            job.future.result()
+            unanswered = getattr(job, "unanswered", [])
+            error = str(job.error) if job.error else None
+            if error is None and unanswered:
+                error = f"needed an answer to: {unanswered[0]}"
+            yield {
+                "command": command,
+                "intent": intent,
+                "status": job.status,
+                "ok": job.status == "completed" and intent is not None and not unanswered,
+                "responses": getattr(job, "responses", []),
+                "error": error,
+                "queued_ms": round(((job.started_at or job.finished_at) - job.submitted_at) * 1000, 3),
+                "ms": round((job.finished_at - (job.started_at or job.finished_at)) * 1000, 3),
+            }
+
+    def close(self):
+        self.processor.executor.shutdown()
+
+
+def read_commands(stream):
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run VoiceMate commands without the GUI, one per line")
+    parser.add_argument("script", nargs="?", help="file with one command per line (default: stdin)")
+    parser.add_argument("--workers", type=int, default=8, help="commands run concurrently")
+    parser.add_argument("--timeout", type=float, default=None, help="default per-command timeout in seconds")
+    parser.add_argument("--execute", action="store_true",
+                        help="run the handlers, with their real side effects (default: only resolve intents and slots)")
+    parser.add_argument("--dry-run", action="store_true", help="only resolve intents and slots (the default)")
+    parser.add_argument("--batch", type=int, default=1000, help="commands read and dispatched per batch")
+    args = parser.parse_args(argv)
+
+    stream = open(args.script, encoding="utf-8") if args.script else sys.stdin
+    engine = HeadlessEngine(workers=args.workers, timeout=args.timeout)
+    count = 0
+    started = time.perf_counter()
+    try:
+        commands = read_commands(stream)
+        while not engine.sink.quit_requested.is_set():
+            batch = [command for _, command in zip(range(args.batch), commands)]
+            if not batch:
+                break
+            results = engine.run(batch) if args.execute and not args.dry_run else engine.resolve(batch)
+            for result in results:
+                count += 1
+                result["line"] = count
+                sys.stdout.write(json.dumps(result) + "\n")
+            sys.stdout.flush()
+    finally:
+        engine.close()
+        if stream is not sys.stdin:
+            stream.close()
+    elapsed = time.perf_counter() - started
+    print(f"{count} commands in {elapsed:.3f}s ({count / max(elapsed, 1e-9):,.0f}/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from utils import log_action
+
+WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+class ActionHistory:
+    """Bounded command history with incrementally maintained aggregates.
+
+    The most recent ``capacity`` entries stay in memory; every entry is also
+    appended to a JSON-lines log on disk. Per-intent counts, word frequencies
+    and per-bucket activity are updated on append, so charts read them in
+    O(1) instead of rescanning the history. A snapshot of the aggregates is
+    written every ``snapshot_every`` appends so startup only replays the log
+    tail written since.
+    """
+
+    def __init__(self, path="action_history.log", capacity=1000, bucket_seconds=3600,
+                 max_buckets=24 * 14, snapshot_every=100):
+        self.path = path
+        self.snapshot_path = f"{path}.snapshot.json"
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self.max_buckets = max_buckets
+        self.snapshot_every = snapshot_every
+        self._reset()
+        self.version = 0
+        self._lock = threading.Lock()
+        self._log = None
+        self._since_snapshot = 0
+        self.listeners = []
+        if path:
+            self._load()
+            self._log = open(path, "a", encoding="utf-8")
+
+    def _reset(self):
+        self.recent = deque(maxlen=self.capacity)
+        self.command_counts = Counter()
+        self.word_counts = Counter()
+        self.time_buckets = {}
+        self.total = 0
+
+    def __len__(self):
+        return self.total
+
+    def __bool__(self):
+        return self.total > 0
+
+    def __iter__(self):
+        # Iterates the texts of the in-memory window, oldest first
+        with self._lock:
+            entries = list(self.recent)
+        return iter(entry["text"] for entry in entries)
+
+    def append(self, text, intent=None, timestamp=None):
+        entry = {"t": time.time() if timestamp is None else timestamp, "text": text, "intent": intent}
+        with self._lock:
+            self._apply(entry)
+            if self._log is not None:
+                self._log.write(json.dumps(entry) + "\n")
+                self._log.flush()
+                self._since_snapshot += 1
+                if self._since_snapshot >= self.snapshot_every:
+                    self._write_snapshot()
+        for callback in list(self.listeners):
+            try:
+                callback(entry)
+            except Exception as e:
+                log_action(f"History listener error: {e}", "ERROR")
+        return entry
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _apply(self, entry):
+        self.recent.append(entry)
+        self.total += 1
+        self.version += 1
+        self.command_counts[entry.get("intent") or "unrecognized"] += 1
+        self.word_counts.update(WORD_RE.findall(entry["text"].lower()))
+        bucket = int(entry["t"] // self.bucket_seconds) * self.bucket_seconds
+        self.time_buckets[bucket] = self.time_buckets.get(bucket, 0) + 1
+        if len(self.time_buckets) > self.max_buckets:
+            del self.time_buckets[min(self.time_buckets)]
+
+    def entries(self):
+        with self._lock:
+            return list(self.recent)
+
+    def top_commands(self, n=10):
+        with self._lock:
+            return self.command_counts.most_common(n)
+
+    def top_commands_with_other(self, n=10):
+        # Top-N intents plus everything else folded into an "other" bucket
+        with self._lock:
+            top = self.command_counts.most_common(n)
+            other = self.total - sum(count for _, count in top)
+        if other > 0:
+            top.append(("other", other))
+        return top
+
+    def top_words(self, n=100):
+        with self._lock:
+            return self.word_counts.most_common(n)
+
+    def activity(self):
+        with self._lock:
+            return sorted(self.time_buckets.items())
+
+    def _write_snapshot(self):
+        snapshot = {
+            "offset": self._log.tell(),
+            "total": self.total,
+            "command_counts": self.command_counts,
+            "word_counts": self.word_counts,
+            "time_buckets": self.time_buckets,
+            "recent": list(self.recent),
+        }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.snapshot_path)
+        self._since_snapshot = 0
+
+    def _load(self):
+        offset = 0
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            offset = snapshot["offset"]
+            self.total = snapshot["total"]
+            self.command_counts.update(snapshot["command_counts"])
+            self.word_counts.update(snapshot["word_counts"])
+            self.time_buckets = {int(k): v for k, v in snapshot["time_buckets"].items()}
+            self.recent.extend(snapshot["recent"])
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            log_action(f"Ignoring corrupt history snapshot: {e}", "ERROR")
+            offset = 0
+            self._reset()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                f.seek(offset)
+                for line in f:
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        self.version = self.total
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._write_snapshot()
+                self._log.close()
+                self._log = None
@@ -0,0 +1,5 @@
+"""Built-in intent handlers, imported per module on first dispatch (see registry.py).
+
+A handler is called as ``handler(processor, command, slots)`` on a worker
+thread; returning False marks the command as failed.
+"""
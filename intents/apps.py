@@ -0,0 +1,85 @@
+import re
+import subprocess
+
+from utils import log_action
+
+
+def open_browser(processor, command, slots):
+    processor.sink.assistant_speaks("Opening browser...")
+    subprocess.run(["start", "chrome"], shell=True)
+
+
+def _launch(processor, args, name):
+    # Popen returns at once; os.system held the worker until the app was closed
+    try:
+        subprocess.Popen(args)
+    except OSError as e:
+        processor.sink.assistant_speaks(f"Could not open {name}.")
+        log_action(f"Error opening {name}: {e}", "ERROR")
+        return False
+    processor.sink.assistant_speaks(f"Opening {name}, {processor.user_name}")
+
+
+def open_notepad(processor, command, slots):
+    return _launch(processor, ["notepad"], "Notepad")
+
+
+def open_file_explorer(processor, command, slots):
+    processor.sink.assistant_speaks("Opening File Explorer...")
+    subprocess.run(["explorer"], shell=True)
+
+
+def open_calculator(processor, command, slots):
+    return _launch(processor, ["calc"], "Calculator")
+
+
+def open_application(processor, command, slots):
+    app_name = processor.ask(slots.get("app"), "What application do you want to open?")
+    if app_name:
+        try:
+            subprocess.Popen(app_name)
+            processor.sink.assistant_speaks(f"Opening {app_name}, {processor.user_name}.")
+        except Exception as e:
+            processor.sink.assistant_speaks(f"Could not open {app_name}. Please check the application name.")
+            log_action(f"Error opening application: {e}", "ERROR")
+
+
+# An image name for taskkill: no spaces, wildcards, switches or shell syntax
+APP_NAME = re.compile(r"[A-Za-z0-9_][\w.-]*")
+
+
+def close_application(processor, command, slots):
+    app_name = processor.ask(slots.get("app"), "What application do you want to close?")
+    if not app_name:
+        return
+    app_name = app_name.strip()
+    if app_name.lower().endswith(".exe"):
+        app_name = app_name[:-4]
+    if not APP_NAME.fullmatch(app_name):
+        processor.sink.assistant_speaks(f"{app_name} doesn't look like an application name.")
+        log_action(f"Refused to close application {app_name!r}", "WARNING")
+        return False
+    try:
+        result = subprocess.run(["taskkill", "/im", f"{app_name}.exe"], capture_output=True)
+    except OSError as e:
+        result = None
+        log_action(f"Error closing application: {e}", "ERROR")
+    if result is None or result.returncode != 0:
+        processor.sink.assistant_speaks(f"Could not close {app_name}. Please check the application name.")
+        return False
+    processor.sink.assistant_speaks(f"Closing {app_name}, {processor.user_name}.")
+
+
+def shutdown(processor, command, slots):
+    processor.sink.assistant_speaks(f"Are you sure you want to shut down, {processor.user_name}?")
+    confirmation = processor.listen()
+    if confirmation and "yes" in confirmation:
+        processor.sink.assistant_speaks(f"Shutting down the computer, {processor.user_name}")
+        subprocess.run(['shutdown', "/s", "/t", "0"], shell=True)
+    else:
+        processor.sink.assistant_speaks(f"Shutdown cancelled, {processor.user_name}")
+
+
+def exit_program(processor, command, slots):
+    processor.sink.assistant_speaks("Goodbye!")
+    processor.sink.quit()
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from utils import log_action, lazy_import
+
+pyautogui = lazy_import("pyautogui")
+
+
+def screenshot(processor, command, slots):
+    try:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"assistant_screenshot_{timestamp}.png"
+        image = pyautogui.screenshot(region=processor.sink.screen_region())
+        image.save(filename)
+        processor.sink.assistant_speaks(f"Screenshot saved as {filename}")
+    except Exception as e:
+        processor.sink.assistant_speaks("Failed to take screenshot")
+        log_action(f"Screenshot error: {e}", "ERROR")
+        return False
+
+
+def move_mouse(processor, command, slots):
+    if "x" in slots:
+        position = f"{slots['x']} {slots['y']}"
+    else:
+        position = processor.ask(None, f"Where do you want to move the mouse, {processor.user_name}? Please tell the coordinates.")
+    if position:
+        try:
+            x, y = map(int, position.split())
+            pyautogui.moveTo(x, y)
+            processor.sink.assistant_speaks(f"Mouse moved to position ({x}, {y})")
+        except ValueError:
+            processor.sink.assistant_speaks("Sorry, I couldn't understand the position.")
+
+
+def click(processor, command, slots):
+    pyautogui.click()
+    processor.sink.assistant_speaks(f"Mouse clicked, {processor.user_name}.")
+
+
+def scroll(processor, command, slots):
+    direction = processor.ask(slots.get("direction"), "Would you like to scroll up or down?")
+    if direction and "up" in direction:
+        pyautogui.scroll(10)
+        processor.sink.assistant_speaks("Scrolled up")
+    elif direction and "down" in direction:
+        pyautogui.scroll(-10)
+        processor.sink.assistant_speaks("Scrolled down")
+
+
+def type_text(processor, command, slots):
+    text = processor.ask(slots.get("text"), "What would you like me to type?")
+    if text:
+        pyautogui.write(text)
+        processor.sink.assistant_speaks(f"Typed: {text}")
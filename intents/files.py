@@ -0,0 +1,64 @@
+import os
+
+from utils import log_action
+
+
+def create_a_file(processor, command, slots):
+    filename = processor.ask(slots.get("filename"), "What should be the name of the file?")
+    if filename:
+        filepath = os.path.join(os.getcwd(), f"{filename}.txt")
+        with open(filepath, "w") as file:
+            file.write("This is a new file created by your voice assistant.")
+        processor.sink.assistant_speaks(f"File {filename}.txt has been created in the current directory, {processor.user_name}")
+
+
+def list_files(processor, command, slots):
+    directory = processor.ask(slots.get("directory"), "Which directory should I list files from?")
+    if directory:
+        try:
+            # Only check for a first entry here; the explorer enumerates in the background
+            with os.scandir(directory) as it:
+                empty = next(it, None) is None
+            if not empty:
+                processor.sink.show_file_explorer(directory)
+                processor.sink.assistant_speaks(f"Showing files in {directory}")
+            else:
+                processor.sink.assistant_speaks(f"No files found in {directory}")
+        except Exception as e:
+            processor.sink.assistant_speaks(f"Could not access {directory}")
+            log_action(f"Directory error: {e}", "ERROR")
+
+
+def copy_file(processor, command, slots):
+    source = processor.ask(slots.get("source"), "Which file should I copy?")
+    if source:
+        dest = processor.ask(slots.get("dest"), "Where should I copy it to?")
+        if dest:
+            return copy_path(processor, source, dest)
+
+
+def copy_path(processor, source, dest):
+    sink = processor.sink
+    if not os.path.exists(source):
+        sink.assistant_speaks(f"I couldn't find {source}")
+        return False
+    job = processor.executor.current_job()
+    sink.show_copy_progress(job, source, dest)
+    try:
+        result = processor.copier.copy(
+            source, dest,
+            on_progress=lambda *progress: sink.update_copy_progress(job.id, *progress),
+            check=job.check,
+        )
+    except OSError as e:
+        sink.assistant_speaks(f"Failed to copy {source}")
+        log_action(f"Copy error: {e}", "ERROR")
+        return False
+    finally:
+        sink.close_copy_progress(job.id)
+    if result.mismatched:
+        sink.assistant_speaks(f"Copied {source} to {dest}, but {len(result.mismatched)} files failed verification.")
+        return False
+    speed = result.bytes / 1e6 / max(result.seconds, 1e-3)
+    sink.assistant_speaks(f"Copied {result.files} files ({result.bytes / 1e6:,.1f} MB) to {dest} at {speed:,.0f} MB per second.")
+    return True
@@ -0,0 +1,10 @@
+from datetime import datetime
+
+
+def time(processor, command, slots):
+    now = datetime.now().strftime("%H:%M:%S")
+    processor.sink.assistant_speaks(f"The current time is {now}, {processor.user_name}")
+
+
+def show_visualizations(processor, command, slots):
+    processor.sink.show_visualizations()
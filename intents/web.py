@@ -0,0 +1,31 @@
+import webbrowser
+
+
+def search_wikipedia(processor, command, slots):
+    query = processor.ask(slots.get("query"), f"What do you want to search for, {processor.user_name}?")
+    if query:
+        answer = processor.wiki.lookup(query)
+        if answer.kind == "page":
+            processor.sink.assistant_speaks(f"According to Wikipedia: {answer.text}")
+        elif answer.kind == "ambiguous":
+            processor.sink.assistant_speaks(f"{query} may refer to {', '.join(answer.options[:3])}. Please be more specific.")
+        else:
+            processor.sink.assistant_speaks(f"I couldn't find a Wikipedia page for {query}.")
+
+
+def open_website(processor, command, slots):
+    website = processor.ask(slots.get("site"), "What website do you want to open?")
+    if website:
+        webbrowser.open(f"https://{website}")
+        processor.sink.assistant_speaks(f"Opening {website}, {processor.user_name}.")
+
+
+def close_website(processor, command, slots):
+    processor.sink.assistant_speaks("Closing the browser is not supported directly. Please close it manually.")
+
+
+def search(processor, command, slots):
+    query = processor.ask(slots.get("query"), "What do you want to search for online?")
+    if query:
+        webbrowser.open(f"https://www.google.com/search?q={query}")
+        processor.sink.assistant_speaks(f"Searching for {query} online.")
@@ -0,0 +1,183 @@
+import bisect
+import json
+import os
+import struct
+import threading
+import time
+
+from utils import log_action
+
+HEADER = struct.Struct("<dBI")   # timestamp, kind, payload length
+INDEX_ENTRY = struct.Struct("<dQ")  # timestamp, byte offset of the record
+
+KINDS = ("user", "intent", "assistant", "error", "stage")
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+
+class EventJournal:
+    """Append-only binary log of conversation events with a sparse time index.
+
+    Each record is a fixed header (timestamp, kind, length) followed by a
+    JSON payload. Every ``index_every`` records the (timestamp, offset) of the
+    record is appended to a ``.idx`` sidecar, so a range query seeks close to
+    the start of the window instead of scanning from the beginning.
+    Timestamps are kept non-decreasing so the index stays sorted.
+    """
+
+    def __init__(self, path="conversation.journal", index_every=64):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self.index_every = index_every
+        self._lock = threading.Lock()
+        self._index_times = []
+        self._index_offsets = []
+        self.first_time = None
+        self.last_time = None
+        self._since_index = 0
+        self.listeners = []
+        self._open()
+
+    def _open(self):
+        self._load_index()
+        # Re-scan from the last indexed record: this restores index entries
+        # lost with a truncated sidecar and drops a torn record at the tail.
+        start = self._index_offsets[-1] if self._index_offsets else 0
+        rebuilt = []
+        end = start
+        position = 0
+        with open(self.path, "ab+") as f:
+            f.seek(start)
+            while True:
+                offset = f.tell()
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                timestamp, _, length = HEADER.unpack(header)
+                if len(f.read(length)) < length:
+                    break
+                if position % self.index_every == 0 and (position or not self._index_offsets):
+                    rebuilt.append((timestamp, offset))
+                end = f.tell()
+                position += 1
+                self.last_time = timestamp
+                if self.first_time is None:
+                    self.first_time = timestamp
+            if end < f.seek(0, os.SEEK_END):
+                log_action(f"Truncating torn record at end of {self.path}")
+                f.truncate(end)
+        self._since_index = position % self.index_every
+        self._index_file = open(self.index_path, "ab")
+        for timestamp, offset in rebuilt:
+            self._index_file.write(INDEX_ENTRY.pack(timestamp, offset))
+            self._index_times.append(timestamp)
+            self._index_offsets.append(offset)
+        self._index_file.flush()
+        self._file = open(self.path, "ab")
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        for timestamp, offset in INDEX_ENTRY.iter_unpack(data[:usable]):
+            self._index_times.append(timestamp)
+            self._index_offsets.append(offset)
+        if self._index_times:
+            with open(self.path, "rb") as f:
+                f.seek(self._index_offsets[0])
+                header = f.read(HEADER.size)
+            if len(header) == HEADER.size:
+                self.first_time = HEADER.unpack(header)[0]
+
+    def append(self, kind, text="", **fields):
+        fields["text"] = text
+        payload = json.dumps(fields, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            now = time.time()
+            if self.last_time is not None and now < self.last_time:
+                now = self.last_time
+            offset = self._file.tell()
+            self._file.write(HEADER.pack(now, KIND_CODES[kind], len(payload)) + payload)
+            self._file.flush()
+            if self._since_index == 0:
+                self._index_file.write(INDEX_ENTRY.pack(now, offset))
+                self._index_file.flush()
+                self._index_times.append(now)
+                self._index_offsets.append(offset)
+            self._since_index = (self._since_index + 1) % self.index_every
+            self.last_time = now
+            if self.first_time is None:
+                self.first_time = now
+        for callback in list(self.listeners):
+            try:
+                callback(now, kind, fields)
+            except Exception as e:
+                log_action(f"Journal listener error: {e}", "ERROR")
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def query(self, start=None, end=None, kinds=None):
+        """Yield ``(timestamp, kind, payload)`` for events in ``[start, end]``."""
+        with self._lock:
+            position = bisect.bisect_right(self._index_times, start) - 1 if start is not None else 0
+            offset = self._index_offsets[position] if self._index_offsets and position >= 0 else 0
+        for _, timestamp, kind, payload in self.read_from(offset, start, end, kinds):
+            yield timestamp, kind, payload
+
+    def read_from(self, offset, start=None, end=None, kinds=None):
+        """Yield ``(next_offset, timestamp, kind, payload)`` from a byte offset.
+
+        ``next_offset`` is where reading can resume later, so consumers can
+        follow the journal incrementally without seeing an event twice.
+        """
+        codes = None if kinds is None else {KIND_CODES[k] for k in kinds}
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            while True:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    return
+                timestamp, code, length = HEADER.unpack(header)
+                if end is not None and timestamp > end:
+                    return
+                if (start is not None and timestamp < start) or (codes is not None and code not in codes):
+                    if len(f.read(length)) < length:
+                        return
+                    continue
+                payload = f.read(length)
+                if len(payload) < length:
+                    return
+                yield f.tell(), timestamp, KINDS[code], json.loads(payload)
+
+    def bounds(self):
+        return self.first_time, self.last_time
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            self._index_file.close()
+
+
+def downsample(events, start, end, bins):
+    """Group events into ``bins`` equal time slices per kind.
+
+    Returns ``{kind: [(bin_center, count, sample_payload), ...]}`` with one
+    entry per non-empty bin, so dense stretches collapse to one marker.
+    """
+    width = (end - start) / bins if end > start else 1.0
+    grouped = {}
+    for timestamp, kind, payload in events:
+        index = min(bins - 1, int((timestamp - start) / width))
+        slot = grouped.setdefault(kind, {})
+        if index in slot:
+            slot[index][1] += 1
+        else:
+            slot[index] = [start + (index + 0.5) * width, 1, payload]
+    return {kind: [tuple(v) for _, v in sorted(slots.items())] for kind, slots in grouped.items()}
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+from utils import log_action
+
+Entry = namedtuple("Entry", ["name", "is_dir", "size", "mtime"])
+
+SORT_KEYS = {
+    "name": lambda e: e.name.casefold(),
+    "size": lambda e: (e.size is None, e.size or 0),
+    "type": lambda e: (not e.is_dir, e.name.casefold()),
+    "modified": lambda e: (e.mtime is None, e.mtime or 0),
+}
+
+
+class DirectoryListing:
+    """Enumerates a directory with ``os.scandir`` on a background thread.
+
+    Each entry is stat'ed once (the stat result comes with the directory
+    read on Windows) and published in batches, so the first rows can be
+    shown while a large directory is still being read. Sorting and filtering
+    work on the collected entries and never touch the filesystem again.
+    """
+
+    def __init__(self, path, batch_size=256, batch_seconds=0.02):
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.entries = []
+        self.done = False
+        self.error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name="directory-listing", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        batch = []
+        flushed = time.monotonic()
+        try:
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if self._stop.is_set():
+                        break
+                    batch.append(self._entry(entry))
+                    if len(batch) >= self.batch_size or time.monotonic() - flushed >= self.batch_seconds:
+                        self._publish(batch)
+                        batch = []
+                        flushed = time.monotonic()
+        except OSError as e:
+            self.error = e
+            log_action(f"Directory listing error for {self.path}: {e}", "ERROR")
+        self._publish(batch)
+        self.done = True
+
+    @staticmethod
+    def _entry(entry):
+        try:
+            is_dir = entry.is_dir()
+            stat = entry.stat()
+            return Entry(entry.name, is_dir, None if is_dir else stat.st_size, stat.st_mtime)
+        except OSError:
+            # Broken symlinks and entries removed while listing
+            return Entry(entry.name, False, None, None)
+
+    def _publish(self, batch):
+        if batch:
+            with self._lock:
+                self.entries.extend(batch)
+
+    def __len__(self):
+        with self._lock:
+            return len(self.entries)
+
+    def slice(self, start, stop=None):
+        with self._lock:
+            return self.entries[start:stop]
+
+    def view(self, sort=None, reverse=False, pattern=""):
+        """Entries loaded so far, filtered by name substring and sorted by column."""
+        with self._lock:
+            entries = list(self.entries)
+        if pattern:
+            pattern = pattern.casefold()
+            entries = [e for e in entries if pattern in e.name.casefold()]
+        if sort is not None:
+            entries.sort(key=SORT_KEYS[sort], reverse=reverse)
+        return entries
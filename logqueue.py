@@ -0,0 +1,231 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+
+# Record attributes copied into the JSON line when present
+FIELDS = ("intent", "stage", "duration_ms", "job", "event")
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Enqueues records without ever blocking the logging thread.
+
+    Above ``debug_watermark`` of the queue's capacity debug records are
+    dropped; once the queue is full everything else is dropped too. Drops are
+    counted per level and reported by the writer.
+    """
+
+    def __init__(self, log_queue, debug_watermark=0.5):
+        super().__init__(log_queue)
+        self.debug_limit = int(log_queue.maxsize * debug_watermark) if log_queue.maxsize else None
+        self.dropped = {}
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Formatting happens on the writer thread; only merge the message
+        # args and the caller's context here
+        record.msg = record.getMessage()
+        record.args = None
+        for name, value in context_fields().items():
+            if not hasattr(record, name):
+                setattr(record, name, value)
+        return record
+
+    def enqueue(self, record):
+        if record.levelno < logging.INFO and self.debug_limit is not None and self.queue.qsize() >= self.debug_limit:
+            return self._drop(record)
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._drop(record)
+
+    def _drop(self, record):
+        with self._dropped_lock:
+            self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+    def take_dropped(self):
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, {}
+        return dropped
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, thread, message and context fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.msg if isinstance(record.msg, str) else str(record.msg),
+        }
+        for name in FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LogWriter:
+    """Single thread that drains the log queue into a rotating file.
+
+    Records are written in batches of up to ``batch_size`` with one write and
+    flush per batch. The file rotates when it would exceed ``max_bytes`` or
+    after ``rotate_seconds``; ``backups`` old files are kept (``path.1`` is
+    the newest), so the log never takes more than about
+    ``max_bytes * (backups + 1)`` on disk.
+    """
+
+    def __init__(self, log_queue, path, handler=None, max_bytes=10 * 1024 * 1024, backups=5,
+                 rotate_seconds=24 * 3600, batch_size=512, flush_interval=0.5):
+        self.queue = log_queue
+        self.path = path
+        self.handler = handler
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rotate_seconds = rotate_seconds
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.formatter = JsonFormatter()
+        self.batches = 0
+        self._file = None
+        self._size = 0
+        self._rollover_at = None
+        self._stop = object()
+        self._thread = None
+
+    def start(self):
+        self._open()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2):
+        if self._thread is None:
+            return
+        try:
+            self.queue.put(self._stop, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return
+        self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        self._rollover_at = time.time() + self.rotate_seconds if self.rotate_seconds else None
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{i}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def _batch(self):
+        records = [self.queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(records) < self.batch_size and records[-1] is not self._stop:
+            try:
+                records.append(self.queue.get_nowait())
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    records.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+        return records
+
+    def _format(self, record):
+        try:
+            return self.formatter.format(record) + "\n"
+        except Exception as e:
+            return json.dumps({"level": "ERROR", "msg": f"Unformattable log record: {e}"}) + "\n"
+
+    def _run(self):
+        while True:
+            records = self._batch()
+            stopping = records[-1] is self._stop
+            if stopping:
+                records.pop()
+            lines = [self._format(record) for record in records]
+            dropped = self.handler.take_dropped() if self.handler is not None else None
+            if dropped:
+                lines.append(json.dumps({
+                    "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                    "level": "WARNING", "logger": "logqueue",
+                    "msg": f"Dropped {sum(dropped.values())} log records under load", "dropped": dropped,
+                }) + "\n")
+            try:
+                self._write("".join(lines).encode("utf-8"))
+            except OSError:
+                pass
+            if stopping:
+                return
+
+    def _write(self, data):
+        if not data:
+            return
+        if (self._rollover_at is not None and time.time() >= self._rollover_at) or \
+                (self.max_bytes and self._size and self._size + len(data) > self.max_bytes):
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        self.batches += 1
+
+
+_context = threading.local()
+
+
+def context_fields():
+    return getattr(_context, "fields", {})
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields (e.g. intent, job) to every record logged on this thread inside the block."""
+    saved = context_fields()
+    _context.fields = dict(saved, **fields)
+    try:
+        yield
+    finally:
+        _context.fields = saved
+
+
+def setup_logging(path="assistant.log", level=logging.DEBUG, queue_size=10000, **writer_options):
+    """Route the root logger through a bounded queue to a rotating JSON log file.
+
+    Returns the writer; it is flushed and closed at interpreter exit.
+    """
+    log_queue = queue.Queue(maxsize=queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    writer = LogWriter(log_queue, path, handler=handler, **writer_options).start()
+    root = logging.getLogger()
+    for old in list(root.handlers):
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+    atexit.register(writer.stop)
+    return writer
@@ -1,19 +1,32 @@
-import tkinter as tk
+import sys
 import logging
-from gui import VoiceAssistantGUI
+from utils import startup_timer
+from logqueue import setup_logging
 
-# Configure logging
-logging.basicConfig(
-    filename="assistant.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+if __name__ == "__main__" and "--headless" in sys.argv:
+    # No display needed: commands come from stdin or a script file
+    from headless import main
+    main([arg for arg in sys.argv[1:] if arg != "--headless"])
+    sys.exit(0)
+
+with startup_timer.phase("import tkinter"):
+    import tkinter as tk
+with startup_timer.phase("import gui"):
+    from gui import VoiceAssistantGUI
+
+# Logging goes through a queue to one writer thread: JSON lines, rotated by size and daily
+log_writer = setup_logging("assistant.log", max_bytes=10 * 1024 * 1024, backups=5, rotate_seconds=24 * 3600)
 
 if __name__ == "__main__":
-    root = tk.Tk()
+    with startup_timer.phase("create Tk root"):
+        root = tk.Tk()
     try:
         gui = VoiceAssistantGUI(root)
+        if "--startup-report" in sys.argv:
+            root.after_idle(lambda: print(startup_timer.report()))
         root.mainloop()
+        gui.config.action_history.close()
+        gui.config.journal.close()
     except Exception as e:
         logging.critical(f"Application error: {e}")
         raise
@@ -0,0 +1,89 @@
+from collections import deque, namedtuple
+
+IntentMatch = namedtuple("IntentMatch", ["start", "end", "keyword", "intent"])
+
+
+class IntentMatcher:
+    """Aho-Corasick automaton over the intent keyword table.
+
+    Built once; every keyword occurrence in an utterance is found in a single
+    pass regardless of how many keywords are loaded. With ``whole_words``
+    (the default) an occurrence only counts on word boundaries, so "copy"
+    does not fire inside "copyright".
+    """
+
+    def __init__(self, keywords=None, whole_words=True):
+        self.whole_words = whole_words
+        self._goto = [{}]
+        self._own = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._size = 0
+        if keywords:
+            self.add_keywords(keywords)
+
+    def __len__(self):
+        return self._size
+
+    def add_keywords(self, keywords):
+        for keyword, intent in keywords.items():
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._own.append({})
+                state = next_state
+            if keyword not in self._own[state]:
+                self._size += 1
+            self._own[state][keyword] = intent
+        self._build()
+
+    def _build(self):
+        # Failure outputs are merged into each state so matching never has to
+        # walk the failure chain to report overlapping keywords.
+        self._fail = [0] * len(self._goto)
+        self._out = [list(own.items()) for own in self._own]
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = list(self._own[child].items()) + self._out[self._fail[child]]
+                queue.append(child)
+
+    def find_all(self, text):
+        text = text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword, intent in out[state]:
+                end = position + 1
+                start = end - len(keyword)
+                if self.whole_words and ((start and text[start - 1].isalnum()) or
+                                         (end < len(text) and text[end].isalnum())):
+                    continue
+                matches.append(IntentMatch(start, end, keyword, intent))
+        return matches
+
+    def best(self, text, accept=None):
+        # accept(text, match) can veto matches, e.g. keywords out of place
+        best = None
+        for match in self.find_all(text):
+            if accept is not None and not accept(text, match):
+                continue
+            if best is None or (len(match.keyword), -match.start) > (len(best.keyword), -best.start):
+                best = match
+        return best
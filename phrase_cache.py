@@ -0,0 +1,178 @@
+import hashlib
+import os
+import re
+import threading
+import wave
+
+from utils import log_action
+
+
+class PhraseCache:
+    """On-disk LRU store of synthesized speech keyed by text, voice and rate.
+
+    Entries are WAV files named ``<rate>_<voice>_<text>.wav`` (hashed), so all
+    entries for one speech rate can be dropped without touching the others.
+    Recency is tracked with the file mtime, which survives restarts.
+    """
+
+    def __init__(self, directory=".voice_cache", max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _digest(value):
+        return hashlib.sha1(str(value).encode("utf-8")).hexdigest()
+
+    def path_for(self, text, voice, rate):
+        name = f"{int(rate)}_{self._digest(voice)[:8]}_{self._digest(text.strip().lower())}.wav"
+        return os.path.join(self.directory, name)
+
+    def get(self, text, voice, rate):
+        path = self.path_for(text, voice, rate)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, text, voice, rate, synthesize):
+        """Store audio produced by ``synthesize(path)`` and return its path."""
+        path = self.path_for(text, voice, rate)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        synthesize(tmp_path)
+        if not os.path.exists(tmp_path) or os.path.getsize(tmp_path) == 0:
+            return None
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".wav"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def invalidate(self, rate=None, voice=None):
+        prefix = "" if rate is None else f"{int(rate)}_"
+        voice_tag = None if voice is None else f"_{self._digest(voice)[:8]}_"
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if not entry.name.startswith(prefix):
+                    continue
+                if voice_tag and voice_tag not in entry.name:
+                    continue
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def splice(paths, out_path):
+        params = None
+        with wave.open(out_path, "wb") as out:
+            for path in paths:
+                with wave.open(path, "rb") as part:
+                    part_params = part.getparams()[:3]
+                    if params is None:
+                        params = part_params
+                        out.setparams(part.getparams())
+                    elif part_params != params:
+                        raise ValueError("Cannot splice fragments with different audio formats")
+                    out.writeframes(part.readframes(part.getnframes()))
+        return out_path
+
+
+def _speakable(fragment):
+    return any(char.isalnum() for char in fragment)
+
+
+class PromptTemplates:
+    """Splits templated prompts into their fixed and variable fragments."""
+
+    def __init__(self, templates=()):
+        self.patterns = []
+        for template in templates:
+            self.add(template)
+
+    def add(self, template):
+        literals = template.split("{}")
+        regex = "(.+?)".join(re.escape(part) for part in literals)
+        self.patterns.append((re.compile(f"^{regex}$", re.IGNORECASE | re.DOTALL), literals))
+
+    def fixed_fragments(self):
+        return [part.strip() for _, literals in self.patterns for part in literals if _speakable(part)]
+
+    def split(self, text):
+        for pattern, literals in self.patterns:
+            match = pattern.match(text)
+            if not match:
+                continue
+            fragments = []
+            for i, literal in enumerate(literals):
+                if _speakable(literal):
+                    fragments.append(literal.strip())
+                if i < len(match.groups()) and _speakable(match.group(i + 1)):
+                    fragments.append(match.group(i + 1).strip())
+            return fragments
+        return None
+
+
+class WavPlayer:
+    """Blocking WAV playback that another thread can stop."""
+
+    def __init__(self):
+        self._current = None
+        self._stopped = threading.Event()
+        self.backend = None
+        try:
+            import winsound
+            self.backend = "winsound"
+            self._winsound = winsound
+        except ImportError:
+            try:
+                import simpleaudio
+                self.backend = "simpleaudio"
+                self._simpleaudio = simpleaudio
+            except ImportError:
+                log_action("No WAV playback backend available; phrase cache disabled")
+
+    @property
+    def available(self):
+        return self.backend is not None
+
+    def play(self, path):
+        self._stopped.clear()
+        if self.backend == "winsound":
+            with wave.open(path, "rb") as wav:
+                duration = wav.getnframes() / wav.getframerate()
+            flags = self._winsound.SND_FILENAME | self._winsound.SND_ASYNC | self._winsound.SND_NODEFAULT
+            self._winsound.PlaySound(path, flags)
+            self._stopped.wait(duration)
+        elif self.backend == "simpleaudio":
+            self._current = self._simpleaudio.WaveObject.from_wave_file(path).play()
+            self._current.wait_done()
+            self._current = None
+
+    def stop(self):
+        self._stopped.set()
+        if self.backend == "winsound":
+            self._winsound.PlaySound(None, 0)
+        elif self._current is not None:
+            self._current.stop()
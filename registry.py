@@ -0,0 +1,155 @@
+import importlib
+import threading
+from collections import namedtuple
+
+from utils import log_action, startup_timer
+
+ENTRY_POINT_GROUP = "voicemate.intents"
+
+# handler is "module:function"; the module is only imported on first dispatch.
+# instant: may run as soon as a partial hypothesis matches (no follow-up input).
+# desktop: drives the shared mouse, keyboard or screen, so runs one at a time.
+# timeout: seconds before the command is reported as timed out (None = default).
+# anchor: "start" if a keyword only counts at the start of the utterance,
+# "whole" if it must be the whole utterance (None = anywhere).
+IntentSpec = namedtuple(
+    "IntentSpec",
+    ["name", "keywords", "handler", "slots", "dependencies", "instant", "desktop", "timeout", "anchor"],
+    defaults=((), (), False, False, None, None),
+)
+
+BUILTIN_INTENTS = (
+    IntentSpec("open_browser", ("open browser",), "intents.apps:open_browser", instant=True),
+    IntentSpec("open_notepad", ("open notepad",), "intents.apps:open_notepad", instant=True),
+    IntentSpec("open_file_explorer", ("open file explorer",), "intents.apps:open_file_explorer", instant=True),
+    IntentSpec("open_calculator", ("open calculator",), "intents.apps:open_calculator", instant=True),
+    IntentSpec("open application", ("open application",), "intents.apps:open_application", slots=("app",)),
+    IntentSpec("close application", ("close application",), "intents.apps:close_application", slots=("app",)),
+    IntentSpec("shutdown", ("shutdown",), "intents.apps:shutdown", timeout=20),
+    IntentSpec("exit_program", ("exit",), "intents.apps:exit_program"),
+    # wikipedia is imported by the wiki cache's provider, which can be swapped out
+    IntentSpec("search_wikipedia", ("search wikipedia",), "intents.web:search_wikipedia", slots=("query",),
+               timeout=20),
+    IntentSpec("open website", ("open website",), "intents.web:open_website", slots=("site",)),
+    IntentSpec("close website", ("close website",), "intents.web:close_website"),
+    IntentSpec("search", ("search online",), "intents.web:search", slots=("query",)),
+    IntentSpec("time", ("time",), "intents.misc:time", instant=True),
+    IntentSpec("show_visualizations", ("show visualizations",), "intents.misc:show_visualizations", instant=True),
+    IntentSpec("screenshot", ("screenshot",), "intents.desktop:screenshot", dependencies=("pyautogui",),
+               instant=True, desktop=True),
+    IntentSpec("move_mouse", ("move mouse",), "intents.desktop:move_mouse", slots=("x", "y"),
+               dependencies=("pyautogui",), desktop=True),
+    IntentSpec("click", ("click",), "intents.desktop:click", dependencies=("pyautogui",), instant=True, desktop=True),
+    IntentSpec("scroll", ("scroll",), "intents.desktop:scroll", slots=("direction",),
+               dependencies=("pyautogui",), desktop=True),
+    # Types whatever follows unconfirmed, so only when the utterance starts with "type"
+    IntentSpec("type", ("type",), "intents.desktop:type_text", slots=("text",),
+               dependencies=("pyautogui",), desktop=True, anchor="start"),
+    IntentSpec("create_a_file", ("create a file",), "intents.files:create_a_file", slots=("filename",)),
+    IntentSpec("list_files", ("list files",), "intents.files:list_files", slots=("directory",)),
+    IntentSpec("copy_file", ("copy file", "copy"), "intents.files:copy_file", slots=("source", "dest"),
+               timeout=4 * 3600),
+    # Matched but without a handler: "delete" is recognized and declined,
+    # "stop" is handled by CommandProcessor.submit before dispatch
+    IntentSpec("delete", ("delete",), None),
+    IntentSpec("stop", ("stop", "cancel"), None, anchor="whole"),
+)
+
+
+class MissingDependency(Exception):
+    def __init__(self, intent, module):
+        super().__init__(f"{intent} needs {module}")
+        self.intent = intent
+        self.module = module
+
+
+class IntentRegistry:
+    """Maps intent ids to their specs and, once resolved, their handlers.
+
+    Dispatch is a dict lookup. A handler's module and declared dependencies
+    are imported the first time the intent runs; third-party packages add
+    intents through the ``voicemate.intents`` entry point group.
+    """
+
+    def __init__(self, specs=BUILTIN_INTENTS):
+        self.specs = {}
+        self._handlers = {}
+        self._lock = threading.Lock()
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec):
+        with self._lock:
+            self.specs[spec.name] = spec
+            self._handlers.pop(spec.name, None)
+
+    def __contains__(self, name):
+        return name in self.specs
+
+    def keywords(self):
+        return {keyword: spec.name for spec in self.specs.values() for keyword in spec.keywords}
+
+    def names(self, flag):
+        # Intent ids with a boolean flag set, e.g. names("instant")
+        return {spec.name for spec in self.specs.values() if getattr(spec, flag)}
+
+    def timeouts(self):
+        return {spec.name: spec.timeout for spec in self.specs.values() if spec.timeout}
+
+    def anchors(self):
+        return {spec.name: spec.anchor for spec in self.specs.values() if spec.anchor}
+
+    def handler(self, name):
+        """The handler callable for ``name``, or None if the intent has none.
+
+        Raises MissingDependency when a declared dependency cannot be imported.
+        """
+        handler = self._handlers.get(name)
+        if handler is not None:
+            return handler
+        spec = self.specs.get(name)
+        if spec is None or spec.handler is None:
+            return None
+        with self._lock:
+            if name not in self._handlers:
+                for dependency in spec.dependencies:
+                    try:
+                        importlib.import_module(dependency)
+                    except Exception as e:
+                        log_action(f"Intent {name} cannot load {dependency}: {e}", "ERROR")
+                        raise MissingDependency(name, dependency)
+                module_name, _, attr = spec.handler.partition(":")
+                with startup_timer.phase(f"import {module_name}"):
+                    module = importlib.import_module(module_name)
+                self._handlers[name] = getattr(module, attr)
+            return self._handlers[name]
+
+    def load_entry_points(self, group=ENTRY_POINT_GROUP):
+        """Register intents from installed packages.
+
+        An entry point may resolve to an IntentSpec, an iterable of them, or
+        a callable that receives the registry.
+        """
+        try:
+            from importlib.metadata import entry_points
+        except ImportError:
+            return 0
+        found = entry_points()
+        points = found.select(group=group) if hasattr(found, "select") else found.get(group, [])
+        count = 0
+        for point in points:
+            try:
+                target = point.load()
+                if isinstance(target, IntentSpec):
+                    self.register(target)
+                    count += 1
+                elif callable(target):
+                    target(self)
+                    count += 1
+                else:
+                    for spec in target:
+                        self.register(spec)
+                        count += 1
+            except Exception as e:
+                log_action(f"Could not load intents from entry point {point.name}: {e}", "ERROR")
+        return count
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+
+from utils import log_action, lazy_import
+
+np = lazy_import("numpy")
+
+
+class RingBuffer:
+    """Fixed-size numpy ring buffer; ``values()`` returns samples oldest first."""
+
+    def __init__(self, size):
+        self.data = np.full(size, np.nan)
+        self.size = size
+        self.index = 0
+        self.count = 0
+
+    def append(self, value):
+        self.data[self.index] = value
+        self.index = (self.index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def values(self):
+        if self.count < self.size:
+            return self.data[:self.count]
+        return np.concatenate((self.data[self.index:], self.data[:self.index]))
+
+    def padded(self):
+        # Full-length view with NaN for missing samples, for fixed-axis plots
+        return np.concatenate((self.data[self.index:], self.data[:self.index]))
+
+    def last(self):
+        return self.data[(self.index - 1) % self.size] if self.count else np.nan
+
+
+class SystemSampler:
+    """Samples system and process CPU, memory and load from /proc.
+
+    The /proc files are kept open and re-read with ``pread`` so each sample
+    costs a handful of syscalls. The sampler measures its own CPU time and
+    exposes it as ``overhead_percent`` (percent of one core); it stays None
+    until a full interval with at least one sample has passed.
+    """
+
+    SERIES = ("cpu_system", "cpu_process", "mem_percent", "rss_mb", "load1")
+
+    def __init__(self, interval=1.0, history=120):
+        self.interval = interval
+        self.history = history
+        self.buffers = {name: RingBuffer(history) for name in self.SERIES}
+        self.overhead_percent = None
+        self.samples = 0
+        self._ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+        self._cpus = os.cpu_count() or 1
+        self._fds = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._prev = None
+
+    @staticmethod
+    def available():
+        return os.path.exists("/proc/stat") and os.path.exists("/proc/self/stat")
+
+    def _read(self, path):
+        fd = self._fds.get(path)
+        if fd is None:
+            fd = self._fds[path] = os.open(path, os.O_RDONLY)
+        return os.pread(fd, 8192, 0).decode("ascii", "replace")
+
+    def _system_cpu(self):
+        fields = self._read("/proc/stat").split("\n", 1)[0].split()[1:]
+        values = [int(v) for v in fields]
+        idle = values[3] + (values[4] if len(values) > 4 else 0)
+        return sum(values[:8]), idle
+
+    def _process_cpu(self):
+        stat = self._read(f"/proc/{os.getpid()}/stat")
+        fields = stat.rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self._ticks
+
+    def _rss_mb(self):
+        resident = int(self._read(f"/proc/{os.getpid()}/statm").split()[1])
+        return resident * self._page_size / (1024 * 1024)
+
+    def _mem_percent(self):
+        info = {}
+        for line in self._read("/proc/meminfo").splitlines():
+            key, _, value = line.partition(":")
+            if key in ("MemTotal", "MemAvailable"):
+                info[key] = int(value.split()[0])
+                if len(info) == 2:
+                    break
+        total = info.get("MemTotal")
+        return 100.0 * (1 - info.get("MemAvailable", 0) / total) if total else np.nan
+
+    def _load1(self):
+        return float(self._read("/proc/loadavg").split()[0])
+
+    def sample(self):
+        now = time.monotonic()
+        total, idle = self._system_cpu()
+        process = self._process_cpu()
+        if self._prev is not None:
+            prev_now, prev_total, prev_idle, prev_process = self._prev
+            busy = (total - prev_total) - (idle - prev_idle)
+            cpu_system = 100.0 * busy / max(1, total - prev_total)
+            cpu_process = 100.0 * (process - prev_process) / max(1e-9, now - prev_now) / self._cpus
+            with self._lock:
+                self.buffers["cpu_system"].append(cpu_system)
+                self.buffers["cpu_process"].append(cpu_process)
+                self.buffers["mem_percent"].append(self._mem_percent())
+                self.buffers["rss_mb"].append(self._rss_mb())
+                self.buffers["load1"].append(self._load1())
+                self.samples += 1
+        self._prev = (now, total, idle, process)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: buffer.padded() for name, buffer in self.buffers.items()}
+
+    def latest(self):
+        with self._lock:
+            return {name: buffer.last() for name, buffer in self.buffers.items()}
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+
+    def _run(self):
+        started_wall = time.monotonic()
+        started_cpu = time.thread_time()
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except (OSError, ValueError, IndexError) as e:
+                log_action(f"System sampling failed: {e}", "ERROR")
+            wall = time.monotonic() - started_wall
+            # Over a shorter window the start-up cost reads as a huge percentage
+            if self.samples and wall >= self.interval:
+                self.overhead_percent = 100.0 * (time.thread_time() - started_cpu) / wall
+            self._stop.wait(self.interval)
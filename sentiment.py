@@ -0,0 +1,219 @@
+import math
+import os
+import re
+import struct
+import threading
+from collections import Counter, OrderedDict, deque
+
+from utils import log_action
+
+# Small valence lexicon tuned for talking to an assistant (-3 very negative .. +3 very positive)
+LEXICON = {
+    "good": 1.9, "great": 3.1, "awesome": 3.1, "excellent": 3.2, "amazing": 2.8, "perfect": 2.7,
+    "nice": 1.8, "cool": 1.3, "love": 3.2, "like": 1.5, "thanks": 1.9, "thank": 1.5,
+    "please": 0.3, "happy": 2.7, "glad": 2.0, "helpful": 1.8, "works": 1.0, "worked": 1.0,
+    "done": 0.6, "success": 2.7, "successfully": 2.4, "correct": 1.3, "right": 0.9, "fine": 0.8,
+    "fast": 1.0, "easy": 1.9, "yes": 0.6, "sure": 1.0, "welcome": 2.0, "hello": 0.6, "enjoy": 2.2,
+    "bad": -2.5, "terrible": -3.0, "awful": -3.1, "horrible": -3.1, "hate": -2.7, "wrong": -2.1,
+    "error": -1.7, "errors": -1.7, "failed": -2.3, "fail": -2.2, "failure": -2.3, "broken": -2.0,
+    "sorry": -0.7, "slow": -1.2, "stupid": -2.4, "useless": -2.3, "annoying": -1.9, "problem": -1.7,
+    "problems": -1.7, "couldn't": -1.0, "cannot": -0.8, "can't": -0.8, "unable": -1.4,
+    "no": -0.9, "stop": -0.5, "crash": -2.2, "crashed": -2.2, "missing": -1.0, "lost": -1.3,
+    "angry": -2.3, "sad": -2.1, "unfortunately": -1.5, "timeout": -1.5,
+}
+NEGATIONS = {"not", "no", "never", "don't", "doesn't", "didn't", "isn't", "wasn't", "won't", "n't", "without"}
+INTENSIFIERS = {"very": 0.3, "really": 0.3, "so": 0.2, "extremely": 0.4, "super": 0.3, "quite": 0.1,
+                "slightly": -0.3, "somewhat": -0.2, "barely": -0.4}
+WORD_RE = re.compile(r"[a-z']+")
+
+LABELS = ("positive", "neutral", "negative")
+
+# Journal offset just past the scored event, timestamp, kind index, score
+SCORE_RECORD = struct.Struct("<QdBf")
+
+
+def score_words(words):
+    """Compound valence in [-1, 1] with negation and intensifier handling."""
+    total = 0.0
+    for i, word in enumerate(words):
+        valence = LEXICON.get(word)
+        if not valence:
+            continue
+        for j, previous in enumerate(reversed(words[max(0, i - 3):i])):
+            boost = INTENSIFIERS.get(previous)
+            if boost and j == 0:
+                valence += math.copysign(boost, valence)
+            if previous in NEGATIONS:
+                valence *= -0.74
+                break
+        total += valence
+    return total / math.sqrt(total * total + 15)
+
+
+def label(score):
+    if score >= 0.05:
+        return "positive"
+    if score <= -0.05:
+        return "negative"
+    return "neutral"
+
+
+class SentimentScorer:
+    """Lexicon sentiment scorer with a per-utterance LRU memo.
+
+    Batches are tokenized with the spaCy tokenizer alone when the pipeline
+    is loaded (the lexicon needs no tags or parses), otherwise with a
+    regular expression.
+    """
+
+    def __init__(self, nlp_provider=None, cache_size=4096):
+        self.nlp_provider = nlp_provider or (lambda: None)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def score(self, text):
+        return self.score_batch([text])[0]
+
+    def score_batch(self, texts):
+        with self._lock:
+            pending = [t for t in dict.fromkeys(texts) if t not in self._cache]
+        if pending:
+            nlp = self.nlp_provider()
+            if nlp is not None:
+                tokenized = [[t.lower_ for t in doc] for doc in nlp.tokenizer.pipe(pending)]
+            else:
+                tokenized = [WORD_RE.findall(text.lower()) for text in pending]
+            # spaCy splits "don't" into "do" + "n't", which NEGATIONS covers
+            scores = [score_words(words) for words in tokenized]
+            with self._lock:
+                for text, value in zip(pending, scores):
+                    self._cache[text] = value
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        results = []
+        with self._lock:
+            for text in texts:
+                value = self._cache.get(text)
+                if value is None:
+                    value = score_words(WORD_RE.findall(text.lower()))
+                else:
+                    self._cache.move_to_end(text)
+                results.append(value)
+        return results
+
+
+class SentimentTracker:
+    """Scores journaled user and assistant lines in the background.
+
+    The tracker follows the journal from a byte offset, so every line is
+    scored exactly once, then new lines in batches as they are appended.
+    Scores are appended to a sidecar file (``<journal>.sentiment``), so a
+    restart reloads them and only scores what was journaled since. Label
+    counts cover everything scored; the time series keeps the most recent
+    ``history`` points.
+    """
+
+    KINDS = ("user", "assistant")
+
+    def __init__(self, journal, scorer, batch_size=64, history=20000, path=None):
+        self.journal = journal
+        self.path = path or f"{journal.path}.sentiment"
+        self.scorer = scorer
+        self.batch_size = batch_size
+        self.points = deque(maxlen=history)  # (timestamp, kind, score)
+        self.counts = {kind: Counter() for kind in self.KINDS}
+        self.version = 0
+        self._offset = 0
+        self._file = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        usable = len(data) - len(data) % SCORE_RECORD.size
+        records = list(SCORE_RECORD.iter_unpack(data[:usable]))
+        if records and records[-1][0] > os.path.getsize(self.journal.path):
+            # The journal was replaced or cut short; score it again from scratch
+            log_action(f"{self.path} is ahead of the journal, rescoring")
+            records, usable = [], 0
+        with self._lock:
+            for offset, timestamp, code, score in records:
+                kind = self.KINDS[code]
+                self.points.append((timestamp, kind, score))
+                self.counts[kind][label(score)] += 1
+            self.version += 1
+        if records:
+            self._offset = records[-1][0]
+        self._file = open(self.path, "ab")
+        if usable < len(data):
+            self._file.truncate(usable)
+
+    def start(self):
+        if self._thread is None:
+            try:
+                self._load()
+            except OSError as e:
+                log_action(f"Could not load saved sentiment scores: {e}", "ERROR")
+            self.journal.subscribe(self._on_event)
+            self._wake.set()
+            self._thread = threading.Thread(target=self._run, name="sentiment", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self.journal.unsubscribe(self._on_event)
+        self._stop.set()
+        self._wake.set()
+
+    def _on_event(self, timestamp, kind, fields):
+        if kind in self.KINDS:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            try:
+                self._catch_up()
+            except (OSError, ValueError) as e:
+                log_action(f"Sentiment scoring failed: {e}", "ERROR")
+
+    def _catch_up(self):
+        batch = []
+        for offset, timestamp, kind, payload in self.journal.read_from(self._offset, kinds=self.KINDS):
+            batch.append((offset, timestamp, kind, payload["text"]))
+            if len(batch) >= self.batch_size:
+                self._score(batch)
+                batch = []
+        if batch:
+            self._score(batch)
+
+    def _score(self, batch):
+        scores = self.scorer.score_batch([text for _, _, _, text in batch])
+        with self._lock:
+            for (_, timestamp, kind, _), score in zip(batch, scores):
+                self.points.append((timestamp, kind, score))
+                self.counts[kind][label(score)] += 1
+            self.version += 1
+        self._offset = batch[-1][0]
+        if self._file is not None:
+            self._file.write(b"".join(SCORE_RECORD.pack(offset, timestamp, self.KINDS.index(kind), score)
+                                      for (offset, timestamp, kind, _), score in zip(batch, scores)))
+            self._file.flush()
+
+    def summary(self, kind=None):
+        """Label counts for one speaker, or both when ``kind`` is None."""
+        with self._lock:
+            kinds = self.KINDS if kind is None else (kind,)
+            return [sum(self.counts[k][name] for k in kinds) for name in LABELS]
+
+    def series(self):
+        with self._lock:
+            return list(self.points)
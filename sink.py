@@ -0,0 +1,109 @@
+import threading
+
+
+class OutputSink:
+    """Everything the command engine needs from its front end.
+
+    ``CommandProcessor`` only talks to a sink: it never touches Tk directly.
+    Methods may be called from worker threads; implementations marshal to
+    their UI thread as needed. The defaults do nothing, so a front end only
+    overrides what it can show.
+    """
+
+    config = None
+    nlp = None
+    expecting_name = False
+    listening = False
+    # False when there is no microphone to ask follow-up questions with
+    can_listen = True
+
+    def assistant_speaks(self, text, urgent=False):
+        pass
+
+    def user_says(self, text):
+        pass
+
+    def call_soon(self, func, *args, key=None):
+        # Run func on the UI thread; a pending call with the same key is replaced
+        func(*args)
+
+    def interrupt_speech(self):
+        pass
+
+    def input_unavailable(self):
+        # A command asked for an answer this front end cannot listen for
+        pass
+
+    def is_speaking(self):
+        # True while text-to-speech is playing or queued, so capture can ignore it
+        return False
+
+    def on_command_update(self, job):
+        pass
+
+    def listening_stopped(self):
+        self.listening = False
+
+    def hands_free_status(self, stats):
+        # Periodic CPU and gate counters from HandsFreeListener.stats()
+        pass
+
+    def screen_region(self):
+        # (x, y, width, height) to capture for screenshots, None for the whole screen
+        return None
+
+    def show_file_explorer(self, directory):
+        pass
+
+    def show_copy_progress(self, job, source, dest):
+        pass
+
+    def update_copy_progress(self, job_id, done, total, rate, eta):
+        pass
+
+    def close_copy_progress(self, job_id):
+        pass
+
+    def show_visualizations(self):
+        pass
+
+    def quit(self):
+        pass
+
+
+class HeadlessSink(OutputSink):
+    """Sink without a UI: collects the replies of the command running on each thread."""
+
+    can_listen = False
+
+    def __init__(self, config):
+        self.config = config
+        self.quit_requested = threading.Event()
+        self._local = threading.local()
+
+    def begin(self):
+        self._local.responses = []
+        self._local.unanswered = []
+
+    def input_unavailable(self):
+        # The last thing said is the question nobody can answer
+        responses = getattr(self._local, "responses", None)
+        unanswered = getattr(self._local, "unanswered", None)
+        if unanswered is not None:
+            unanswered.append(responses[-1] if responses else "")
+
+    def unanswered(self):
+        return list(getattr(self._local, "unanswered", None) or [])
+
+    def end(self):
+        responses = getattr(self._local, "responses", [])
+        self._local.responses = None
+        return responses
+
+    def assistant_speaks(self, text, urgent=False):
+        responses = getattr(self._local, "responses", None)
+        if responses is not None and text:
+            responses.append(text)
+
+    def quit(self):
+        self.quit_requested.set()
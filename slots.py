@@ -0,0 +1,151 @@
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+Token = namedtuple("Token", ["text", "idx", "pos", "like_num", "ent_type"])
+
+# Filler words that may sit between the intent keyword and the slot value
+# ("search wikipedia FOR alan turing", "list files IN downloads").
+FILLER = {"for", "about", "on", "in", "from", "of", "the", "a", "an", "to", "named", "called", "me", "please"}
+FILLER_POS = {"ADP", "DET"}
+
+NUMBER_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "hundred": 100, "thousand": 1000,
+}
+
+class SlotExtractor:
+    """Pulls intent parameters out of the utterance that triggered the intent.
+
+    The text after the matched keyword is analyzed with the spaCy pipeline
+    when it is loaded (falling back to a plain whitespace tokenizer), and the
+    analysis is memoized per utterance remainder.
+    """
+
+    def __init__(self, nlp_provider=None, cache_size=1024):
+        self.nlp_provider = nlp_provider or (lambda: None)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, text, tokens):
+        with self._lock:
+            self._cache[text] = tokens
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cached(self, text):
+        with self._lock:
+            tokens = self._cache.get(text)
+            if tokens is not None:
+                self._cache.move_to_end(text)
+            return tokens
+
+    @staticmethod
+    def _from_doc(doc):
+        return tuple(Token(t.text, t.idx, t.pos_, t.like_num, t.ent_type_) for t in doc)
+
+    @staticmethod
+    def _split(text):
+        return tuple(Token(m.group(), m.start(), "", m.group().isdigit() or m.group() in NUMBER_WORDS, "")
+                     for m in re.finditer(r"\S+", text))
+
+    def analyze(self, text):
+        tokens = self._cached(text)
+        if tokens is None:
+            nlp = self.nlp_provider()
+            tokens = self._from_doc(nlp(text)) if nlp is not None else self._split(text)
+            self._remember(text, tokens)
+        return tokens
+
+    def analyze_batch(self, texts):
+        pending = [t for t in dict.fromkeys(texts) if self._cached(t) is None]
+        nlp = self.nlp_provider()
+        if pending and nlp is not None:
+            for text, doc in zip(pending, nlp.pipe(pending)):
+                self._remember(text, self._from_doc(doc))
+        return [self.analyze(t) for t in texts]
+
+    def extract(self, intent, command, match=None):
+        return self.extract_batch([(intent, command, match)])[0]
+
+    def extract_batch(self, items):
+        """``items`` are ``(intent, command, match)``; returns one slot dict each."""
+        remainders = [self._remainder(command, match) for _, command, match in items]
+        analyses = self.analyze_batch(remainders)
+        results = []
+        for (intent, _, _), text, tokens in zip(items, remainders, analyses):
+            handler = getattr(self, f"_slots_{intent.replace(' ', '_')}", None)
+            slots = handler(text, tokens) if handler and text else {}
+            results.append({k: v for k, v in slots.items() if v not in (None, "")})
+        return results
+
+    @staticmethod
+    def _remainder(command, match):
+        if match is None:
+            return command.strip()
+        return command[match.end:].strip(" ,.?!")
+
+    @staticmethod
+    def _strip_filler(text, tokens):
+        start = 0
+        for token in tokens:
+            if token.text.lower() in FILLER or (token.pos in FILLER_POS and not token.ent_type):
+                start = token.idx + len(token.text)
+                continue
+            break
+        return text[start:].strip(" ,.?!")
+
+    def _value(self, text, tokens):
+        return self._strip_filler(text, tokens)
+
+    def _slots_open_website(self, text, tokens):
+        site = self._value(text, tokens).lower()
+        site = re.sub(r"\s+dot\s+", ".", site).replace(" ", "")
+        return {"site": site}
+
+    def _slots_search(self, text, tokens):
+        return {"query": self._value(text, tokens)}
+
+    _slots_search_wikipedia = _slots_search
+
+    def _slots_open_application(self, text, tokens):
+        return {"app": self._value(text, tokens)}
+
+    _slots_close_application = _slots_open_application
+
+    def _slots_copy_file(self, text, tokens):
+        value = self._value(text, tokens)
+        source, sep, dest = value.rpartition(" to ")
+        if not sep:
+            return {"source": value}
+        return {"source": source.strip(), "dest": self._strip_filler(dest, self._split(dest))}
+
+    def _slots_list_files(self, text, tokens):
+        return {"directory": self._value(text, tokens)}
+
+    def _slots_move_mouse(self, text, tokens):
+        numbers = []
+        for token in tokens:
+            word = token.text.lower().strip(",()")
+            if word.isdigit():
+                numbers.append(int(word))
+            elif word in NUMBER_WORDS:
+                numbers.append(NUMBER_WORDS[word])
+        if len(numbers) < 2:
+            return {}
+        return {"x": numbers[0], "y": numbers[1]}
+
+    def _slots_type(self, text, tokens):
+        # Text to type is taken verbatim; only a leading filler word is dropped.
+        first, _, rest = text.partition(" ")
+        return {"text": rest if first.lower() in ("in", "out") and rest else text}
+
+    def _slots_create_a_file(self, text, tokens):
+        return {"filename": self._value(text, tokens)}
+
+    def _slots_scroll(self, text, tokens):
+        words = {token.text.lower() for token in tokens}
+        direction = "up" if "up" in words else "down" if "down" in words else None
+        return {"direction": direction}
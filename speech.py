@@ -0,0 +1,197 @@
+import itertools
+import os
+import queue
+import threading
+
+from utils import log_action, lazy_import
+from tracing import tracer
+
+pyttsx3 = lazy_import("pyttsx3")
+
+
+class SpeechWorker:
+    """Owns the pyttsx3 engine and speaks queued utterances on its own thread.
+
+    ``say`` returns immediately. Urgent utterances jump the queue, discard
+    anything still waiting and cut off the sentence currently being spoken;
+    ``interrupt`` does the same without queueing anything new (used for
+    barge-in when the user starts talking).
+    """
+
+    URGENT = 0
+    NORMAL = 1
+    BACKGROUND = 2
+    _CONTROL = -1
+
+    def __init__(self, rate=150, volume=0.9, driver='sapi5', cache=None, templates=None, player=None):
+        self.rate = rate
+        self.volume = volume
+        self.driver = driver
+        self.cache = cache
+        self.templates = templates
+        self.player = player
+        self._warm_phrases = []
+        self.engine = None
+        self.speaking = False
+        # Utterances queued but not yet spoken or discarded
+        self._pending = 0
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._interrupted = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="speech-worker", daemon=True)
+            self._thread.start()
+        return self
+
+    def shutdown(self):
+        self._put(self._CONTROL, None)
+
+    def say(self, text, urgent=False):
+        if not text:
+            return
+        if urgent:
+            self.interrupt()
+        with self._lock:
+            self._pending += 1
+        self._put(self.URGENT if urgent else self.NORMAL, text)
+
+    @property
+    def busy(self):
+        # True while anything is being said or is still waiting to be said
+        return self.speaking or self._pending > 0
+
+    def interrupt(self):
+        with self._lock:
+            self._generation += 1
+        self._interrupted.set()
+        if self.player is not None:
+            self.player.stop()
+
+    def set_rate(self, rate):
+        if int(rate) == int(self.rate):
+            return
+        old_rate, self.rate = self.rate, rate
+        self._put(self._CONTROL, lambda engine: engine.setProperty('rate', rate))
+        if self.cache is not None:
+            self.cache.invalidate(rate=old_rate)
+            self.warm_up(self._warm_phrases)
+
+    @property
+    def caching(self):
+        return self.cache is not None and self.player is not None and self.player.available
+
+    def warm_up(self, phrases):
+        # Synthesized on the worker thread whenever nothing else is queued.
+        if not self.caching:
+            return
+        self._warm_phrases = list(phrases)
+        phrases = list(self._warm_phrases)
+        if self.templates is not None:
+            phrases += self.templates.fixed_fragments()
+        for phrase in dict.fromkeys(phrases):
+            self._put(self.BACKGROUND, lambda engine, phrase=phrase: self._warm(phrase))
+
+    def _warm(self, phrase):
+        self._interrupted.clear()
+        self._cached(phrase)
+
+    def run_on_engine(self, func):
+        # Engine calls must happen on the worker thread that created it.
+        self._put(self._CONTROL, func)
+
+    def _put(self, priority, item):
+        with self._lock:
+            generation = self._generation
+        self._queue.put((priority, next(self._seq), generation, item))
+
+    def _init_engine(self):
+        try:
+            engine = pyttsx3.init(self.driver)
+            engine.setProperty("rate", self.rate)
+            engine.setProperty("volume", self.volume)
+            engine.connect('started-word', self._on_word)
+            return engine
+        except Exception as e:
+            log_action(f"Failed to initialize TTS engine: {e}", "ERROR")
+            return None
+
+    def _on_word(self, name, location, length):
+        if self._interrupted.is_set():
+            self.engine.stop()
+
+    def _run(self):
+        self.engine = self._init_engine()
+        while True:
+            priority, _, generation, item = self._queue.get()
+            if item is None:
+                break
+            if callable(item):
+                if self.engine is not None:
+                    try:
+                        item(self.engine)
+                    except Exception as e:
+                        log_action(f"Error in text-to-speech control: {e}", "ERROR")
+                continue
+            self._interrupted.clear()
+            with self._lock:
+                stale = generation < self._generation
+                self.speaking = not stale and self.engine is not None
+                self._pending -= 1
+            if not self.speaking:
+                continue
+            try:
+                with tracer.span("tts"):
+                    self.speak(item)
+            except Exception as e:
+                log_action(f"Error in text-to-speech: {e}", "ERROR")
+            finally:
+                self.speaking = False
+
+    def speak(self, text):
+        path = self._cached_audio(text) if self.caching else None
+        if path is not None:
+            if not self._interrupted.is_set():
+                self.player.play(path)
+            return
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def _voice(self):
+        return self.engine.getProperty('voice')
+
+    def _synthesize(self, text, path):
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+        if self._interrupted.is_set() and os.path.exists(path):
+            # Cut off mid-synthesis; never cache truncated audio.
+            os.remove(path)
+
+    def _cached(self, text):
+        voice, rate = self._voice(), self.rate
+        path = self.cache.get(text, voice, rate)
+        if path is None:
+            path = self.cache.put(text, voice, rate, lambda p: self._synthesize(text, p))
+        return path
+
+    def _cached_audio(self, text):
+        voice, rate = self._voice(), self.rate
+        path = self.cache.get(text, voice, rate)
+        if path is not None:
+            return path
+        fragments = self.templates.split(text) if self.templates is not None else None
+        if not fragments:
+            return None
+        # Fixed fragments are warm; only the variable parts need synthesizing.
+        paths = [self._cached(fragment) for fragment in fragments]
+        if None in paths:
+            return None
+        try:
+            return self.cache.put(text, voice, rate, lambda p: self.cache.splice(paths, p))
+        except (ValueError, OSError) as e:
+            log_action(f"Could not splice cached phrases: {e}", "ERROR")
+            return None
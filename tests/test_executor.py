@@ -0,0 +1,112 @@
+import threading
+import time
+
+from executor import CommandExecutor, Job
+
+
+def wait_done(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.finished_at is not None
+
+
+def test_result_and_failure_status():
+    executor = CommandExecutor(max_workers=2)
+    try:
+        ok = executor.submit("ok", lambda: "done")
+        declined = executor.submit("declined", lambda: False)
+        broken = executor.submit("broken", lambda: 1 / 0)
+        for job in (ok, declined, broken):
+            wait_done(job)
+        assert (ok.status, ok.result) == ("completed", "done")
+        assert declined.status == "failed"
+        assert broken.status == "failed" and isinstance(broken.error, ZeroDivisionError)
+    finally:
+        executor.shutdown()
+
+
+def test_cancel_running_job_cooperatively():
+    executor = CommandExecutor(max_workers=1)
+    started = threading.Event()
+
+    def handler():
+        started.set()
+        while True:
+            executor.check_cancelled()
+            time.sleep(0.01)
+
+    try:
+        job = executor.submit("loop", handler)
+        assert started.wait(5)
+        assert executor.cancel() == 1
+        wait_done(job)
+        assert job.status == "cancelled"
+        assert executor.stats()["cancelled"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_cancel_queued_job_never_runs():
+    executor = CommandExecutor(max_workers=1)
+    release = threading.Event()
+    ran = []
+    try:
+        blocker = executor.submit("blocker", release.wait)
+        queued = executor.submit("queued", lambda: ran.append(True))
+        assert executor.cancel(lambda job: job.name == "queued") == 1
+        release.set()
+        wait_done(blocker)
+        wait_done(queued)
+        assert queued.status == "cancelled" and not ran
+        assert blocker.status == "completed"
+    finally:
+        executor.shutdown()
+
+
+def test_timeout_is_reported_and_stops_cooperative_handler():
+    executor = CommandExecutor(max_workers=1)
+    updates = []
+    executor.on_update = lambda job: updates.append(job.status)
+
+    def handler():
+        while True:
+            executor.check_cancelled()
+            time.sleep(0.01)
+
+    try:
+        job = executor.submit("slow", handler, timeout=0.1)
+        wait_done(job)
+        assert job.status == "timed out"
+        assert "timed out" in updates
+        assert executor.stats()["timed out"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_cancel_between_dequeue_and_start_is_kept():
+    executor = CommandExecutor(max_workers=1)
+    ran = []
+    original = Job.start
+
+    def cancelled_first(job):
+        job.cancel()  # lands after the worker picked the job up
+        return original(job)
+
+    Job.start = cancelled_first
+    try:
+        job = executor.submit("raced", lambda: ran.append(True))
+        wait_done(job)
+    finally:
+        Job.start = original
+        executor.shutdown()
+    assert job.status == "cancelled" and not ran
+    assert executor.stats()["running"] == 0 and executor.stats()["cancelled"] == 1
+
+
+def test_settle_does_not_override_timeout():
+    job = Job(1, "slow", timeout=1)
+    assert job.start()
+    job.cancel("timed out")
+    job.settle("completed")
+    assert job.status == "timed out"
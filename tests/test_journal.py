@@ -0,0 +1,55 @@
+import time
+
+from journal import EventJournal, HEADER
+
+
+def test_round_trip(tmp_path):
+    journal = EventJournal(str(tmp_path / "events.journal"), index_every=4)
+    for i in range(10):
+        journal.append("user", f"command {i}", intent="time")
+    journal.append("assistant", "It is noon")
+    journal.close()
+
+    reopened = EventJournal(str(tmp_path / "events.journal"), index_every=4)
+    events = list(reopened.query())
+    assert [payload["text"] for _, _, payload in events] == [f"command {i}" for i in range(10)] + ["It is noon"]
+    assert events[0][2]["intent"] == "time"
+    assert [kind for _, kind, _ in reopened.query(kinds=["assistant"])] == ["assistant"]
+    timestamps = [timestamp for timestamp, _, _ in events]
+    assert timestamps == sorted(timestamps)
+    assert reopened.bounds() == (timestamps[0], timestamps[-1])
+    reopened.close()
+
+
+def test_time_range_query(tmp_path):
+    journal = EventJournal(str(tmp_path / "events.journal"), index_every=2)
+    journal.append("user", "early")
+    time.sleep(0.02)
+    middle = time.time()
+    journal.append("user", "late")
+    assert [payload["text"] for _, _, payload in journal.query(start=middle)] == ["late"]
+    assert [payload["text"] for _, _, payload in journal.query(end=middle)] == ["early"]
+    journal.close()
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    path = tmp_path / "events.journal"
+    journal = EventJournal(str(path))
+    journal.append("user", "kept")
+    journal.close()
+    with open(path, "ab") as f:
+        f.write(HEADER.pack(time.time(), 0, 100) + b"{\"text\":")
+
+    reopened = EventJournal(str(path))
+    reopened.append("user", "after")
+    assert [payload["text"] for _, _, payload in reopened.query()] == ["kept", "after"]
+    reopened.close()
+
+
+def test_read_from_resumes(tmp_path):
+    journal = EventJournal(str(tmp_path / "events.journal"))
+    journal.append("user", "one")
+    offset = list(journal.read_from(0))[-1][0]
+    journal.append("user", "two")
+    assert [payload["text"] for _, _, _, payload in journal.read_from(offset)] == ["two"]
+    journal.close()
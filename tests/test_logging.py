@@ -0,0 +1,15 @@
+import logging
+
+from utils import log_action
+
+
+def test_log_action_levels(caplog):
+    with caplog.at_level(logging.DEBUG):
+        log_action("upper", "WARNING")
+        log_action("lower", "error")
+        log_action("unknown", "SUCCESS")
+        log_action("not a level", "basic_format")
+    assert [(record.msg, record.levelno) for record in caplog.records] == [
+        ("upper", logging.WARNING), ("lower", logging.ERROR),
+        ("unknown", logging.INFO), ("not a level", logging.INFO),
+    ]
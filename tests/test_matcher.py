@@ -0,0 +1,33 @@
+from matcher import IntentMatcher
+from registry import IntentRegistry
+
+
+def test_finds_every_keyword():
+    matcher = IntentMatcher({"open notepad": "open_notepad", "notepad": "notepad", "time": "time"})
+    found = {(match.keyword, match.start) for match in matcher.find_all("Open Notepad, what time is it")}
+    assert found == {("open notepad", 0), ("notepad", 5), ("time", 19)}
+
+
+def test_longest_keyword_wins():
+    matcher = IntentMatcher({"open": "open", "open notepad": "open_notepad"})
+    assert matcher.best("please open notepad").intent == "open_notepad"
+
+
+def test_whole_words_only():
+    matcher = IntentMatcher({"copy": "copy_file", "stop": "stop"})
+    assert matcher.best("copyright notice") is None
+    assert matcher.best("nonstop music") is None
+    assert matcher.best("copy this").intent == "copy_file"
+    assert IntentMatcher({"copy": "copy_file"}, whole_words=False).best("copyright") is not None
+
+
+def test_accept_can_veto():
+    matcher = IntentMatcher({"open": "open", "open notepad": "open_notepad"})
+    match = matcher.best("open notepad", accept=lambda text, match: match.intent != "open_notepad")
+    assert match.intent == "open"
+
+
+def test_builtin_keywords():
+    matcher = IntentMatcher(IntentRegistry().keywords())
+    assert matcher.best("search wikipedia for alan turing").intent == "search_wikipedia"
+    assert matcher.best("hello there") is None
@@ -0,0 +1,63 @@
+import time
+
+from journal import EventJournal
+from sentiment import SentimentScorer, SentimentTracker
+
+
+class CountingScorer(SentimentScorer):
+    def __init__(self):
+        super().__init__()
+        self.scored = []
+
+    def score_batch(self, texts):
+        self.scored.extend(texts)
+        return super().score_batch(texts)
+
+
+def wait_for(tracker, points, timeout=5):
+    deadline = time.monotonic() + timeout
+    while len(tracker.series()) < points and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return tracker.series()
+
+
+def test_scores_survive_restart(tmp_path):
+    journal = EventJournal(str(tmp_path / "events.journal"))
+    journal.append("user", "this is great, thanks")
+    journal.append("intent", "time")
+    journal.append("assistant", "sorry, that failed")
+    first = SentimentTracker(journal, CountingScorer()).start()
+    assert len(wait_for(first, 2)) == 2
+    first.stop()
+
+    journal.append("user", "never mind")
+    scorer = CountingScorer()
+    second = SentimentTracker(journal, scorer).start()
+    series = wait_for(second, 3)
+    second.stop()
+    journal.close()
+    assert [kind for _, kind, _ in series] == ["user", "assistant", "user"]
+    assert scorer.scored == ["never mind"]
+    assert second.summary() == [1, 1, 1]
+
+
+def test_rescores_when_journal_is_replaced(tmp_path):
+    path = str(tmp_path / "events.journal")
+    journal = EventJournal(path)
+    journal.append("user", "a fairly long line that is great")
+    tracker = SentimentTracker(journal, CountingScorer()).start()
+    wait_for(tracker, 1)
+    tracker.stop()
+    journal.close()
+
+    (tmp_path / "events.journal").unlink()
+    (tmp_path / "events.journal.idx").unlink()
+    journal = EventJournal(path)
+    journal.append("user", "bad")
+    scorer = CountingScorer()
+    tracker = SentimentTracker(journal, scorer).start()
+    assert len(wait_for(tracker, 1)) == 1
+    tracker.stop()
+    journal.close()
+    assert scorer.scored == ["bad"]
+    assert tracker.summary() == [0, 0, 1]
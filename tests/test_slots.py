@@ -0,0 +1,52 @@
+from matcher import IntentMatcher
+from slots import SlotExtractor
+
+KEYWORDS = {
+    "search wikipedia": "search_wikipedia",
+    "copy file": "copy_file",
+    "move mouse": "move_mouse",
+    "open website": "open website",
+    "type": "type",
+    "scroll": "scroll",
+}
+
+
+def extract(command):
+    match = IntentMatcher(KEYWORDS).best(command)
+    return SlotExtractor().extract(match.intent, command, match)
+
+
+def test_filler_is_dropped():
+    assert extract("search wikipedia for alan turing") == {"query": "alan turing"}
+
+
+def test_copy_source_and_dest():
+    assert extract("copy file report.txt to the backup folder") == {"source": "report.txt", "dest": "backup folder"}
+    assert extract("copy file report.txt") == {"source": "report.txt"}
+
+
+def test_mouse_coordinates_from_words_and_digits():
+    assert extract("move mouse to ten, 5") == {"x": 10, "y": 5}
+    assert extract("move mouse to 10, 20") == {"x": 10, "y": 20}
+    assert extract("move mouse somewhere") == {}
+
+
+def test_website_is_normalized():
+    assert extract("open website example dot com") == {"site": "example.com"}
+
+
+def test_typed_text_is_verbatim():
+    assert extract("type in Hello, World") == {"text": "Hello, World"}
+
+
+def test_missing_slots_are_omitted():
+    assert extract("scroll") == {}
+    assert extract("scroll up a bit") == {"direction": "up"}
+
+
+def test_batch_matches_single():
+    matcher = IntentMatcher(KEYWORDS)
+    commands = ["search wikipedia for python", "copy file a to b", "type hi"]
+    items = [(matcher.best(c).intent, c, matcher.best(c)) for c in commands]
+    extractor = SlotExtractor()
+    assert extractor.extract_batch(items) == [extractor.extract(*item) for item in items]
@@ -0,0 +1,190 @@
+import bisect
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils import log_action
+
+# Bucket upper bounds in seconds, roughly log-spaced from 1 ms to 2 minutes
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class LatencyHistogram:
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        # Linear interpolation inside the bucket that holds the q-th sample
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+
+class Span:
+    def __init__(self, stage, intent):
+        self.stage = stage
+        self.intent = intent
+        self.ok = True
+
+
+class Tracer:
+    """Per-stage latency spans for voice turns, aggregated into histograms.
+
+    Stages are ``capture``, ``recognition``, ``match``, ``handler`` and
+    ``tts``; spans are keyed by stage and intent. Aggregates can be exported
+    in the Prometheus text format to a file or over a local HTTP endpoint.
+    """
+
+    STAGES = ("capture", "recognition", "match", "handler", "tts")
+
+    def __init__(self):
+        self.histograms = {}
+        self.outcomes = Counter()
+        self.gauges = {}
+        self.listeners = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    @contextmanager
+    def span(self, stage, intent=None):
+        span = Span(stage, intent)
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception:
+            span.ok = False
+            raise
+        finally:
+            self.record(span.stage, span.intent, time.perf_counter() - start, span.ok)
+
+    def record(self, stage, intent, seconds, ok=True):
+        key = (stage, intent or "none")
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.observe(seconds)
+        log_action(f"{stage} {'ok' if ok else 'failed'}", "DEBUG", stage=stage, intent=intent,
+                   duration_ms=round(seconds * 1000, 3))
+        for callback in list(self.listeners):
+            try:
+                callback(stage, intent, seconds, ok)
+            except Exception as e:
+                log_action(f"Tracing listener error: {e}", "ERROR")
+
+    def outcome(self, intent, ok):
+        with self._lock:
+            self.outcomes[(intent or "none", "success" if ok else "failure")] += 1
+
+    def set_gauge(self, name, value, help=""):
+        with self._lock:
+            self.gauges[name] = (value, help)
+
+    def stage_summary(self, stage):
+        """``{intent: (count, mean, p50, p95, p99)}`` for one stage."""
+        with self._lock:
+            items = [(intent, h) for (s, intent), h in self.histograms.items() if s == stage]
+            return {intent: (h.count, h.mean, h.percentile(0.5), h.percentile(0.95), h.percentile(0.99))
+                    for intent, h in items}
+
+    def success_rates(self):
+        with self._lock:
+            outcomes = dict(self.outcomes)
+        rates = {}
+        for intent in {intent for intent, _ in outcomes}:
+            success = outcomes.get((intent, "success"), 0)
+            failure = outcomes.get((intent, "failure"), 0)
+            rates[intent] = (success, failure)
+        return rates
+
+    def export_text(self):
+        lines = [
+            "# HELP voicemate_stage_latency_seconds Latency of each voice pipeline stage.",
+            "# TYPE voicemate_stage_latency_seconds histogram",
+        ]
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            outcomes = sorted(self.outcomes.items())
+            gauges = sorted(self.gauges.items())
+        for (stage, intent), h in histograms:
+            labels = f'stage="{stage}",intent="{intent}"'
+            cumulative = 0
+            for bound, n in zip(h.bounds, h.counts):
+                cumulative += n
+                lines.append(f'voicemate_stage_latency_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'voicemate_stage_latency_seconds_bucket{{{labels},le="+Inf"}} {h.count}')
+            lines.append(f"voicemate_stage_latency_seconds_sum{{{labels}}} {h.sum:.6f}")
+            lines.append(f"voicemate_stage_latency_seconds_count{{{labels}}} {h.count}")
+        lines.append("# HELP voicemate_commands_total Commands by intent and outcome.")
+        lines.append("# TYPE voicemate_commands_total counter")
+        for (intent, result), n in outcomes:
+            lines.append(f'voicemate_commands_total{{intent="{intent}",outcome="{result}"}} {n}')
+        for name, (value, help) in gauges:
+            lines.append(f"# HELP voicemate_{name} {help}")
+            lines.append(f"# TYPE voicemate_{name} gauge")
+            lines.append(f"voicemate_{name} {value:.6f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.export_text())
+        os.replace(tmp_path, path)
+
+    def start_export(self, path, interval=15):
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write(path)
+                except OSError as e:
+                    log_action(f"Could not write metrics to {path}: {e}", "ERROR")
+        threading.Thread(target=loop, name="metrics-export", daemon=True).start()
+
+    def serve(self, port, host="127.0.0.1"):
+        tracer = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tracer.export_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server
+
+
+tracer = Tracer()
@@ -0,0 +1,133 @@
+import tkinter as tk
+from collections import deque
+from tkinter import scrolledtext
+
+
+class Transcript:
+    """Conversation view that keeps only a bounded window of lines in Tk.
+
+    Messages are kept in a bounded in-memory backing store. Messages added
+    within one frame are written with a single insert, and scrolling to the
+    top pages ``page_size`` older messages back in. The widget never holds
+    more than ``max_lines`` messages, wherever it is scrolled: the oldest
+    are trimmed while the view stays on the same line, and if the user is
+    reading those, new messages wait until they scroll back to the end.
+    """
+
+    def __init__(self, master, tags, max_lines=500, page_size=200, history=20000, frame_ms=16, **options):
+        self.text = scrolledtext.ScrolledText(master, state='disabled', **options)
+        for tag, props in tags.items():
+            self.text.tag_config(tag, **props)
+        self.max_lines = max_lines
+        self.page_size = page_size
+        self.frame_ms = frame_ms
+        self.entries = deque(maxlen=history)  # (text, tag), oldest first
+        self.total = 0       # messages ever added; sequence numbers are 0..total-1
+        self.first = 0       # sequence number of the first message in the widget
+        self.rendered = 0    # sequence number after the last message in the widget
+        self._pending = None
+        self._paging = False
+        self.text.configure(yscrollcommand=self._on_scroll)
+
+    def pack(self, **options):
+        self.text.pack(**options)
+
+    def append(self, text, tag=None):
+        self.entries.append((f"{text}\n", tag))
+        self.total += 1
+        if self._pending is None:
+            self._pending = self.text.after(self.frame_ms, self.flush)
+
+    def _entry(self, seq):
+        return self.entries[seq - (self.total - len(self.entries))]
+
+    @staticmethod
+    def _chunks(entries):
+        # Flat "text tag text tag ..." argument list for one Text.insert call
+        args = []
+        for text, tag in entries:
+            args.extend((text, tag or ()))
+        return args
+
+    def flush(self):
+        self._pending = None
+        oldest = self.total - len(self.entries)
+        start = max(self.rendered, oldest)
+        if start >= self.total:
+            return
+        if self.first < oldest:
+            # The backing store dropped messages the widget still shows
+            self.first = self.rendered = start
+            self._delete_all()
+        follow = self.text.yview()[1] >= 0.999
+        stop = self.total
+        excess = stop - self.first - self.max_lines
+        if not follow and excess > 0 and self._lines(self.first, self.first + excess) > self._lines_above_view():
+            # Trimming would delete what the user is reading; fill up to the cap only
+            stop = max(start, self.first + self.max_lines)
+            excess = 0
+        self.text.configure(state='normal')
+        if stop > start:
+            self.text.insert(tk.END, *self._chunks(self._entry(s) for s in range(start, stop)))
+            self.rendered = stop
+        self._trim(excess, anchor=not follow)
+        self.text.configure(state='disabled')
+        if follow:
+            self.text.see(tk.END)
+
+    def _lines(self, start, stop):
+        return sum(self._entry(s)[0].count("\n") for s in range(start, stop))
+
+    def _lines_above_view(self):
+        return int(self.text.index("@0,0").split(".")[0]) - 1
+
+    def _trim(self, count, anchor=False):
+        # Drop the oldest messages; with anchor, keep the same line at the top of the view
+        if count <= 0:
+            return
+        lines = self._lines(self.first, self.first + count)
+        top = self._lines_above_view() + 1
+        self.text.delete("1.0", f"{lines + 1}.0")
+        self.first += count
+        if anchor:
+            self.text.yview(f"{max(1, top - lines)}.0")
+
+    def _trim_end(self, count):
+        # Drop the newest messages; they are rendered again when the user scrolls down
+        if count <= 0:
+            return
+        lines = self._lines(self.rendered - count, self.rendered)
+        last = int(self.text.index("end-1c").split(".")[0]) - 1
+        self.text.delete(f"{last - lines + 1}.0", "end-1c")
+        self.rendered -= count
+
+    def _delete_all(self):
+        self.text.configure(state='normal')
+        self.text.delete("1.0", tk.END)
+        self.text.configure(state='disabled')
+
+    def _on_scroll(self, first, last):
+        self.text.vbar.set(first, last)
+        if float(first) <= 0.0 and not self._paging and self.first > self.total - len(self.entries):
+            self._paging = True
+            self.text.after_idle(self.page_in)
+        elif float(last) >= 1.0 and self._pending is None and self.rendered < self.total:
+            # Back at the end: render what was held back while scrolled up
+            self._pending = self.text.after(self.frame_ms, self.flush)
+
+    def page_in(self):
+        self._paging = False
+        if self.text.yview()[0] > 0.0:
+            return  # scrolled away (or jumped to the end) before this ran
+        start = max(self.total - len(self.entries), self.first - self.page_size)
+        if start >= self.first:
+            return
+        older = [self._entry(s) for s in range(start, self.first)]
+        lines = sum(text.count("\n") for text, _ in older)
+        self.text.configure(state='normal')
+        self.text.insert("1.0", *self._chunks(older))
+        self.first = start
+        self._trim_end(self.rendered - self.first - self.max_lines)
+        self.text.configure(state='disabled')
+        # Keep the line that was at the top in view instead of jumping to the new top
+        self.text.yview(f"{lines + 1}.0")
@@ -0,0 +1,72 @@
+import itertools
+import threading
+from collections import OrderedDict
+
+from utils import log_action
+
+
+class UIBus:
+    """Hands UI updates from worker threads to the Tk thread, once per frame.
+
+    Workers ``post`` callables instead of touching widgets; posting only
+    appends under a lock and never calls into Tcl. Posts with a ``key``
+    coalesce: a later post replaces a pending one with the same key (status
+    text, button labels, progress), keeping its place in line. Unkeyed posts
+    (transcript lines, commands) run in order.
+
+    The drain loop is scheduled from the Tk thread only. It runs every
+    ``frame_ms`` while updates keep arriving and backs off to ``idle_ms``
+    once the bus has been empty for ``idle_after`` frames.
+    """
+
+    def __init__(self, master, frame_ms=16, idle_ms=100, idle_after=30):
+        self.master = master
+        self.frame_ms = frame_ms
+        self.idle_ms = idle_ms
+        self.idle_after = idle_after
+        self.pending = OrderedDict()
+        self.drains = 0
+        self.coalesced = 0
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._empty_frames = 0
+        self._timer = None
+
+    def post(self, func, *args, key=None):
+        with self._lock:
+            if key is None:
+                key = next(self._ids)
+            elif key in self.pending:
+                self.coalesced += 1
+            self.pending[key] = (func, args)
+
+    def start(self):
+        # Called on the Tk thread once the main loop is running
+        if self._timer is None:
+            self._tick()
+
+    def stop(self):
+        if self._timer is not None:
+            self.master.after_cancel(self._timer)
+            self._timer = None
+
+    def _tick(self):
+        if self.drain():
+            self._empty_frames = 0
+        else:
+            self._empty_frames += 1
+        delay = self.frame_ms if self._empty_frames < self.idle_after else self.idle_ms
+        self._timer = self.master.after(delay, self._tick)
+
+    def drain(self):
+        with self._lock:
+            pending, self.pending = self.pending, OrderedDict()
+        if not pending:
+            return False
+        self.drains += 1
+        for func, args in pending.values():
+            try:
+                func(*args)
+            except Exception as e:
+                log_action(f"UI update failed: {e}", "ERROR")
+        return True
@@ -1,7 +1,76 @@
+import importlib
 import logging
+import threading
+import time
+from contextlib import contextmanager
 
-def log_action(action, status="INFO"):
-    if status == "ERROR":
-        logging.error(action)
-    else:
-        logging.info(action)
+def log_action(action, status="INFO", **fields):
+    # fields (intent, stage, duration_ms, ...) become keys of the JSON log record
+    level = getattr(logging, str(status).upper(), logging.INFO)
+    logging.log(level if isinstance(level, int) else logging.INFO, action, extra=fields or None)
+
+
+class StartupTimer:
+    """Collects import and init timings for the startup report."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.entries.append((name, seconds, time.perf_counter() - self.started))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def mark(self, name):
+        self.record(name, 0.0)
+
+    def report(self):
+        lines = [f"{'phase':<40} {'took ms':>9} {'at ms':>9}"]
+        with self._lock:
+            entries = list(self.entries)
+        for name, seconds, at in entries:
+            lines.append(f"{name:<40} {seconds * 1e3:>9.1f} {at * 1e3:>9.1f}")
+        return "\n".join(lines)
+
+
+startup_timer = StartupTimer()
+
+
+class LazyModule:
+    """Module proxy that imports on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    with startup_timer.phase(f"import {self._name}"):
+                        self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+_lazy_modules = {}
+_lazy_lock = threading.Lock()
+
+
+def lazy_import(name):
+    with _lazy_lock:
+        if name not in _lazy_modules:
+            _lazy_modules[name] = LazyModule(name)
+        return _lazy_modules[name]
@@ -0,0 +1,82 @@
+from utils import lazy_import
+
+np = lazy_import("numpy")
+
+
+def pcm16(data, sample_width):
+    """Signed little-endian PCM of any width as an int16 array (audioop is gone in 3.13)."""
+    if sample_width == 2:
+        return np.frombuffer(data, dtype="<i2", count=len(data) // 2)
+    if sample_width == 1:
+        return np.frombuffer(data, dtype=np.int8).astype(np.int16) << 8
+    if sample_width == 3:
+        # Keep the two most significant bytes of each sample
+        samples = np.frombuffer(data, dtype=np.uint8, count=len(data) // 3 * 3).reshape(-1, 3)
+        return np.ascontiguousarray(samples[:, 1:]).view("<i2").ravel()
+    if sample_width == 4:
+        return (np.frombuffer(data, dtype="<i4", count=len(data) // 4) >> 16).astype(np.int16)
+    raise ValueError(f"Unsupported sample width: {sample_width}")
+
+
+def rms(data, sample_width):
+    """RMS of a PCM chunk on the scale of its own sample width, like audioop.rms."""
+    samples = pcm16(data, sample_width).astype(np.float32)
+    if not len(samples):
+        return 0.0
+    return float(np.sqrt(np.mean(samples * samples))) * 256.0 ** (sample_width - 2)
+
+
+class VoiceActivityDetector:
+    """Cheap first-stage speech detector for the capture stream.
+
+    Each chunk is cut into ``frame_ms`` frames that are scored together with
+    numpy. A frame is voiced when its RMS energy is ``energy_ratio`` times the
+    adaptive noise floor and its zero-crossing rate lies in ``zcr_band``:
+    voiced speech crosses zero far less often than hiss or fan noise, and far
+    more often than mains hum. A chunk is speech when at least ``min_voiced``
+    of its frames are voiced.
+    """
+
+    def __init__(self, sample_rate, sample_width=2, frame_ms=20, energy_ratio=3.0,
+                 zcr_band=(0.01, 0.3), min_voiced=0.3, floor_adapt=0.05, min_floor=30.0):
+        self.sample_width = sample_width
+        self.frame_length = max(2, int(sample_rate * frame_ms / 1000))
+        self.energy_ratio = energy_ratio
+        self.zcr_band = zcr_band
+        self.min_voiced = min_voiced
+        self.floor_adapt = floor_adapt
+        self.min_floor = min_floor
+        self.noise_floor = None
+
+    def frames(self, chunk):
+        samples = pcm16(chunk, self.sample_width)
+        count = len(samples) // self.frame_length
+        return samples[:count * self.frame_length].reshape(count, self.frame_length)
+
+    def features(self, chunk):
+        """Per-frame ``(rms energy, zero-crossing rate)`` arrays."""
+        frames = self.frames(chunk)
+        as_float = frames.astype(np.float32)
+        energy = np.sqrt(np.mean(as_float * as_float, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_length - 1)
+        return energy, zcr
+
+    def voiced(self, chunk):
+        """Boolean mask of voiced frames; updates the noise floor from the rest."""
+        energy, zcr = self.features(chunk)
+        if not len(energy):
+            return energy > 0
+        if self.noise_floor is None:
+            self.noise_floor = max(self.min_floor, float(np.median(energy)))
+        low, high = self.zcr_band
+        mask = (energy > self.noise_floor * self.energy_ratio) & (zcr >= low) & (zcr <= high)
+        quiet = energy[~mask]
+        if len(quiet):
+            target = float(quiet.mean())
+            self.noise_floor = max(self.min_floor, self.noise_floor + self.floor_adapt * (target - self.noise_floor))
+        return mask
+
+    def is_speech(self, chunk):
+        mask = self.voiced(chunk)
+        return bool(len(mask)) and mask.mean() >= self.min_voiced
@@ -1,15 +1,38 @@
+import os
+import threading
+import time
 import tkinter as tk
+from datetime import datetime
 from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib import cm
-from wordcloud import WordCloud
-import numpy as np
-import random
+from utils import lazy_import, log_action
+from sampler import SystemSampler
+from tracing import tracer
+from journal import downsample
+from listing import DirectoryListing
+
+# Plotting libraries are only imported once a visualization is opened.
+plt = lazy_import("matplotlib.pyplot")
+cm = lazy_import("matplotlib.cm")
+tkagg = lazy_import("matplotlib.backends.backend_tkagg")
+wordcloud = lazy_import("wordcloud")
+np = lazy_import("numpy")
 
 class VisualizationManager:
+    # Redraws of live charts are coalesced to at most one per frame budget
+    frame_budget_ms = 250
+    top_n = 10
+    timeline_span = 15 * 60
+    timeline_bins = 120
+    timeline_annotate_limit = 40
+    sentiment_bins = 40
+    explorer_page = 200
+    explorer_first_ms = 5
+
     def __init__(self, gui):
         self.gui = gui
+        self.history_chart = None
+        self.wordcloud_cache = None  # (history version, rendered image)
+        self.copy_windows = {}  # job id -> (window, progress bar, detail text)
 
     def show_visualizations_menu(self):
         menu = tk.Menu(self.gui.master, tearoff=0)
@@ -17,6 +40,7 @@ class VisualizationManager:
         menu.add_command(label="Command Word Cloud", command=self.show_command_wordcloud)
         menu.add_separator()
         menu.add_command(label="System Performance", command=self.show_system_performance)
+        menu.add_command(label="Wikipedia Cache Stats", command=self.show_wiki_cache_stats)
         menu.add_separator()
         menu.add_command(label="Conversation Timeline", command=self.show_conversation_timeline)
         menu.add_command(label="Sentiment Analysis", command=self.show_sentiment_analysis)
@@ -26,164 +50,525 @@ class VisualizationManager:
             menu.grab_release()
 
     def show_command_history_chart(self):
-        if not self.gui.config.action_history:
+        history = self.gui.config.action_history
+        if not history:
             messagebox.showinfo("Info", "No command history available yet.")
             return
+        if self.history_chart is not None:
+            self.history_chart['window'].deiconify()
+            self.history_chart['window'].lift()
+            return
         vis_window = tk.Toplevel(self.gui.master)
         vis_window.title("Command History Chart")
         vis_window.geometry("600x400")
         fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
-        command_counts = {}
-        for cmd in self.gui.config.action_history:
-            command_counts[cmd] = command_counts.get(cmd, 0) + 1
-        commands = list(command_counts.keys())
-        counts = list(command_counts.values())
-        colors = cm.viridis(np.linspace(0, 1, len(commands)))
-        bars = ax.bar(commands, counts, color=colors)
+        canvas = tkagg.FigureCanvasTkAgg(fig, master=vis_window)
+        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        ttk.Button(vis_window, text="Close", command=vis_window.destroy).pack(pady=10)
+
+        chart = {'window': vis_window, 'fig': fig, 'ax': ax, 'canvas': canvas, 'pending': None}
+
+        def on_append(entry):
+            # Called on every new command; redraws are throttled to the frame budget
+            if chart['pending'] is None:
+                chart['pending'] = vis_window.after(self.frame_budget_ms, redraw)
+
+        def redraw():
+            chart['pending'] = None
+            self._draw_command_history(ax, history.top_commands_with_other(self.top_n))
+            canvas.draw_idle()
+
+        def on_destroy(event):
+            if event.widget is not vis_window:
+                return
+            history.unsubscribe(on_append)
+            if chart['pending'] is not None:
+                vis_window.after_cancel(chart['pending'])
+            plt.close(fig)
+            self.history_chart = None
+
+        self._draw_command_history(ax, history.top_commands_with_other(self.top_n))
+        canvas.draw()
+        history.subscribe(on_append)
+        vis_window.bind("<Destroy>", on_destroy)
+        self.history_chart = chart
+
+    @staticmethod
+    def _draw_command_history(ax, top):
+        ax.clear()
+        labels = [intent.replace('_', ' ') for intent, _ in top]
+        counts = [count for _, count in top]
+        colors = cm.viridis(np.linspace(0, 1, len(labels)))
+        bars = ax.bar(labels, counts, color=colors)
         for bar in bars:
             height = bar.get_height()
             ax.text(bar.get_x() + bar.get_width() / 2., height, f'{int(height)}', ha='center', va='bottom')
         ax.set_title('Most Used Commands', pad=20)
         ax.set_ylabel('Frequency')
         ax.set_xlabel('Commands')
-        plt.xticks(rotation=45, ha='right')
-        plt.tight_layout()
-        canvas = FigureCanvasTkAgg(fig, master=vis_window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        ttk.Button(vis_window, text="Close", command=vis_window.destroy).pack(pady=10)
+        ax.tick_params(axis='x', labelrotation=45)
+        for label in ax.get_xticklabels():
+            label.set_ha('right')
+        ax.figure.tight_layout()
 
     def show_command_wordcloud(self):
         if not self.gui.config.action_history:
             messagebox.showinfo("Info", "No command history available yet.")
             return
+        history = self.gui.config.action_history
         vis_window = tk.Toplevel(self.gui.master)
         vis_window.title("Command Word Cloud")
         vis_window.geometry("600x400")
-        text = ' '.join(self.gui.config.action_history)
-        wordcloud = WordCloud(width=500, height=300, background_color='white', colormap='viridis').generate(text)
         fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
-        ax.imshow(wordcloud, interpolation='bilinear')
         ax.axis('off')
         ax.set_title('Command Word Cloud', pad=20)
-        plt.tight_layout()
-        canvas = FigureCanvasTkAgg(fig, master=vis_window)
-        canvas.draw()
+        canvas = tkagg.FigureCanvasTkAgg(fig, master=vis_window)
         canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         ttk.Button(vis_window, text="Close", command=vis_window.destroy).pack(pady=10)
+        vis_window.bind("<Destroy>", lambda e: plt.close(fig) if e.widget is vis_window else None)
+
+        def show(image):
+            if not vis_window.winfo_exists():
+                return
+            ax.clear()
+            ax.imshow(image, interpolation='bilinear')
+            ax.axis('off')
+            ax.set_title('Command Word Cloud', pad=20)
+            fig.tight_layout()
+            canvas.draw_idle()
+
+        version = history.version
+        if self.wordcloud_cache is not None and self.wordcloud_cache[0] == version:
+            show(self.wordcloud_cache[1])
+            return
+
+        ax.text(0.5, 0.5, "Rendering...", ha='center', va='center', transform=ax.transAxes)
+        canvas.draw()
+        frequencies = dict(history.top_words(400))
+
+        def render():
+            # Layout runs off the Tk thread from the running frequency table
+            try:
+                words = {w: c for w, c in frequencies.items() if w not in wordcloud.STOPWORDS} or frequencies
+                cloud = wordcloud.WordCloud(width=500, height=300, background_color='white', colormap='viridis')
+                image = cloud.generate_from_frequencies(words).to_array()
+            except Exception as e:
+                log_action(f"Word cloud rendering failed: {e}", "ERROR")
+                return
+            self.wordcloud_cache = (version, image)
+            self.gui.call_soon(show, image)
+
+        threading.Thread(target=render, name="wordcloud", daemon=True).start()
 
     def show_system_performance(self):
+        if not SystemSampler.available():
+            messagebox.showinfo("Info", "System performance sampling needs /proc (Linux).")
+            return
+        prefs = self.gui.config.user_preferences
+        sampler = SystemSampler(interval=prefs['sampler_interval'], history=120).start()
         vis_window = tk.Toplevel(self.gui.master)
         vis_window.title("System Performance")
         vis_window.geometry("800x600")
         fig = plt.figure(figsize=(8, 6), dpi=100)
+        x = np.arange(sampler.history)
+        empty = np.full(sampler.history, np.nan)
+        # Live artists are animated and blitted; the rest of the figure is cached
         ax1 = fig.add_subplot(221)
-        cpu_usage = [random.randint(10, 80) for _ in range(10)]
-        ax1.plot(cpu_usage, marker='o', color='tab:blue')
+        system_line, = ax1.plot(x, empty, color='tab:blue', label='System', animated=True)
+        process_line, = ax1.plot(x, empty, color='tab:purple', label='Assistant', animated=True)
+        cpu_text = ax1.text(0.02, 0.9, "", transform=ax1.transAxes, fontsize=8, animated=True)
         ax1.set_title('CPU Usage (%)')
         ax1.set_ylim(0, 100)
+        ax1.set_xlim(0, sampler.history - 1)
+        ax1.set_xticks([])
+        ax1.legend(loc='upper right', fontsize=8)
         ax2 = fig.add_subplot(222)
-        mem_usage = [random.randint(30, 90) for _ in range(10)]
-        ax2.plot(mem_usage, marker='o', color='tab:orange')
+        mem_line, = ax2.plot(x, empty, color='tab:orange', animated=True)
+        mem_text = ax2.text(0.02, 0.9, "", transform=ax2.transAxes, fontsize=8, animated=True)
         ax2.set_title('Memory Usage (%)')
         ax2.set_ylim(0, 100)
+        ax2.set_xlim(0, sampler.history - 1)
+        ax2.set_xticks([])
         ax3 = fig.add_subplot(223)
-        commands = ['Open', 'Search', 'Time', 'File', 'Other']
-        times = [random.uniform(0.1, 2.0) for _ in range(5)]
-        ax3.bar(commands, times, color='tab:green')
-        ax3.set_title('Average Response Times (s)')
         ax4 = fig.add_subplot(224)
-        success_rate = [random.randint(70, 100) for _ in range(5)]
-        ax4.bar(commands, success_rate, color='tab:red')
-        ax4.set_title('Success Rate (%)')
-        ax4.set_ylim(0, 100)
-        plt.tight_layout()
-        canvas = FigureCanvasTkAgg(fig, master=vis_window)
-        canvas.draw()
+        self._draw_response_panels(ax3, ax4)
+        fig.tight_layout()
+        canvas = tkagg.FigureCanvasTkAgg(fig, master=vis_window)
         canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         ttk.Button(vis_window, text="Close", command=vis_window.destroy).pack(pady=10)
 
+        state = {'background': None, 'timer': None, 'panels': None}
+
+        def on_draw(event):
+            state['background'] = canvas.copy_from_bbox(fig.bbox)
+            blit()
+
+        def blit():
+            if state['background'] is None:
+                return
+            data = sampler.snapshot()
+            latest = sampler.latest()
+            system_line.set_ydata(data['cpu_system'])
+            process_line.set_ydata(data['cpu_process'])
+            mem_line.set_ydata(data['mem_percent'])
+            overhead = sampler.overhead_percent
+            cpu_text.set_text(f"load {latest['load1']:.2f}   sampler "
+                              + ("-" if overhead is None else f"{overhead:.2f}% CPU"))
+            mem_text.set_text(f"assistant RSS {latest['rss_mb']:.0f} MB")
+            canvas.restore_region(state['background'])
+            for ax, artists in ((ax1, (system_line, process_line, cpu_text)), (ax2, (mem_line, mem_text))):
+                for artist in artists:
+                    ax.draw_artist(artist)
+                canvas.blit(ax.bbox)
+
+        def tick():
+            blit()
+            state['timer'] = vis_window.after(int(sampler.interval * 1000), tick)
+
+        def refresh_panels():
+            # Full redraw (which also re-captures the blit background)
+            self._draw_response_panels(ax3, ax4)
+            canvas.draw_idle()
+            state['panels'] = vis_window.after(10000, refresh_panels)
+
+        def on_destroy(event):
+            if event.widget is not vis_window:
+                return
+            for timer in (state['timer'], state['panels']):
+                if timer is not None:
+                    vis_window.after_cancel(timer)
+            canvas.mpl_disconnect(draw_cid)
+            sampler.stop()
+            plt.close(fig)
+
+        draw_cid = canvas.mpl_connect('draw_event', on_draw)
+        vis_window.bind("<Destroy>", on_destroy)
+        canvas.draw()
+        tick()
+        state['panels'] = vis_window.after(10000, refresh_panels)
+
+    @staticmethod
+    def _draw_response_panels(ax3, ax4, top=5):
+        summary = tracer.stage_summary("handler")
+        busiest = sorted(summary, key=lambda intent: summary[intent][0], reverse=True)[:top]
+        labels = [intent.replace('_', ' ') for intent in busiest]
+        ax3.clear()
+        ax3.bar(labels, [summary[i][1] for i in busiest], color='tab:green')
+        ax3.plot(labels, [summary[i][3] for i in busiest], 'k_', markersize=14, label='p95')
+        ax3.set_title('Average Response Times (s)')
+        rates = tracer.success_rates()
+        ranked = sorted(rates, key=lambda intent: sum(rates[intent]), reverse=True)[:top]
+        ax4.clear()
+        ax4.bar([intent.replace('_', ' ') for intent in ranked],
+                [100.0 * rates[i][0] / sum(rates[i]) for i in ranked], color='tab:red')
+        ax4.set_title('Success Rate (%)')
+        ax4.set_ylim(0, 100)
+        for ax in (ax3, ax4):
+            ax.tick_params(axis='x', labelsize=8, labelrotation=20)
+            if not ax.patches:
+                ax.text(0.5, 0.5, "No commands yet", ha='center', va='center', transform=ax.transAxes)
+
+    def show_wiki_cache_stats(self):
+        stats = self.gui.command_processor.wiki.stats()
+        messagebox.showinfo(
+            "Wikipedia Cache",
+            f"Entries: {stats['entries']}\n"
+            f"Hits: {stats['hits']}\n"
+            f"Cached misses/disambiguations: {stats['negative_hits']}\n"
+            f"Misses: {stats['misses']} (expired: {stats['expired']})\n"
+            f"Errors: {stats['errors']}\n"
+            f"Prefetched: {stats['prefetched']}\n"
+            f"Hit rate: {stats['hit_rate']:.0%}",
+        )
+
     def show_conversation_timeline(self):
+        journal = self.gui.config.journal
+        first, last = journal.bounds()
+        if first is None:
+            messagebox.showinfo("Info", "No conversation events recorded yet.")
+            return
         vis_window = tk.Toplevel(self.gui.master)
         vis_window.title("Conversation Timeline")
-        vis_window.geometry("800x400")
-        fig, ax = plt.subplots(figsize=(8, 4), dpi=100)
-        events = ['Greeting', 'Command 1', 'Response 1', 'Command 2', 'Response 2', 'Exit']
-        times = [0, 1, 2, 3, 4, 5]
-        ax.plot(times, [1] * len(times), '-o', color='purple')
-        for i, txt in enumerate(events):
-            ax.annotate(txt, (times[i], 1), textcoords="offset points", xytext=(0, 10), ha='center')
-        ax.set_title('Conversation Timeline')
-        ax.set_yticks([])
-        ax.set_xlabel('Time (minutes)')
-        ax.grid(True, axis='x')
-        plt.tight_layout()
-        canvas = FigureCanvasTkAgg(fig, master=vis_window)
-        canvas.draw()
+        vis_window.geometry("900x450")
+        toolbar = ttk.Frame(vis_window)
+        toolbar.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        fig, ax = plt.subplots(figsize=(9, 4), dpi=100)
+        canvas = tkagg.FigureCanvasTkAgg(fig, master=vis_window)
         canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        ttk.Button(vis_window, text="Close", command=vis_window.destroy).pack(pady=10)
+        range_var = tk.StringVar()
+
+        # Only the visible window is read from the journal; "end" of None follows new events
+        view = {'span': self.timeline_span, 'end': None, 'timer': None}
+
+        def redraw():
+            end = view['end'] or journal.bounds()[1]
+            start = end - view['span']
+            self._draw_timeline(ax, journal.query(start, end), start, end)
+            range_var.set(f"{datetime.fromtimestamp(start):%Y-%m-%d %H:%M:%S} - {datetime.fromtimestamp(end):%H:%M:%S}")
+            canvas.draw_idle()
+
+        def shift(direction):
+            end = (view['end'] or journal.bounds()[1]) + direction * view['span'] / 2
+            view['end'] = None if end >= journal.bounds()[1] else max(end, journal.bounds()[0] + view['span'] / 2)
+            redraw()
+
+        def zoom(factor):
+            view['span'] = min(max(view['span'] * factor, 10), max(60, journal.bounds()[1] - journal.bounds()[0]) * 1.05)
+            redraw()
+
+        def follow():
+            # Re-query the live window periodically while following the newest events
+            if view['end'] is None:
+                redraw()
+            view['timer'] = vis_window.after(2000, follow)
+
+        def on_destroy(event):
+            if event.widget is not vis_window:
+                return
+            if view['timer'] is not None:
+                vis_window.after_cancel(view['timer'])
+            plt.close(fig)
+
+        ttk.Button(toolbar, text="◀ Earlier", command=lambda: shift(-1)).pack(side='left')
+        ttk.Button(toolbar, text="Later ▶", command=lambda: shift(1)).pack(side='left')
+        ttk.Button(toolbar, text="Zoom in", command=lambda: zoom(0.5)).pack(side='left', padx=(10, 0))
+        ttk.Button(toolbar, text="Zoom out", command=lambda: zoom(2)).pack(side='left')
+        ttk.Button(toolbar, text="Latest", command=lambda: (view.update(end=None), redraw())).pack(side='left', padx=(10, 0))
+        ttk.Label(toolbar, textvariable=range_var).pack(side='left', padx=10)
+        ttk.Button(toolbar, text="Close", command=vis_window.destroy).pack(side='right')
+        vis_window.bind("<Destroy>", on_destroy)
+        redraw()
+        view['timer'] = vis_window.after(2000, follow)
+
+    def _draw_timeline(self, ax, events, start, end):
+        ax.clear()
+        events = list(events)
+        lanes = ['user', 'intent', 'assistant', 'error', 'stage']
+        colors = {'user': '#4169e1', 'intent': '#8a2be2', 'assistant': '#2e8b57', 'error': '#ff4500', 'stage': '#888888'}
+        if len(events) <= self.timeline_annotate_limit:
+            # Sparse window: one marker per event, labelled with its text
+            for timestamp, kind, payload in events:
+                x = (timestamp - end) / 60
+                lane = lanes.index(kind)
+                ax.scatter([x], [lane], color=colors[kind], s=30, zorder=3)
+                label = payload['text'] if kind != 'stage' else f"{payload['text']} {payload['ms']:.0f}ms"
+                ax.annotate(label[:30], (x, lane), textcoords="offset points", xytext=(0, 8),
+                            ha='center', fontsize=7, rotation=20)
+        else:
+            # Dense window: events are binned so the plotted points stay bounded
+            for kind, points in downsample(events, start, end, self.timeline_bins).items():
+                xs = [(center - end) / 60 for center, _, _ in points]
+                sizes = [min(200, 20 + 10 * count) for _, count, _ in points]
+                ax.scatter(xs, [lanes.index(kind)] * len(xs), s=sizes, color=colors[kind], alpha=0.7, zorder=3)
+        ax.set_yticks(range(len(lanes)))
+        ax.set_yticklabels([lane.capitalize() for lane in lanes])
+        ax.set_ylim(-0.5, len(lanes) - 0.3)
+        ax.set_xlim((start - end) / 60, 0)
+        ax.set_title(f'Conversation Timeline ({len(events)} events)')
+        ax.set_xlabel(f'Minutes before {datetime.fromtimestamp(end):%H:%M:%S}')
+        ax.grid(True, axis='x')
+        ax.figure.tight_layout()
 
     def show_sentiment_analysis(self):
+        tracker = self.gui.sentiment
         vis_window = tk.Toplevel(self.gui.master)
         vis_window.title("Sentiment Analysis")
-        vis_window.geometry("600x400")
-        fig, ax = plt.subplots(figsize=(6, 4), dpi=100)
-        sentiments = ['Positive', 'Neutral', 'Negative']
-        counts = [65, 25, 10]
-        colors = ['#4CAF50', '#FFC107', '#F44336']
-        wedges, texts, autotexts = ax.pie(counts, labels=sentiments, colors=colors, autopct='%1.1f%%', startangle=90, explode=(0.1, 0, 0))
-        plt.setp(autotexts, size=10, weight="bold")
-        ax.set_title('Conversation Sentiment Analysis')
-        canvas = FigureCanvasTkAgg(fig, master=vis_window)
-        canvas.draw()
+        vis_window.geometry("900x420")
+        fig, (ax_pie, ax_time) = plt.subplots(1, 2, figsize=(9, 4), dpi=100, gridspec_kw={'width_ratios': [1, 2]})
+        canvas = tkagg.FigureCanvasTkAgg(fig, master=vis_window)
         canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         ttk.Button(vis_window, text="Close", command=vis_window.destroy).pack(pady=10)
 
-    def show_file_explorer(self, directory, files):
+        # Scoring happens on the tracker thread; the chart only redraws when it has new scores
+        state = {'version': None, 'timer': None}
+
+        def refresh():
+            if tracker.version != state['version']:
+                state['version'] = tracker.version
+                self._draw_sentiment(ax_pie, ax_time, tracker)
+                canvas.draw_idle()
+            state['timer'] = vis_window.after(2000, refresh)
+
+        def on_destroy(event):
+            if event.widget is not vis_window:
+                return
+            if state['timer'] is not None:
+                vis_window.after_cancel(state['timer'])
+            plt.close(fig)
+
+        vis_window.bind("<Destroy>", on_destroy)
+        refresh()
+
+    def _draw_sentiment(self, ax_pie, ax_time, tracker):
+        ax_pie.clear()
+        ax_time.clear()
+        counts = tracker.summary()
+        colors = ['#4CAF50', '#FFC107', '#F44336']
+        if sum(counts):
+            wedges, texts, autotexts = ax_pie.pie(counts, labels=['Positive', 'Neutral', 'Negative'], colors=colors,
+                                                  autopct='%1.1f%%', startangle=90)
+            plt.setp(autotexts, size=9, weight="bold")
+        else:
+            ax_pie.text(0.5, 0.5, "Scoring...", ha='center', va='center', transform=ax_pie.transAxes)
+            ax_pie.axis('off')
+        ax_pie.set_title('Overall Sentiment')
+
+        points = tracker.series()
+        if points:
+            times = np.array([t for t, _, _ in points])
+            scores = np.array([score for _, _, score in points])
+            kinds = np.array([kind for _, kind, _ in points])
+            start, end = times[0], max(times[-1], times[0] + 1)
+            # Mean score per time bin and speaker keeps the line readable for long histories
+            edges = np.linspace(start, end, self.sentiment_bins + 1)
+            centers = [datetime.fromtimestamp(t) for t in (edges[:-1] + edges[1:]) / 2]
+            for kind, color in (('user', self.gui.config.user_color), ('assistant', self.gui.config.assistant_color)):
+                mask = kinds == kind
+                index = np.clip(np.searchsorted(edges, times[mask], side='right') - 1, 0, self.sentiment_bins - 1)
+                sums = np.bincount(index, weights=scores[mask], minlength=self.sentiment_bins)
+                totals = np.bincount(index, minlength=self.sentiment_bins)
+                filled = totals > 0
+                ax_time.plot([c for c, f in zip(centers, filled) if f], sums[filled] / totals[filled],
+                             '-o', markersize=3, color=color, label=kind.capitalize())
+            ax_time.legend(loc='upper left')
+            ax_time.figure.autofmt_xdate()
+        ax_time.axhline(0, color='#888888', linewidth=0.8)
+        ax_time.set_ylim(-1.05, 1.05)
+        ax_time.set_ylabel('Mean sentiment')
+        ax_time.set_title('Sentiment Over Time')
+        ax_time.figure.tight_layout()
+
+    def show_file_explorer(self, directory):
+        listing = DirectoryListing(directory).start()
         explorer = tk.Toplevel(self.gui.master)
         explorer.title(f"Files in {directory}")
         explorer.geometry("600x400")
-        tree = ttk.Treeview(explorer)
+        filter_frame = ttk.Frame(explorer)
+        filter_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+        pattern_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=pattern_var).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        count_var = tk.StringVar(value="Loading...")
+        ttk.Label(filter_frame, textvariable=count_var).pack(side=tk.RIGHT)
+        tree_frame = ttk.Frame(explorer)
+        tree_frame.pack(expand=True, fill=tk.BOTH)
+        tree = ttk.Treeview(tree_frame)
         tree["columns"] = ("size", "type", "modified")
         tree.column("#0", width=300, minwidth=100)
         tree.column("size", width=100, minwidth=50)
         tree.column("type", width=100, minwidth=50)
         tree.column("modified", width=150, minwidth=50)
-        tree.heading("#0", text="Name")
-        tree.heading("size", text="Size")
-        tree.heading("type", text="Type")
-        tree.heading("modified", text="Modified")
-        for file in files:
-            path = os.path.join(directory, file)
-            size = os.path.getsize(path)
-            modified = datetime.fromtimestamp(os.path.getmtime(path))
-            file_type = "Folder" if os.path.isdir(path) else "File"
-            tree.insert("", tk.END, text=file, values=(size, file_type, modified))
-        tree.pack(expand=True, fill=tk.BOTH)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+
+        # Rows are inserted a page at a time; scrolling near the end of the
+        # inserted rows raises the target. "view" is None while rows are
+        # shown in arrival order straight from the listing.
+        state = {'view': None, 'shown': 0, 'target': self.explorer_page, 'sort': None,
+                 'reverse': False, 'timer': None, 'loaded': 0, 'rebuilt_at': 0.0}
+
+        def total():
+            return len(state['view']) if state['view'] is not None else len(listing)
+
+        def render():
+            if state['view'] is None:
+                new = listing.slice(state['shown'], state['target'])
+            else:
+                new = state['view'][state['shown']:state['target']]
+            for entry in new:
+                modified = datetime.fromtimestamp(entry.mtime).strftime("%Y-%m-%d %H:%M") if entry.mtime else ""
+                tree.insert("", tk.END, text=entry.name,
+                            values=("" if entry.size is None else entry.size, "Folder" if entry.is_dir else "File", modified))
+            state['shown'] += len(new)
+            count_var.set(f"{total()} items" + ("" if listing.done else " (loading...)"))
+
+        def rebuild():
+            tree.delete(*tree.get_children())
+            state['shown'] = 0
+            state['loaded'] = len(listing)
+            state['rebuilt_at'] = time.monotonic()
+            pattern = pattern_var.get()
+            state['view'] = listing.view(state['sort'], state['reverse'], pattern) \
+                if state['sort'] or pattern else None
+            render()
+
+        def sort_by(column):
+            state['reverse'] = state['sort'] == column and not state['reverse']
+            state['sort'] = column
+            state['target'] = self.explorer_page
+            rebuild()
+
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) > 0.95 and state['shown'] >= state['target'] and state['shown'] < total():
+                state['target'] += self.explorer_page
+                explorer.after_idle(render)
+
+        def poll():
+            state['timer'] = None
+            done = listing.done
+            if state['view'] is None:
+                render()
+            elif len(listing) > state['loaded'] and (done or time.monotonic() - state['rebuilt_at'] >= 1.0):
+                # Sorted or filtered views are recomputed at most once a second while loading
+                rebuild()
+            if listing.error is not None:
+                count_var.set(f"Could not read {directory}")
+            elif not done or len(listing) > state['loaded'] and state['view'] is not None:
+                state['timer'] = explorer.after(50, poll)
+
+        def on_destroy(event):
+            if event.widget is not explorer:
+                return
+            listing.stop()
+            if state['timer'] is not None:
+                explorer.after_cancel(state['timer'])
+
+        for column, title in (("#0", "Name"), ("size", "Size"), ("type", "Type"), ("modified", "Modified")):
+            key = "name" if column == "#0" else column
+            tree.heading(column, text=title, command=lambda key=key: sort_by(key))
+        tree.configure(yscrollcommand=on_scroll)
+        pattern_var.trace_add("write", lambda *args: rebuild())
+        explorer.bind("<Destroy>", on_destroy)
         btn_frame = ttk.Frame(explorer)
         btn_frame.pack(fill=tk.X)
-        ttk.Button(btn_frame, text="Open", command=lambda: self.open_selected_file(tree)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Open", command=lambda: self.open_selected_file(tree, directory)).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Close", command=explorer.destroy).pack(side=tk.RIGHT, padx=5)
+        state['timer'] = explorer.after(self.explorer_first_ms, poll)
 
     @staticmethod
-    def open_selected_file(tree):
+    def open_selected_file(tree, directory):
         selected = tree.focus()
         if selected:
             file_name = tree.item(selected, "text")
             try:
-                os.startfile(file_name)
+                os.startfile(os.path.join(directory, file_name))
             except:
                 messagebox.showerror("Error", f"Could not open {file_name}")
 
-    def show_copy_animation(self, source, dest):
+    def show_copy_progress(self, job, source, dest):
         progress = tk.Toplevel(self.gui.master)
-        progress.title("Copying File")
-        progress.geometry("300x100")
+        progress.title("Copying")
+        progress.geometry("420x140")
         ttk.Label(progress, text=f"Copying {source} to {dest}").pack(pady=5)
-        pb = ttk.Progressbar(progress, orient="horizontal", length=200, mode="determinate")
-        pb.pack(pady=10)
-        pb.start(10)
-        def finish_copy():
-            pb.stop()
-            progress.destroy()
-        progress.after(2000, finish_copy)
+        pb = ttk.Progressbar(progress, orient="horizontal", length=360, mode="determinate", maximum=100)
+        pb.pack(pady=5)
+        detail = tk.StringVar(value="Preparing...")
+        ttk.Label(progress, textvariable=detail).pack()
+        ttk.Button(progress, text="Cancel", command=job.cancel).pack(pady=5)
+        self.copy_windows[job.id] = (progress, pb, detail)
+
+    def update_copy_progress(self, job_id, done, total, rate, eta):
+        window = self.copy_windows.get(job_id)
+        if window is None or not window[0].winfo_exists():
+            return
+        _, pb, detail = window
+        pb['value'] = 100.0 * done / total if total else 100
+        remaining = f"{int(eta // 60)}:{int(eta % 60):02d} left" if eta is not None else "estimating..."
+        detail.set(f"{done / 1e6:,.0f} of {total / 1e6:,.0f} MB  -  {rate / 1e6:,.1f} MB/s  -  {remaining}")
+
+    def close_copy_progress(self, job_id):
+        window = self.copy_windows.pop(job_id, None)
+        if window is not None and window[0].winfo_exists():
+            window[0].destroy()
@@ -0,0 +1,199 @@
+import json
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from utils import log_action, lazy_import
+
+wikipedia = lazy_import("wikipedia")
+
+# kind is "page", "missing" or "ambiguous"; options lists candidate titles
+# for ambiguous queries.
+WikiAnswer = namedtuple("WikiAnswer", ["kind", "text", "options", "cached"])
+
+
+class AmbiguousQuery(LookupError):
+    def __init__(self, query, options):
+        super().__init__(query)
+        self.options = list(options)
+
+
+class PageMissing(LookupError):
+    pass
+
+
+class WikipediaProvider:
+    def __init__(self, sentences=2):
+        self.sentences = sentences
+
+    def summary(self, query):
+        try:
+            return wikipedia.summary(query, sentences=self.sentences)
+        except wikipedia.exceptions.DisambiguationError as e:
+            raise AmbiguousQuery(query, e.options)
+        except wikipedia.exceptions.PageError:
+            raise PageMissing(query)
+
+    def related(self, query, limit=3):
+        return wikipedia.search(query, results=limit + 1)[1:]
+
+
+class LocalProvider:
+    """Offline stand-in backed by a ``{title: summary}`` mapping or JSON file.
+
+    A value that is a list marks the title as a disambiguation page with
+    those options.
+    """
+
+    def __init__(self, pages=None, path=None):
+        if pages is None:
+            with open(path, encoding="utf-8") as f:
+                pages = json.load(f)
+        self.pages = {WikiCache.normalize(title): value for title, value in pages.items()}
+        self.calls = 0
+
+    def summary(self, query):
+        self.calls += 1
+        value = self.pages.get(WikiCache.normalize(query))
+        if value is None:
+            raise PageMissing(query)
+        if isinstance(value, list):
+            raise AmbiguousQuery(query, value)
+        return value
+
+    def related(self, query, limit=3):
+        words = set(WikiCache.normalize(query).split())
+        return [title for title in self.pages if words & set(title.split()) and title != WikiCache.normalize(query)][:limit]
+
+
+class WikiCache:
+    """SQLite-backed answer cache in front of a Wikipedia provider.
+
+    Queries are normalized before lookup. Pages are kept for ``ttl`` seconds;
+    missing and ambiguous results are cached too (for ``negative_ttl``) so they
+    are not fetched again on every retry. The table is trimmed to
+    ``max_entries`` by last access.
+    """
+
+    def __init__(self, provider, path="wiki_cache.sqlite3", ttl=7 * 24 * 3600, negative_ttl=3600,
+                 max_entries=2000, prefetch=False, prefetch_limit=3):
+        self.provider = provider
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.prefetch = prefetch
+        self.prefetch_limit = prefetch_limit
+        self.counters = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0, "errors": 0, "prefetched": 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            "key TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed_at)")
+        self._db.commit()
+        self._prefetch_queue = None
+
+    @staticmethod
+    def normalize(query):
+        query = re.sub(r"[^\w\s]", " ", query.lower())
+        words = [w for w in query.split() if w not in ("the", "a", "an")]
+        return " ".join(words)
+
+    def _get(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT kind, payload, fetched_at FROM answers WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            kind, payload, fetched_at = row
+            ttl = self.ttl if kind == "page" else self.negative_ttl
+            if time.time() - fetched_at > ttl:
+                self.counters["expired"] += 1
+                return None
+            self._db.execute("UPDATE answers SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return kind, json.loads(payload)
+
+    def _put(self, key, kind, payload):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO answers (key, kind, payload, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(payload), now, now),
+            )
+            self._db.execute(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def _fetch(self, query):
+        try:
+            return "page", self.provider.summary(query)
+        except AmbiguousQuery as e:
+            return "ambiguous", e.options[:10]
+        except PageMissing:
+            return "missing", None
+
+    def lookup(self, query):
+        key = self.normalize(query)
+        cached = self._get(key)
+        if cached is not None:
+            kind, payload = cached
+            self.counters["hits" if kind == "page" else "negative_hits"] += 1
+            return self._answer(kind, payload, True)
+        self.counters["misses"] += 1
+        try:
+            kind, payload = self._fetch(query)
+        except Exception:
+            # Network and API errors are not cached
+            self.counters["errors"] += 1
+            raise
+        self._put(key, kind, payload)
+        if kind == "page" and self.prefetch:
+            self._schedule_prefetch(query)
+        return self._answer(kind, payload, False)
+
+    @staticmethod
+    def _answer(kind, payload, cached):
+        if kind == "ambiguous":
+            return WikiAnswer(kind, None, payload, cached)
+        return WikiAnswer(kind, payload, [], cached)
+
+    def _schedule_prefetch(self, query):
+        if self._prefetch_queue is None:
+            self._prefetch_queue = queue.Queue(maxsize=32)
+            threading.Thread(target=self._prefetch_worker, name="wiki-prefetch", daemon=True).start()
+        try:
+            self._prefetch_queue.put_nowait(query)
+        except queue.Full:
+            pass
+
+    def _prefetch_worker(self):
+        while True:
+            query = self._prefetch_queue.get()
+            try:
+                for title in self.provider.related(query, self.prefetch_limit):
+                    key = self.normalize(title)
+                    if self._get(key) is None:
+                        self._put(key, *self._fetch(title))
+                        self.counters["prefetched"] += 1
+            except Exception as e:
+                log_action(f"Wikipedia prefetch failed for {query}: {e}", "ERROR")
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        stats = dict(self.counters)
+        stats["entries"] = entries
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["negative_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._db.close()